@@ -0,0 +1,8 @@
+# app/bench/__init__.py
+"""
+Benchmarks de rendimiento.
+
+python -m app.bench ejecuta la suite de caminos calientes a varias escalas
+(ver app/bench/suite.py); los micro-benchmarks se ejecutan con
+python -m app.bench.<modulo>.
+"""
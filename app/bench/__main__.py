@@ -0,0 +1,6 @@
+import asyncio
+import sys
+
+from .suite import main
+
+sys.exit(asyncio.run(main()))
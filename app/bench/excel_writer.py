@@ -0,0 +1,70 @@
+# app/bench/excel_writer.py
+"""
+Benchmark de los backends Excel de ReportGenerator.
+
+Genera una hoja sintética con la forma del reporte de rentabilidad y mide
+el tiempo de cada backend:
+
+    python -m app.bench.excel_writer --filas 200000
+    python -m app.bench.excel_writer --filas 200000 --backend xlsxwriter
+"""
+import argparse
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from ..services.excel_writer import escribir_excel
+from ..services.reporting import ReportGenerator
+
+BACKENDS: Dict[str, Callable[[Dict[str, pd.DataFrame], str], bytes]] = {
+    "xlsxwriter": escribir_excel,
+    # _generar_excel_openpyxl no usa la sesión de base de datos
+    "openpyxl": lambda dfs, titulo: ReportGenerator._generar_excel_openpyxl(None, dfs, titulo)
+}
+
+def generar_datos(filas: int, semilla: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(semilla)
+    disenos = np.array([f"Cortina Enrollable {n}" for n in ("Basic", "Premium", "Motorizada", "Blackout")])
+    costo = rng.uniform(50_000, 2_000_000, filas).round(2)
+    return pd.DataFrame({
+        "diseno": disenos[rng.integers(0, len(disenos), filas)],
+        "cantidad_cortinas": rng.integers(1, 500, filas),
+        "costo_promedio": costo,
+        "precio_promedio": (costo * rng.uniform(1.1, 1.6, filas)).round(2),
+        "margen_porcentaje": rng.uniform(5, 40, filas),
+        "fecha": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24, filas), unit="h")
+    })
+
+def medir(backend: str, df: pd.DataFrame, verificar: bool) -> Dict:
+    inicio = time.perf_counter()
+    contenido = BACKENDS[backend]({"Resumen": df}, "Benchmark")
+    segundos = time.perf_counter() - inicio
+
+    resultado = {"backend": backend, "segundos": round(segundos, 3), "bytes": len(contenido)}
+    if verificar:
+        import io
+        hoja = load_workbook(io.BytesIO(contenido), read_only=True)["Resumen"]
+        resultado["filas_hoja"] = hoja.max_row
+    return resultado
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=200_000)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), action="append",
+                        help="Backend a medir (repetible); por defecto todos")
+    parser.add_argument("--verificar", action="store_true",
+                        help="Relee cada archivo para comprobar el número de filas")
+    args = parser.parse_args()
+
+    df = generar_datos(args.filas)
+    print(f"{args.filas} filas x {len(df.columns)} columnas")
+    for backend in args.backend or ["xlsxwriter", "openpyxl"]:
+        r = medir(backend, df, args.verificar)
+        extra = f", {r['filas_hoja']} filas en la hoja" if "filas_hoja" in r else ""
+        print(f"{r['backend']:>10}: {r['segundos']:8.3f} s, {r['bytes'] / 1e6:.1f} MB{extra}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# app/bench/sqlite_profile.py
+"""
+Benchmark de creación de pedidos (crear_cortina) con cada perfil de SQLite.
+
+Cada perfil trabaja sobre una copia de la base de origen en un directorio
+temporal, de modo que la base del proyecto no se modifica:
+
+    python -m app.bench.sqlite_profile --pedidos 300
+    python -m app.bench.sqlite_profile --pedidos 300 --concurrencia 8 --perfil fast
+
+El perfil "sin_perfil" reproduce el comportamiento anterior (journal por
+defecto y PRAGMA foreign_keys en cada sesión) como referencia.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from ..crud.cortina_crud import crear_cortina
+from ..migrations import run_migrations
+from ..models.diseno import Diseno
+from ..schemas.cortina_schema import CortinaCreate
+from ..utils.sqlite_tuning import PERFILES, aplicar_perfil
+
+SIN_PERFIL = "sin_perfil"
+
+async def medir_perfil(origen: Path, perfil: str, pedidos: int, concurrencia: int) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "bench.db"
+        shutil.copy(origen, ruta)
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{ruta}")
+        if perfil != SIN_PERFIL:
+            aplicar_perfil(engine, perfil)
+        sesiones = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        try:
+            await run_migrations(engine)
+            async with sesiones() as db:
+                diseno_id = (await db.execute(select(Diseno.id).limit(1))).scalar()
+            if diseno_id is None:
+                raise SystemExit(f"{origen} no tiene diseños para crear pedidos")
+
+            pedido = CortinaCreate(
+                diseno_id=diseno_id, ancho=150, alto=200, cliente="Benchmark",
+                telefono="0000000", email="bench@example.com", tipos_insumo=[]
+            )
+            latencias: List[float] = []
+            errores = 0
+            restantes = iter(range(pedidos))
+
+            async def trabajador():
+                nonlocal errores
+                for _ in restantes:
+                    inicio = time.perf_counter()
+                    try:
+                        async with sesiones() as db:
+                            if perfil == SIN_PERFIL:
+                                await db.execute(text("PRAGMA foreign_keys=ON"))
+                            await crear_cortina(db, pedido)
+                        latencias.append(time.perf_counter() - inicio)
+                    except Exception:
+                        errores += 1
+
+            inicio = time.perf_counter()
+            # crear_cortina imprime trazas de depuración en cada llamada
+            with contextlib.redirect_stdout(io.StringIO()):
+                await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+            total = time.perf_counter() - inicio
+        finally:
+            await engine.dispose()
+
+    latencias.sort()
+    return {
+        "perfil": perfil,
+        "pedidos_por_segundo": round(len(latencias) / total, 1),
+        "p50_ms": round(statistics.median(latencias) * 1000, 2) if latencias else None,
+        "p95_ms": round(latencias[int(len(latencias) * 0.95) - 1] * 1000, 2) if latencias else None,
+        "errores": errores
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--origen", type=Path, default=Path("cortinas.db"), help="Base de datos a copiar")
+    parser.add_argument("--pedidos", type=int, default=300)
+    parser.add_argument("--concurrencia", type=int, default=1)
+    parser.add_argument("--perfil", choices=[SIN_PERFIL, *PERFILES], action="append",
+                        help="Perfil a medir (repetible); por defecto todos")
+    args = parser.parse_args()
+
+    print(f"{args.pedidos} pedidos, concurrencia {args.concurrencia}")
+    for perfil in args.perfil or [SIN_PERFIL, *PERFILES]:
+        r = await medir_perfil(args.origen, perfil, args.pedidos, args.concurrencia)
+        print(
+            f"{r['perfil']:>10}: {r['pedidos_por_segundo']:8.1f} pedidos/s, "
+            f"p50 {r['p50_ms']} ms, p95 {r['p95_ms']} ms, errores {r['errores']}"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,192 @@
+# app/bench/statements.py
+"""
+Micro-benchmark del costo por llamada de las consultas más frecuentes con
+tres variantes:
+
+- select: construir el select() en cada llamada (comportamiento anterior);
+- lambda: sentencia lambda_stmt, que cachea la construcción por código;
+- precompilada: sentencias de app.crud.statements con bindparam().
+
+Mide dos cosas por consulta:
+- construcción: armar la sentencia y calcular su clave de caché, que es lo
+  que SQLAlchemy paga en cada llamada antes de buscar el SQL compilado;
+- ejecución: la llamada completa sobre una sesión asíncrona.
+
+    python -m app.bench.statements --llamadas 5000
+"""
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from sqlalchemy import and_, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload, selectinload
+
+from ..crud import statements
+from ..models.color_insumo import ColorInsumo
+from ..models.cortina import Cortina
+from ..models.diseno import Diseno, DisenoTipoInsumo
+from ..models.inventario_insumo import InventarioInsumo
+from ..models.referencia_insumo import ReferenciaInsumo
+
+VARIANTES = ("select", "lambda", "precompilada")
+
+def _color(color_id):
+    return select(ColorInsumo).where(ColorInsumo.id == color_id)
+
+def _referencia(referencia_id):
+    return select(ReferenciaInsumo).where(ReferenciaInsumo.id == referencia_id)
+
+def _inventario(referencia_id, color_id):
+    return select(InventarioInsumo).where(
+        and_(
+            InventarioInsumo.referencia_id == referencia_id,
+            InventarioInsumo.color_id == color_id
+        )
+    )
+
+def _cortina(cortina_id):
+    return (
+        select(Cortina)
+        .options(
+            selectinload(Cortina.diseno)
+            .selectinload(Diseno.tipos_insumo)
+            .joinedload(DisenoTipoInsumo.tipo_insumo),
+            selectinload(Cortina.diseno)
+            .selectinload(Diseno.tipos_insumo)
+            .joinedload(DisenoTipoInsumo.referencia),
+            selectinload(Cortina.diseno)
+            .selectinload(Diseno.tipos_insumo)
+            .joinedload(DisenoTipoInsumo.color)
+        )
+        .where(Cortina.id == cortina_id)
+    )
+
+# Variante lambda: cada valor por llamada queda en el closure como bindparam
+def _color_lambda(color_id):
+    return lambda_stmt(lambda: select(ColorInsumo).where(ColorInsumo.id == color_id))
+
+def _referencia_lambda(referencia_id):
+    return lambda_stmt(lambda: select(ReferenciaInsumo).where(ReferenciaInsumo.id == referencia_id))
+
+def _inventario_lambda(referencia_id, color_id):
+    return lambda_stmt(lambda: select(InventarioInsumo).where(
+        and_(
+            InventarioInsumo.referencia_id == referencia_id,
+            InventarioInsumo.color_id == color_id
+        )
+    ))
+
+def _cortina_lambda(cortina_id):
+    return lambda_stmt(
+        lambda: select(Cortina)
+        .options(
+            selectinload(Cortina.diseno)
+            .selectinload(Diseno.tipos_insumo)
+            .joinedload(DisenoTipoInsumo.tipo_insumo),
+            selectinload(Cortina.diseno)
+            .selectinload(Diseno.tipos_insumo)
+            .joinedload(DisenoTipoInsumo.referencia),
+            selectinload(Cortina.diseno)
+            .selectinload(Diseno.tipos_insumo)
+            .joinedload(DisenoTipoInsumo.color)
+        )
+        .where(Cortina.id == cortina_id)
+    )
+
+def _precompilada(sentencia, nombres: tuple) -> Callable:
+    def construir(*args):
+        return sentencia, dict(zip(nombres, args))
+    return construir
+
+# consulta -> (constructores por variante, argumentos)
+CONSULTAS: Dict[str, tuple] = {
+    "get_color": (
+        (_color, _color_lambda, _precompilada(statements.COLOR_POR_ID, ("color_id",))),
+        (1,)
+    ),
+    "get_referencia": (
+        (_referencia, _referencia_lambda,
+         _precompilada(statements.REFERENCIA_POR_ID, ("referencia_id",))),
+        (1,)
+    ),
+    "get_inventario_by_color_ref": (
+        (_inventario, _inventario_lambda,
+         _precompilada(statements.INVENTARIO_POR_COLOR_REF, ("referencia_id", "color_id"))),
+        (1, 1)
+    ),
+    "obtener_cortina": (
+        (_cortina, _cortina_lambda, _precompilada(statements.CORTINA_POR_ID, ("cortina_id",))),
+        (1,)
+    )
+}
+
+def _sentencia(construir: Callable, args: tuple) -> tuple:
+    resultado = construir(*args)
+    return resultado if isinstance(resultado, tuple) else (resultado, None)
+
+def medir_construccion(construir: Callable, args: tuple, llamadas: int) -> float:
+    """Microsegundos por llamada para construir la sentencia y su clave de caché"""
+    inicio = time.perf_counter()
+    for _ in range(llamadas):
+        _sentencia(construir, args)[0]._generate_cache_key()
+    return (time.perf_counter() - inicio) / llamadas * 1e6
+
+async def medir_ejecucion(
+    sesiones: async_sessionmaker, construir: Callable, args: tuple, llamadas: int
+) -> float:
+    """Microsegundos por llamada para ejecutar la consulta completa"""
+    async with sesiones() as db:
+        # Calentamiento: llena la caché de compilación del engine
+        (await db.execute(*_sentencia(construir, args))).unique().scalars().all()
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            (await db.execute(*_sentencia(construir, args))).unique().scalars().all()
+            db.expunge_all()
+        return (time.perf_counter() - inicio) / llamadas * 1e6
+
+def _fila(nombre: str, valores: List[float]) -> str:
+    return f"{nombre:>28} " + " ".join(f"{v:>13.1f}" for v in valores)
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--origen", type=Path, default=Path("cortinas.db"), help="Base de datos a copiar")
+    parser.add_argument("--llamadas", type=int, default=5000)
+    parser.add_argument("--rondas", type=int, default=5, help="Rondas alternadas de ejecución")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "bench.db"
+        shutil.copy(args.origen, ruta)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{ruta}")
+        sesiones = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        cabecera = f"{'consulta':>28} " + " ".join(f"{v:>13}" for v in VARIANTES)
+
+        construccion, ejecucion = [], []
+        try:
+            for nombre, (constructores, argumentos) in CONSULTAS.items():
+                construccion.append(_fila(nombre, [
+                    medir_construccion(c, argumentos, args.llamadas) for c in constructores
+                ]))
+                # Rondas alternadas; se toma la mejor de cada variante
+                rondas = [[] for _ in constructores]
+                for _ in range(args.rondas):
+                    for i, c in enumerate(constructores):
+                        rondas[i].append(await medir_ejecucion(
+                            sesiones, c, argumentos, args.llamadas // (5 * args.rondas) or 1
+                        ))
+                ejecucion.append(_fila(nombre, [min(r) for r in rondas]))
+        finally:
+            await engine.dispose()
+
+    print(f"Construcción, µs por llamada ({args.llamadas} llamadas)")
+    print(cabecera, *construccion, sep="\n")
+    print(f"\nEjecución, µs por llamada (mejor de {args.rondas} rondas)")
+    print(cabecera, *ejecucion, sep="\n")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,386 @@
+# app/bench/suite.py
+"""
+Suite de benchmarks de los caminos calientes de la API a varias escalas.
+
+Por cada escala (un preset de app.seed) genera una base sintética, la copia
+a un directorio temporal y mide cada escenario con sesiones nuevas por
+llamada, como una petición: rendimiento (operaciones por segundo) y
+latencias p50/p95/p99. Las funciones CRUD se llaman directamente, sin HTTP
+ni caché de respuestas, para que un acierto de caché no oculte una
+regresión; el snapshot del catálogo sí se carga, como en producción.
+
+    python -m app.bench
+    python -m app.bench --escalas demo 10k 1m --salida resultados.json
+    python -m app.bench --escenarios get_cortinas obtener_cortina --concurrencia 8
+    python -m app.bench --base base.json --tolerancia 0.15
+
+Con --base se comparan los resultados contra una ejecución anterior y el
+proceso termina con código 1 si algún escenario empeora más que la
+tolerancia (p95 o rendimiento). --desde compara un archivo de resultados
+existente sin volver a medir. Con --directorio las bases generadas se
+conservan y se reutilizan entre ejecuciones con la misma semilla.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import numpy as np
+import sqlalchemy
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from ..crud.cortina_crud import (
+    crear_cortina, get_consumo_materiales, get_cortinas,
+    get_estadisticas_cortinas, obtener_cortina
+)
+from ..crud.inventario_crud import get_alertas_stock, update_stock
+from ..migrations import run_migrations
+from ..models.cortina import Cortina
+from ..models.diseno import Diseno
+from ..models.inventario_insumo import InventarioInsumo
+from ..routes.export_routes import export_cortinas_to_excel
+from ..schemas.cortina_schema import CortinaCreate
+from ..schemas.inventario_schema import MovimientoInventario
+from ..seed import PRESETS, generar, parametros
+from ..utils.catalogo import catalogo
+from ..utils.sqlite_tuning import aplicar_perfil, usar_transacciones_explicitas
+
+logger = logging.getLogger(__name__)
+
+# Filas por página de get_cortinas y páginas recorridas
+TAMANO_PAGINA = 50
+PAGINAS = 20
+# Ids distintos que recorren obtener_cortina y update_stock
+MUESTRA_IDS = 1000
+
+# Unidad de trabajo: recibe una sesión nueva y el número de llamada
+Unidad = Callable[[AsyncSession, int], Awaitable[object]]
+
+@dataclass(frozen=True)
+class Escenario:
+    """Camino caliente a medir; preparar arma la unidad con datos de la base"""
+    nombre: str
+    escritura: bool
+    preparar: Callable[[AsyncSession, random.Random], Awaitable[Unidad]]
+
+async def _muestra(db: AsyncSession, columna, rng: random.Random) -> List[int]:
+    ids = (await db.execute(select(columna))).scalars().all()
+    if not ids:
+        raise SystemExit(f"La base no tiene filas en {columna.table.name}")
+    return rng.sample(ids, min(len(ids), MUESTRA_IDS))
+
+async def _crear_cortina(db: AsyncSession, rng: random.Random) -> Unidad:
+    # El diseño con más pedidos, el caso más frecuente
+    diseno_id = (await db.execute(
+        select(Cortina.diseno_id).group_by(Cortina.diseno_id).order_by(func.count().desc()).limit(1)
+    )).scalar() or (await db.execute(select(Diseno.id).limit(1))).scalar()
+    if diseno_id is None:
+        raise SystemExit("La base no tiene diseños para crear pedidos")
+    pedido = CortinaCreate(
+        diseno_id=diseno_id, ancho=150, alto=200, cliente="Benchmark",
+        telefono="0000000", email="bench@example.com", tipos_insumo=[]
+    )
+    return lambda session, _: crear_cortina(session, pedido)
+
+async def _get_cortinas(db: AsyncSession, rng: random.Random) -> Unidad:
+    return lambda session, i: get_cortinas(session, skip=(i % PAGINAS) * TAMANO_PAGINA, limit=TAMANO_PAGINA)
+
+async def _obtener_cortina(db: AsyncSession, rng: random.Random) -> Unidad:
+    ids = await _muestra(db, Cortina.id, rng)
+    return lambda session, i: obtener_cortina(session, ids[i % len(ids)])
+
+async def _update_stock(db: AsyncSession, rng: random.Random) -> Unidad:
+    ids = await _muestra(db, InventarioInsumo.id, rng)
+    movimiento = MovimientoInventario(cantidad=1, tipo_movimiento="entrada", motivo="Benchmark")
+    return lambda session, i: update_stock(session, ids[i % len(ids)], movimiento)
+
+async def _exportar_excel(db: AsyncSession, rng: random.Random) -> Unidad:
+    return lambda session, _: export_cortinas_to_excel(
+        estado=None, fecha_inicio=None, fecha_fin=None, db=session
+    )
+
+def _constante(funcion) -> Callable[[AsyncSession, random.Random], Awaitable[Unidad]]:
+    async def preparar(db: AsyncSession, rng: random.Random) -> Unidad:
+        return lambda session, _: funcion(session)
+    return preparar
+
+ESCENARIOS: Dict[str, Escenario] = {e.nombre: e for e in [
+    Escenario("get_cortinas", False, _get_cortinas),
+    Escenario("obtener_cortina", False, _obtener_cortina),
+    Escenario("get_estadisticas_cortinas", False, _constante(get_estadisticas_cortinas)),
+    Escenario("get_consumo_materiales", False, _constante(get_consumo_materiales)),
+    Escenario("get_alertas_stock", False, _constante(get_alertas_stock)),
+    Escenario("exportar_excel", False, _exportar_excel),
+    # Las escrituras al final: no alteran los datos que leen las anteriores
+    Escenario("update_stock", True, _update_stock),
+    Escenario("crear_cortina", True, _crear_cortina),
+]}
+
+def resumir(latencias: List[float], errores: int, duracion: float) -> Dict:
+    """Rendimiento y percentiles de latencia (ms) de una medición"""
+    if not latencias:
+        return {"iteraciones": 0, "errores": errores}
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    return {
+        "iteraciones": len(latencias),
+        "errores": errores,
+        "ops_por_segundo": round(len(latencias) / duracion, 1),
+        "media_ms": round(float(np.mean(latencias)), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(np.max(latencias)), 3)
+    }
+
+async def medir(
+    sesiones: async_sessionmaker, unidad: Unidad, iteraciones: int,
+    concurrencia: int, calentamiento: int, max_segundos: float
+) -> Dict:
+    """
+    Ejecuta la unidad con `concurrencia` clientes hasta completar las
+    iteraciones o agotar max_segundos. Las llamadas de calentamiento no
+    cuentan.
+    """
+    for i in range(calentamiento):
+        async with sesiones() as db:
+            await unidad(db, i)
+
+    latencias: List[float] = []
+    errores = 0
+    restantes = iter(range(calentamiento, calentamiento + iteraciones))
+    limite = time.perf_counter() + max_segundos
+
+    async def cliente():
+        nonlocal errores
+        for i in restantes:
+            if time.perf_counter() > limite:
+                return
+            inicio = time.perf_counter()
+            try:
+                async with sesiones() as db:
+                    await unidad(db, i)
+            except Exception as e:
+                errores += 1
+                logger.debug(f"Error en la llamada {i}: {str(e)}")
+                continue
+            latencias.append((time.perf_counter() - inicio) * 1000)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    return resumir(latencias, errores, time.perf_counter() - inicio)
+
+async def preparar_base(escala: str, semilla: int, directorio: Path) -> Path:
+    """Genera (o reutiliza) la base sintética de una escala"""
+    ruta = directorio / f"bench_{escala}_{semilla}.db"
+    if ruta.exists():
+        return ruta
+    parcial = ruta.with_suffix(".tmp")
+    parcial.unlink(missing_ok=True)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{parcial}")
+    aplicar_perfil(engine, "fast")
+    try:
+        await run_migrations(engine)
+        resultado = await generar(engine, parametros(escala, semilla=semilla))
+    finally:
+        await engine.dispose()
+    parcial.rename(ruta)
+    print(f"  base {escala} generada en {resultado['segundos_total']} s", file=sys.stderr)
+    return ruta
+
+def _engines(ruta: Path) -> tuple:
+    """Motor de escritura y de solo lectura sobre la base, como en app.database"""
+    escritor = create_async_engine(f"sqlite+aiosqlite:///{ruta}", connect_args={"check_same_thread": False})
+    aplicar_perfil(escritor)
+    usar_transacciones_explicitas(escritor)
+    lector = create_async_engine(
+        f"sqlite+aiosqlite:///file:{ruta}?mode=ro&uri=true", connect_args={"check_same_thread": False}
+    )
+    aplicar_perfil(lector, omitir=("journal_mode",), adicionales={"query_only": "ON"})
+    return escritor, lector
+
+async def medir_escala(
+    origen: Path, escala: str, escenarios: List[str], args: argparse.Namespace
+) -> List[Dict]:
+    """Mide los escenarios sobre una copia de la base de la escala"""
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "bench.db"
+        shutil.copy(origen, ruta)
+        escritor, lector = _engines(ruta)
+        sesiones = {
+            motor: async_sessionmaker(motor, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+            for motor in (escritor, lector)
+        }
+        try:
+            await run_migrations(escritor)
+            await catalogo.cargar(lector)
+            async with sesiones[lector]() as db:
+                cortinas = (await db.execute(select(func.count()).select_from(Cortina))).scalar()
+
+            for nombre in escenarios:
+                escenario = ESCENARIOS[nombre]
+                fabrica = sesiones[escritor if escenario.escritura else lector]
+                async with fabrica() as db:
+                    unidad = await escenario.preparar(db, random.Random(args.semilla))
+                # crear_cortina imprime trazas de depuración en cada llamada
+                with contextlib.redirect_stdout(io.StringIO()):
+                    medicion = await medir(
+                        fabrica, unidad, args.iteraciones, args.concurrencia,
+                        args.calentamiento, args.max_segundos
+                    )
+                resultado = {"escala": escala, "cortinas": cortinas, "escenario": nombre, **medicion}
+                resultados.append(resultado)
+                print(_fila(resultado), file=sys.stderr)
+        finally:
+            catalogo.descartar()
+            await escritor.dispose()
+            await lector.dispose()
+    return resultados
+
+def _clave(resultado: Dict) -> tuple:
+    return resultado["escala"], resultado["escenario"]
+
+def comparar(actuales: List[Dict], base: List[Dict], tolerancia: float, umbral_ms: float) -> List[Dict]:
+    """
+    Compara cada (escala, escenario) presente en ambas ejecuciones.
+
+    Es regresión si el p95 crece más que la tolerancia relativa y más que
+    umbral_ms en absoluto (el ruido de latencias muy bajas no cuenta), o si
+    el rendimiento cae más que la tolerancia.
+    """
+    anteriores = {_clave(r): r for r in base}
+    comparacion = []
+    for actual in actuales:
+        anterior = anteriores.get(_clave(actual))
+        if anterior is None or not actual.get("iteraciones") or not anterior.get("iteraciones"):
+            continue
+        cambio_p95 = actual["p95_ms"] / anterior["p95_ms"] - 1 if anterior["p95_ms"] else 0.0
+        cambio_ops = actual["ops_por_segundo"] / anterior["ops_por_segundo"] - 1
+        regresion = (
+            (cambio_p95 > tolerancia and actual["p95_ms"] - anterior["p95_ms"] > umbral_ms)
+            or cambio_ops < -tolerancia
+        )
+        comparacion.append({
+            "escala": actual["escala"],
+            "escenario": actual["escenario"],
+            "p95_ms_base": anterior["p95_ms"],
+            "p95_ms": actual["p95_ms"],
+            "cambio_p95": round(cambio_p95, 4),
+            "ops_por_segundo_base": anterior["ops_por_segundo"],
+            "ops_por_segundo": actual["ops_por_segundo"],
+            "cambio_ops": round(cambio_ops, 4),
+            "regresion": regresion
+        })
+    return comparacion
+
+def _fila(r: Dict) -> str:
+    if not r.get("iteraciones"):
+        return f"{r['escala']:>6} {r['escenario']:<26} sin llamadas exitosas (errores {r['errores']})"
+    return (
+        f"{r['escala']:>6} {r['escenario']:<26} {r['ops_por_segundo']:>9.1f} ops/s  "
+        f"p50 {r['p50_ms']:>9.2f}  p95 {r['p95_ms']:>9.2f}  p99 {r['p99_ms']:>9.2f} ms"
+        + (f"  errores {r['errores']}" if r["errores"] else "")
+    )
+
+def _imprimir_comparacion(comparacion: List[Dict]) -> None:
+    print(
+        f"\n{'escala':>6} {'escenario':<26} {'p95 base':>10} {'p95':>10} {'Δp95':>8} {'Δops/s':>8}",
+        file=sys.stderr
+    )
+    for c in comparacion:
+        print(
+            f"{c['escala']:>6} {c['escenario']:<26} {c['p95_ms_base']:>10.2f} {c['p95_ms']:>10.2f} "
+            f"{c['cambio_p95']:>+8.1%} {c['cambio_ops']:>+8.1%}"
+            + ("  REGRESIÓN" if c["regresion"] else ""),
+            file=sys.stderr
+        )
+
+async def ejecutar(args: argparse.Namespace) -> Dict:
+    """Genera las bases y mide todas las escalas"""
+    resultados: List[Dict] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directorio = args.directorio or Path(tmp)
+        directorio.mkdir(parents=True, exist_ok=True)
+        for escala in args.escalas:
+            origen = await preparar_base(escala, args.semilla, directorio)
+            resultados.extend(await medir_escala(origen, escala, args.escenarios, args))
+    return {
+        "fecha": datetime.utcnow().isoformat(timespec="seconds"),
+        "entorno": {
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "plataforma": platform.platform()
+        },
+        "parametros": {
+            "escalas": args.escalas,
+            "semilla": args.semilla,
+            "iteraciones": args.iteraciones,
+            "calentamiento": args.calentamiento,
+            "concurrencia": args.concurrencia,
+            "max_segundos": args.max_segundos
+        },
+        "resultados": resultados
+    }
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.bench", description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--escalas", nargs="+", choices=list(PRESETS), default=["demo", "10k"])
+    parser.add_argument("--escenarios", nargs="+", choices=list(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--iteraciones", type=int, default=200, help="Llamadas medidas por escenario")
+    parser.add_argument("--calentamiento", type=int, default=5)
+    parser.add_argument("--concurrencia", type=int, default=1, help="Clientes simultáneos")
+    parser.add_argument("--max-segundos", type=float, default=20.0,
+                        help="Tiempo máximo por escenario; corta las iteraciones restantes")
+    parser.add_argument("--directorio", type=Path, help="Conserva y reutiliza las bases generadas")
+    parser.add_argument("--salida", type=Path, help="Archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument("--base", type=Path, help="Resultados anteriores contra los que comparar")
+    parser.add_argument("--desde", type=Path, help="Compara este archivo de resultados sin medir")
+    parser.add_argument("--tolerancia", type=float, default=0.20,
+                        help="Empeoramiento relativo admitido antes de marcar regresión")
+    parser.add_argument("--umbral-ms", type=float, default=0.5,
+                        help="Aumento mínimo del p95 en ms para marcar regresión")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    # app.database configura logging en INFO; la salida de la suite es la tabla
+    logging.getLogger("app").setLevel(logging.DEBUG if args.verbose else logging.WARNING)
+
+    if args.desde:
+        informe = json.loads(args.desde.read_text(encoding="utf-8"))
+    else:
+        informe = await ejecutar(args)
+
+    if args.base:
+        base = json.loads(args.base.read_text(encoding="utf-8"))
+        informe["comparacion"] = comparar(
+            informe["resultados"], base["resultados"], args.tolerancia, args.umbral_ms
+        )
+        _imprimir_comparacion(informe["comparacion"])
+
+    contenido = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida and not args.desde:
+        args.salida.write_text(contenido + "\n", encoding="utf-8")
+    elif not args.desde:
+        print(contenido)
+
+    return 1 if any(c["regresion"] for c in informe.get("comparacion", [])) else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
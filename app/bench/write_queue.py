@@ -0,0 +1,130 @@
+# app/bench/write_queue.py
+"""
+Benchmark de escrituras por segundo con y sin la cola de escritura.
+
+Compara, para 1, 10 y 100 clientes concurrentes, las escrituras directas
+(cada petición confirma su propia transacción) con la cola de un solo
+escritor y commit agrupado. Trabaja sobre una copia temporal de la base:
+
+    python -m app.bench.write_queue --escrituras 500
+    python -m app.bench.write_queue --operacion stock --clientes 1 10 100
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from ..crud.cortina_crud import crear_cortina
+from ..crud.inventario_crud import update_stock
+from ..database import DB_WRITE_POOL_SIZE
+from ..migrations import run_migrations
+from ..models.diseno import Diseno
+from ..models.inventario_insumo import InventarioInsumo
+from ..schemas.cortina_schema import CortinaCreate
+from ..schemas.inventario_schema import MovimientoInventario
+from ..utils.sqlite_tuning import PERFILES, aplicar_perfil, usar_transacciones_explicitas
+from ..utils.write_queue import WriteQueue
+
+MODOS = ("directo", "cola")
+
+async def _preparar_unidad(sesiones: async_sessionmaker, operacion: str):
+    async with sesiones() as db:
+        if operacion == "cortina":
+            diseno_id = (await db.execute(select(Diseno.id).limit(1))).scalar()
+            if diseno_id is None:
+                raise SystemExit("La base no tiene diseños para crear pedidos")
+            pedido = CortinaCreate(
+                diseno_id=diseno_id, ancho=150, alto=200, cliente="Benchmark",
+                telefono="0000000", email="bench@example.com", tipos_insumo=[]
+            )
+            return lambda session: crear_cortina(session, pedido)
+
+        inventario_id = (await db.execute(select(InventarioInsumo.id).limit(1))).scalar()
+        if inventario_id is None:
+            raise SystemExit("La base no tiene inventario para registrar movimientos")
+        movimiento = MovimientoInventario(cantidad=1, tipo_movimiento="entrada", motivo="Benchmark")
+        return lambda session: update_stock(session, inventario_id, movimiento)
+
+async def medir(
+    origen: Path, modo: str, clientes: int, escrituras: int,
+    operacion: str, perfil: str, pool: int
+) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "bench.db"
+        shutil.copy(origen, ruta)
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{ruta}", pool_size=pool, max_overflow=0
+        )
+        aplicar_perfil(engine, perfil)
+        usar_transacciones_explicitas(engine)
+        sesiones = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        cola = WriteQueue(session_factory=sesiones)
+
+        try:
+            await run_migrations(engine)
+            unidad = await _preparar_unidad(sesiones, operacion)
+            restantes = iter(range(escrituras))
+            completadas = errores = 0
+
+            async def cliente():
+                nonlocal completadas, errores
+                for _ in restantes:
+                    try:
+                        if modo == "cola":
+                            await cola.enviar(unidad)
+                        else:
+                            async with sesiones() as db:
+                                await unidad(db)
+                        completadas += 1
+                    except Exception:
+                        errores += 1
+
+            inicio = time.perf_counter()
+            # crear_cortina imprime trazas de depuración en cada llamada
+            with contextlib.redirect_stdout(io.StringIO()):
+                await asyncio.gather(*(cliente() for _ in range(clientes)))
+                await cola.cerrar()
+            total = time.perf_counter() - inicio
+        finally:
+            await engine.dispose()
+
+    return {
+        "modo": modo,
+        "clientes": clientes,
+        "escrituras_por_segundo": round(completadas / total, 1),
+        "errores": errores
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--origen", type=Path, default=Path("cortinas.db"), help="Base de datos a copiar")
+    parser.add_argument("--escrituras", type=int, default=500)
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--operacion", choices=["cortina", "stock"], default="cortina")
+    parser.add_argument("--perfil", choices=list(PERFILES), default="durable")
+    parser.add_argument("--pool", type=int, default=DB_WRITE_POOL_SIZE,
+                        help="Conexiones del pool en modo directo")
+    args = parser.parse_args()
+
+    print(f"{args.escrituras} escrituras ({args.operacion}), perfil {args.perfil}")
+    for clientes in args.clientes:
+        for modo in MODOS:
+            r = await medir(
+                args.origen, modo, clientes, args.escrituras,
+                args.operacion, args.perfil, args.pool
+            )
+            print(
+                f"{r['clientes']:>4} clientes {r['modo']:>8}: "
+                f"{r['escrituras_por_segundo']:8.1f} escrituras/s, errores {r['errores']}"
+            )
+
+if __name__ == "__main__":
+    asyncio.run(main())
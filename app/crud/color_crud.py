@@ -8,6 +8,9 @@ from ..models.color_insumo import ColorInsumo
 # from ..models.inventario_insumo import InventarioInsumo
 from ..schemas.color_insumo_schema import ColorInsumoCreate, ColorInsumoUpdate
 from ..utils.transaction import transaction_scope
+from ..utils.cache_http import etiquetar
+from ..utils.catalogo import catalogo, coincide
+from . import statements
 
 async def create_color(db: AsyncSession, color: ColorInsumoCreate) -> ColorInsumo:
     """
@@ -24,6 +27,7 @@ async def create_color(db: AsyncSession, color: ColorInsumoCreate) -> ColorInsum
         ValueError: If validation fails or duplicate code exists
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "colores_insumo")
         # Check if code exists for this reference
         stmt = select(ColorInsumo).where(
             and_(
@@ -42,7 +46,9 @@ async def create_color(db: AsyncSession, color: ColorInsumoCreate) -> ColorInsum
         db_color = ColorInsumo(**color.dict())
         tx.add(db_color)
         await tx.flush()
-        return db_color
+
+    await catalogo.recargar()
+    return db_color
 
 async def get_color(db: AsyncSession, color_id: int) -> Optional[ColorInsumo]:
     """
@@ -55,8 +61,11 @@ async def get_color(db: AsyncSession, color_id: int) -> Optional[ColorInsumo]:
     Returns:
         Optional[ColorInsumo]: The found color or None
     """
-    stmt = select(ColorInsumo).where(ColorInsumo.id == color_id)
-    result = await db.execute(stmt)
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        return snapshot.colores.get(color_id)
+
+    result = await db.execute(statements.COLOR_POR_ID, {"color_id": color_id})
     return result.scalar_one_or_none()
 
 async def get_colores_by_referencia(
@@ -75,6 +84,10 @@ async def get_colores_by_referencia(
     Returns:
         List[ColorInsumo]: List of matching colors
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        return list(snapshot.colores_por_referencia.get(referencia_id, ()))
+
     query = select(ColorInsumo).where(ColorInsumo.referencia_id == referencia_id)
     
     # if solo_disponibles:
@@ -105,6 +118,7 @@ async def update_color(
         Optional[ColorInsumo]: The updated color or None if not found
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "colores_insumo")
         # Find the color
         stmt = select(ColorInsumo).where(ColorInsumo.id == color_id)
         result = await tx.execute(stmt)
@@ -135,7 +149,9 @@ async def update_color(
             setattr(db_color, field, value)
         
         db_color.fecha_actualizacion = datetime.utcnow()
-        return db_color
+
+    await catalogo.recargar()
+    return db_color
 
 async def search_colores(
     db: AsyncSession,
@@ -153,6 +169,17 @@ async def search_colores(
     Returns:
         List[ColorInsumo]: List of matching colors
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        return sorted(
+            (
+                c for c in snapshot.colores.values()
+                if coincide(termino, c.nombre, c.codigo)
+                and (not referencia_id or c.referencia_id == referencia_id)
+            ),
+            key=lambda c: c.nombre
+        )
+
     # Create base query
     query = select(ColorInsumo)
     
@@ -190,6 +217,7 @@ async def delete_color(db: AsyncSession, color_id: int) -> bool:
         ValueError: If the color has associated inventory
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "colores_insumo")
         # Find the color
         stmt = select(ColorInsumo).where(ColorInsumo.id == color_id)
         result = await tx.execute(stmt)
@@ -209,7 +237,9 @@ async def delete_color(db: AsyncSession, color_id: int) -> bool:
         #     )
 
         await tx.delete(db_color)
-        return True
+
+    await catalogo.recargar()
+    return True
 
 async def get_colores_with_stock(
     db: AsyncSession,
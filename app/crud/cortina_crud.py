@@ -1,7 +1,7 @@
 # app/crud/cortina_crud.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, text
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy import select, and_, or_, text, func
+from sqlalchemy.orm import selectinload, joinedload, aliased
 from typing import List, Optional, Dict, Tuple
 from decimal import Decimal
 from datetime import datetime
@@ -21,12 +21,22 @@ from ..schemas.cortina_schema import CortinaCreate, CortinaUpdate
 from ..schemas.inventario_schema import MovimientoInventario
 from ..utils.exceptions import CortinasException
 from ..utils.transaction import transaction_scope
+from ..utils.cache_http import etiquetar
+from ..utils.catalogo import catalogo
+from . import statements
+from .cortina_historico_crud import incluir_archivo, fuente_cortinas
 from ..crud.inventario_crud import get_inventario_by_color_ref, update_stock
 
 async def get_diseno_con_relaciones(db: AsyncSession, diseno_id: int) -> Optional[Diseno]:
     """
     Carga un diseño con todas sus relaciones y precios.
+
+    Con el catálogo cargado se toma del snapshot en memoria.
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        return snapshot.disenos.get(diseno_id)
+
     print("\n=== Debugging get_diseno_con_relaciones ===")
     stmt = (
         select(Diseno)
@@ -100,11 +110,15 @@ async def crear_cortina(db: AsyncSession, cortina: CortinaCreate) -> Cortina:
                 print(f"Tipo insumo recibido: {tipo}")
                 if 'referencia_id' in tipo:
                     # Verificar que la referencia existe y tiene precio
-                    ref_stmt = select(ReferenciaInsumo).where(
-                        ReferenciaInsumo.id == tipo['referencia_id']
-                    )
-                    ref_result = await db.execute(ref_stmt)
-                    referencia = ref_result.scalar_one_or_none()
+                    snapshot = catalogo.actual()
+                    if snapshot is not None:
+                        referencia = snapshot.referencias.get(tipo['referencia_id'])
+                    else:
+                        ref_stmt = select(ReferenciaInsumo).where(
+                            ReferenciaInsumo.id == tipo['referencia_id']
+                        )
+                        ref_result = await db.execute(ref_stmt)
+                        referencia = ref_result.scalar_one_or_none()
                     if referencia:
                         print(f"Referencia encontrada: {referencia.codigo}, Precio: {referencia.precio_unitario}")
                         precio += referencia.precio_unitario
@@ -115,6 +129,7 @@ async def crear_cortina(db: AsyncSession, cortina: CortinaCreate) -> Cortina:
     Crea una nueva cortina con sus cálculos y actualizaciones de inventario.
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "cortinas")
         # Verificar el diseño
         diseno = await get_diseno_con_relaciones(db, cortina.diseno_id)
         if not diseno:
@@ -169,24 +184,22 @@ async def obtener_cortina(db: AsyncSession, cortina_id: int) -> Optional[Cortina
     Returns:
         Optional[Cortina]: The found curtain or None
     """
-    stmt = (
-        select(Cortina)
-        .options(
-            selectinload(Cortina.diseno)
-            .selectinload(Diseno.tipos_insumo)
-            .joinedload(DisenoTipoInsumo.tipo_insumo),
-            selectinload(Cortina.diseno)
-            .selectinload(Diseno.tipos_insumo)
-            .joinedload(DisenoTipoInsumo.referencia),
-            selectinload(Cortina.diseno)
-            .selectinload(Diseno.tipos_insumo)
-            .joinedload(DisenoTipoInsumo.color)
-        )
-        .where(Cortina.id == cortina_id)
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(statements.CORTINA_POR_ID, {"cortina_id": cortina_id})
     return result.unique().scalar_one_or_none()
 
+async def _entidad_cortinas(
+    db: AsyncSession,
+    fecha_inicio: Optional[datetime],
+    fecha_fin: Optional[datetime]
+):
+    """
+    Cortina, or Cortina mapped onto the union with cortinas_historico when the
+    date range reaches archived curtains; either way rows load as Cortina.
+    """
+    if await incluir_archivo(db, fecha_inicio, fecha_fin):
+        return aliased(Cortina, fuente_cortinas(True))
+    return Cortina
+
 async def get_cortinas(
     db: AsyncSession,
     skip: int = 0,
@@ -197,6 +210,10 @@ async def get_cortinas(
 ) -> List[Cortina]:
     """
     Retrieves a list of curtains with optional filtering and comprehensive eager loading.
+
+    When the date range reaches archived curtains, Cortina is mapped onto the
+    union of cortinas and cortinas_historico and paged there with OFFSET/LIMIT,
+    so archived rows come back as Cortina instances too.
     
     Args:
         db: Async database session
@@ -209,31 +226,32 @@ async def get_cortinas(
     Returns:
         List[Cortina]: List of matching curtains
     """
+    fuente = await _entidad_cortinas(db, fecha_inicio, fecha_fin)
     query = (
-        select(Cortina)
+        select(fuente)
         .options(
-            selectinload(Cortina.diseno)
+            selectinload(fuente.diseno)
             .selectinload(Diseno.tipos_insumo)
             .joinedload(DisenoTipoInsumo.tipo_insumo),
-            selectinload(Cortina.diseno)
+            selectinload(fuente.diseno)
             .selectinload(Diseno.tipos_insumo)
             .joinedload(DisenoTipoInsumo.referencia),
-            selectinload(Cortina.diseno)
+            selectinload(fuente.diseno)
             .selectinload(Diseno.tipos_insumo)
             .joinedload(DisenoTipoInsumo.color)
         )
     )
     
     if estado:
-        query = query.where(Cortina.estado == estado)
+        query = query.where(fuente.estado == estado)
     
     if fecha_inicio:
-        query = query.where(Cortina.fecha_creacion >= fecha_inicio)
+        query = query.where(fuente.fecha_creacion >= fecha_inicio)
     
     if fecha_fin:
-        query = query.where(Cortina.fecha_creacion <= fecha_fin)
+        query = query.where(fuente.fecha_creacion <= fecha_fin)
     
-    query = query.order_by(Cortina.fecha_creacion.desc())
+    query = query.order_by(fuente.fecha_creacion.desc())
     query = query.offset(skip).limit(limit)
     
     result = await db.execute(query)
@@ -249,6 +267,7 @@ async def update_cortina(
     """
     try:
         async with transaction_scope(db) as tx:
+            etiquetar(tx, "cortinas")
             # Find the curtain
             stmt = select(Cortina).where(Cortina.id == cortina_id)
             result = await tx.execute(stmt)
@@ -296,6 +315,7 @@ async def delete_cortina(db: AsyncSession, cortina_id: int) -> bool:
         ValueError: If the curtain cannot be deleted
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "cortinas")
         db_cortina = await obtener_cortina(tx, cortina_id)
         if not db_cortina:
             return False
@@ -541,6 +561,9 @@ async def get_estadisticas_cortinas(
 ) -> Dict[str, any]:
     """
     Generate comprehensive statistics about curtain production.
+
+    Aggregates run in the database; archived curtains are included when the
+    date range reaches them.
     
     This function calculates:
     1. Total number of curtains produced
@@ -557,20 +580,20 @@ async def get_estadisticas_cortinas(
     Returns:
         Dict containing various statistics about curtain production
     """
-    query = select(Cortina).options(
-        selectinload(Cortina.diseno)
-    )
-    
+    fuente = fuente_cortinas(await incluir_archivo(db, fecha_inicio, fecha_fin))
+
+    condiciones = []
     if fecha_inicio:
-        query = query.where(Cortina.fecha_creacion >= fecha_inicio)
+        condiciones.append(fuente.c.fecha_creacion >= fecha_inicio)
     if fecha_fin:
-        query = query.where(Cortina.fecha_creacion <= fecha_fin)
-    
-    result = await db.execute(query)
-    cortinas = result.scalars().all()
-    
-    # Calculate basic statistics
-    total_cortinas = len(cortinas)
+        condiciones.append(fuente.c.fecha_creacion <= fecha_fin)
+
+    totales = (await db.execute(
+        select(func.count(), func.avg(fuente.c.costo_total))
+        .select_from(fuente)
+        .where(*condiciones)
+    )).one()
+    total_cortinas = totales[0]
     if total_cortinas == 0:
         return {
             "total_cortinas": 0,
@@ -578,32 +601,27 @@ async def get_estadisticas_cortinas(
             "disenos_populares": [],
             "estado_distribucion": {}
         }
-    
-    # Calculate average cost
-    costo_total = sum(c.costo_total for c in cortinas)
-    costo_promedio = costo_total / total_cortinas
-    
-    # Count designs
-    disenos_count = {}
-    for cortina in cortinas:
-        diseno_nombre = cortina.diseno.nombre
-        disenos_count[diseno_nombre] = disenos_count.get(diseno_nombre, 0) + 1
-    
-    # Get most popular designs
-    disenos_populares = sorted(
-        disenos_count.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:5]
-    
-    # Calculate status distribution
-    estado_distribucion = {}
-    for cortina in cortinas:
-        estado_distribucion[cortina.estado] = estado_distribucion.get(cortina.estado, 0) + 1
-    
+
+    cantidad = func.count().label("cantidad")
+    disenos_populares = (await db.execute(
+        select(Diseno.nombre, cantidad)
+        .select_from(fuente)
+        .join(Diseno, fuente.c.diseno_id == Diseno.id)
+        .where(*condiciones)
+        .group_by(Diseno.nombre)
+        .order_by(cantidad.desc())
+        .limit(5)
+    )).all()
+
+    estado_distribucion = dict((await db.execute(
+        select(fuente.c.estado, func.count())
+        .where(*condiciones)
+        .group_by(fuente.c.estado)
+    )).all())
+
     return {
         "total_cortinas": total_cortinas,
-        "costo_promedio": round(costo_promedio, 2),
+        "costo_promedio": round(float(totales[1]), 2),
         "disenos_populares": [
             {"diseno": nombre, "cantidad": cantidad}
             for nombre, cantidad in disenos_populares
@@ -663,6 +681,10 @@ async def get_consumo_materiales(
 ) -> List[Dict[str, any]]:
     """
     Calculate material consumption statistics for curtain production.
+
+    Consumption per curtain is cantidad_por_metro * ancho / 100 * multiplicador,
+    aggregated in the database per (supply type, reference). Archived curtains
+    are included when the date range reaches them.
     
     This function helps with:
     1. Inventory planning
@@ -678,70 +700,47 @@ async def get_consumo_materiales(
     Returns:
         List[Dict]: Material consumption statistics
     """
-    # First get all relevant curtains
+    fuente = fuente_cortinas(await incluir_archivo(db, fecha_inicio, fecha_fin))
+    cantidad = (
+        DisenoTipoInsumo.cantidad_por_metro
+        * fuente.c.ancho / 100
+        * func.coalesce(fuente.c.multiplicador, 1)
+    )
+    cantidad_total = func.sum(cantidad).label("cantidad_total")
+
     query = (
-        select(Cortina)
-        .options(
-            selectinload(Cortina.diseno)
-            .selectinload(Diseno.tipos_insumo)
-            .joinedload(DisenoTipoInsumo.tipo_insumo),
-            selectinload(Cortina.diseno)
-            .selectinload(Diseno.tipos_insumo)
-            .joinedload(DisenoTipoInsumo.referencia)
+        select(
+            TipoInsumo.nombre.label("tipo_insumo"),
+            ReferenciaInsumo.codigo.label("referencia"),
+            cantidad_total,
+            func.count().label("cortinas_count"),
+            func.sum(cantidad * ReferenciaInsumo.precio_unitario).label("costo_total")
         )
+        .select_from(fuente)
+        .join(DisenoTipoInsumo, DisenoTipoInsumo.diseno_id == fuente.c.diseno_id)
+        .join(TipoInsumo, TipoInsumo.id == DisenoTipoInsumo.tipo_insumo_id)
+        .join(ReferenciaInsumo, ReferenciaInsumo.id == DisenoTipoInsumo.referencia_id)
+        .group_by(TipoInsumo.nombre, ReferenciaInsumo.codigo)
+        .order_by(cantidad_total.desc())
     )
-    
+
     if fecha_inicio:
-        query = query.where(Cortina.fecha_creacion >= fecha_inicio)
+        query = query.where(fuente.c.fecha_creacion >= fecha_inicio)
     if fecha_fin:
-        query = query.where(Cortina.fecha_creacion <= fecha_fin)
-    
+        query = query.where(fuente.c.fecha_creacion <= fecha_fin)
+
     result = await db.execute(query)
-    cortinas = result.scalars().all()
-    
-    # Calculate consumption for each material
-    consumo = {}
-    for cortina in cortinas:
-        for tipo_insumo_rel in cortina.diseno.tipos_insumo:
-            cantidad = (
-                tipo_insumo_rel.cantidad_por_metro * 
-                (cortina.ancho / 100) * 
-                cortina.multiplicador
-            )
-            
-            key = (
-                tipo_insumo_rel.tipo_insumo.nombre,
-                tipo_insumo_rel.referencia.codigo
-            )
-            
-            if key not in consumo:
-                consumo[key] = {
-                    "tipo_insumo": tipo_insumo_rel.tipo_insumo.nombre,
-                    "referencia": tipo_insumo_rel.referencia.codigo,
-                    "cantidad_total": 0,
-                    "cortinas_count": 0,
-                    "costo_total": 0
-                }
-            
-            consumo[key]["cantidad_total"] += cantidad
-            consumo[key]["cortinas_count"] += 1
-            consumo[key]["costo_total"] += (
-                cantidad * tipo_insumo_rel.referencia.precio_unitario
-            )
-    
-    # Convert to list and calculate averages
     resultado = []
-    for stats in consumo.values():
-        stats["cantidad_promedio"] = (
-            stats["cantidad_total"] / stats["cortinas_count"]
-        )
-        stats["costo_promedio"] = (
-            stats["costo_total"] / stats["cortinas_count"]
-        )
+    for row in result.mappings():
+        stats = {
+            "tipo_insumo": row["tipo_insumo"],
+            "referencia": row["referencia"],
+            "cantidad_total": float(row["cantidad_total"]),
+            "cortinas_count": row["cortinas_count"],
+            "costo_total": float(row["costo_total"])
+        }
+        stats["cantidad_promedio"] = stats["cantidad_total"] / stats["cortinas_count"]
+        stats["costo_promedio"] = stats["costo_total"] / stats["cortinas_count"]
         resultado.append(stats)
-    
-    return sorted(
-        resultado,
-        key=lambda x: x["cantidad_total"],
-        reverse=True
-    )
\ No newline at end of file
+
+    return resultado
@@ -0,0 +1,70 @@
+# app/crud/cortina_historico_crud.py
+"""
+Read-side helpers for the curtain archive (cortinas_historico).
+
+Reads only touch the archive when the requested date range reaches archived
+rows; otherwise they keep scanning the hot `cortinas` table alone.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, literal, select, union_all
+from typing import Optional
+from datetime import datetime
+
+from ..models.cortina import Cortina
+from ..models.cortina_historico import CortinaHistorico
+
+# Columns shared by cortinas and cortinas_historico, in the same order
+COLUMNAS = [c.name for c in Cortina.__table__.columns]
+
+def stmt_archivo_en_rango(
+    fecha_inicio: Optional[datetime],
+    fecha_fin: Optional[datetime]
+) -> Select:
+    """Index-backed probe that returns one row if the archive has curtains in the range."""
+    stmt = select(literal(1)).select_from(CortinaHistorico.__table__)
+    if fecha_inicio:
+        stmt = stmt.where(CortinaHistorico.fecha_creacion >= fecha_inicio)
+    if fecha_fin:
+        stmt = stmt.where(CortinaHistorico.fecha_creacion <= fecha_fin)
+    return stmt.limit(1)
+
+async def incluir_archivo(
+    db: AsyncSession,
+    fecha_inicio: Optional[datetime],
+    fecha_fin: Optional[datetime]
+) -> bool:
+    """
+    Whether a read over the given date range must include the archive.
+
+    Without a date range only the hot table is read; with one, the archive
+    is included only if it holds rows inside the range.
+    """
+    if fecha_inicio is None and fecha_fin is None:
+        return False
+    result = await db.execute(stmt_archivo_en_rango(fecha_inicio, fecha_fin))
+    return result.first() is not None
+
+def fuente_cortinas(incluir: bool):
+    """
+    Table or subquery with the cortinas columns to aggregate over.
+
+    Columns are reached through .c (fuente.c.fecha_creacion, ...).
+    """
+    if not incluir:
+        return Cortina.__table__
+    activas = Cortina.__table__
+    archivadas = CortinaHistorico.__table__
+    return union_all(
+        select(*[activas.c[n] for n in COLUMNAS]),
+        select(*[archivadas.c[n] for n in COLUMNAS])
+    ).subquery("cortinas")
+
+def fuente_cortinas_sql(incluir: bool) -> str:
+    """Textual counterpart of fuente_cortinas for raw SQL (FROM {fuente} c)."""
+    if not incluir:
+        return "cortinas"
+    columnas = ", ".join(COLUMNAS)
+    return (
+        f"(SELECT {columnas} FROM cortinas "
+        f"UNION ALL SELECT {columnas} FROM cortinas_historico)"
+    )
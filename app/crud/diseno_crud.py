@@ -8,6 +8,8 @@ from datetime import datetime
 from ..models.diseno import Diseno, DisenoTipoInsumo
 from ..schemas.diseno_schema import DisenoCreate, DisenoUpdate
 from ..utils.transaction import transaction_scope
+from ..utils.cache_http import etiquetar
+from ..utils.catalogo import catalogo, coincide, paginar
 
 async def create_diseno(
     db: AsyncSession,
@@ -18,27 +20,30 @@ async def create_diseno(
     Creates a design with its required material types.
     Now only associates types of materials, not specific references.
     """
-    # Create the design first
-    diseno = Diseno(
-        id_diseno=design_data["codigo"],
-        nombre=design_data["nombre"],
-        descripcion=design_data["descripcion"],
-        costo_mano_obra=design_data["costo_mano_obra"],
-        complejidad=design_data["complejidad"]
-    )
-    db.add(diseno)
-    await db.flush()  # Get the ID
-    
-    # Add the required material types
-    for material in design_data["tipos_insumo"]:
-        tipo_insumo_rel = DisenoTipoInsumo(
-            diseno_id=diseno.id,
-            tipo_insumo_id=tipos_insumo[material["tipo_insumo"]].id,
-            cantidad_por_metro=material["cantidad_por_metro"],
-            descripcion=material["descripcion"]
+    async with transaction_scope(db) as tx:
+        etiquetar(tx, "disenos", "diseno_tipos_insumo")
+        # Create the design first
+        diseno = Diseno(
+            id_diseno=design_data["codigo"],
+            nombre=design_data["nombre"],
+            descripcion=design_data["descripcion"],
+            costo_mano_obra=design_data["costo_mano_obra"],
+            complejidad=design_data["complejidad"]
         )
-        db.add(tipo_insumo_rel)
-    
+        tx.add(diseno)
+        await tx.flush()  # Get the ID
+
+        # Add the required material types
+        for material in design_data["tipos_insumo"]:
+            tipo_insumo_rel = DisenoTipoInsumo(
+                diseno_id=diseno.id,
+                tipo_insumo_id=tipos_insumo[material["tipo_insumo"]].id,
+                cantidad_por_metro=material["cantidad_por_metro"],
+                descripcion=material["descripcion"]
+            )
+            tx.add(tipo_insumo_rel)
+
+    await catalogo.recargar()
     return diseno
 
 async def get_diseno(db: AsyncSession, diseno_id: int) -> Optional[Diseno]:
@@ -52,6 +57,10 @@ async def get_diseno(db: AsyncSession, diseno_id: int) -> Optional[Diseno]:
     Returns:
         Optional[Diseno]: The found design or None
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        return snapshot.disenos.get(diseno_id)
+
     stmt = (
         select(Diseno)
         .options(joinedload(Diseno.tipos_insumo))
@@ -72,6 +81,10 @@ async def get_diseno_by_codigo(db: AsyncSession, id_diseno: str) -> Optional[Dis
     Returns:
         Optional[Diseno]: The found design or None
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        return snapshot.disenos_por_codigo.get(id_diseno)
+
     stmt = (
         select(Diseno)
         .options(joinedload(Diseno.tipos_insumo))
@@ -99,6 +112,14 @@ async def get_disenos(
     Returns:
         List[Diseno]: List of matching designs
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        disenos = [
+            d for d in snapshot.disenos.values()
+            if coincide(search, d.nombre, d.id_diseno)
+        ]
+        return paginar(disenos, skip, limit)
+
     # Create base query with eager loading
     query = (
         select(Diseno)
@@ -140,6 +161,7 @@ async def update_diseno(
         Optional[Diseno]: The updated design or None if not found
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "disenos", "diseno_tipos_insumo")
         # Find the existing design with its current types and cortinas
         stmt = (
             select(Diseno)
@@ -184,4 +206,6 @@ async def update_diseno(
             db_diseno.tipos_insumo = new_tipos_insumo
 
         db_diseno.fecha_actualizacion = datetime.utcnow()
-        return db_diseno
\ No newline at end of file
+
+    await catalogo.recargar()
+    return db_diseno
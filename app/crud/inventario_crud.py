@@ -1,24 +1,28 @@
 # app/crud/inventario_crud.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, desc
+from sqlalchemy import select, and_, or_, desc, func
 from typing import List, Optional, Tuple, Dict
 from datetime import datetime, timedelta
 
 from ..models.inventario_insumo import InventarioInsumo
 from ..models.referencia_insumo import ReferenciaInsumo
 from ..models.color_insumo import ColorInsumo
+from ..models.sugerencia_compra import SugerenciaCompra
 from ..schemas.inventario_schema import (
     InventarioInsumoCreate,
     InventarioInsumoUpdate,
     MovimientoInventario
 )
 from ..utils.transaction import transaction_scope
+from ..utils.cache_http import etiquetar
+from . import statements
 
 async def create_inventario(db: AsyncSession, inventario: InventarioInsumoCreate) -> InventarioInsumo:
     """
     Create a new inventory record for a specific supply.
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "inventario_insumos")
         # Check if record already exists
         existing = await get_inventario_by_color_ref(
             tx,
@@ -62,13 +66,10 @@ async def get_inventario_by_color_ref(
     """
     Get inventory record for a specific reference and color combination.
     """
-    stmt = select(InventarioInsumo).where(
-        and_(
-            InventarioInsumo.referencia_id == referencia_id,
-            InventarioInsumo.color_id == color_id
-        )
+    result = await db.execute(
+        statements.INVENTARIO_POR_COLOR_REF,
+        {"referencia_id": referencia_id, "color_id": color_id}
     )
-    result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
 async def get_all_inventario(
@@ -84,7 +85,12 @@ async def get_all_inventario(
     query = select(InventarioInsumo)
     
     if solo_bajo_minimo:
-        query = query.where(InventarioInsumo.cantidad <= InventarioInsumo.cantidad_minima)
+        # Usamos el punto de reorden calculado cuando existe; si no, el mínimo estático
+        query = (
+            query
+            .outerjoin(SugerenciaCompra, SugerenciaCompra.inventario_id == InventarioInsumo.id)
+            .where(InventarioInsumo.cantidad <= _umbral_reorden())
+        )
     
     if tipo_insumo_id:
         # Join with Referencia Insumo to filter by tipo_insumo
@@ -107,6 +113,7 @@ async def update_stock(
     Update stock for an item and record the movement.
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "inventario_insumos")
         # Find the inventory record
         stmt = select(InventarioInsumo).where(InventarioInsumo.id == inventario_id)
         result = await tx.execute(stmt)
@@ -145,20 +152,45 @@ async def verificar_disponibilidad(
     inventario = await get_inventario_by_color_ref(db, referencia_id, color_id)
     return inventario is not None and inventario.cantidad >= cantidad_requerida
 
+def _umbral_reorden():
+    """
+    Stock a partir del cual un item requiere compra: el punto de reorden
+    calculado por el motor de reorden o, si aún no existe, la cantidad mínima.
+    Requiere un outer join con SugerenciaCompra.
+    """
+    return func.coalesce(SugerenciaCompra.punto_reorden, InventarioInsumo.cantidad_minima)
+
 async def get_alertas_stock(db: AsyncSession) -> List[Dict]:
     """
     Get a list of all items that require attention in inventory.
     """
-    stmt = select(InventarioInsumo)
+    stmt = (
+        select(InventarioInsumo, SugerenciaCompra)
+        .outerjoin(SugerenciaCompra, SugerenciaCompra.inventario_id == InventarioInsumo.id)
+    )
     result = await db.execute(stmt)
-    inventarios = result.scalars().all()
     
     alertas = []
     fecha_limite = datetime.utcnow() - timedelta(days=30)
     
-    for inv in inventarios:
-        # Check low stock level
-        if inv.cantidad <= inv.cantidad_minima:
+    for inv, sugerencia in result.all():
+        # Check low stock level against the computed reorder point
+        if sugerencia is not None and inv.cantidad <= sugerencia.punto_reorden:
+            alertas.append({
+                "tipo": "nivel_bajo",
+                "inventario_id": inv.id,
+                "referencia_id": inv.referencia_id,
+                "color_id": inv.color_id,
+                "cantidad_actual": inv.cantidad,
+                "cantidad_minima": inv.cantidad_minima,
+                "punto_reorden": sugerencia.punto_reorden,
+                "cantidad_sugerida": sugerencia.cantidad_sugerida,
+                "mensaje": (
+                    f"Stock bajo: {inv.cantidad} unidades (punto de reorden: "
+                    f"{sugerencia.punto_reorden}, comprar {sugerencia.cantidad_sugerida})"
+                )
+            })
+        elif sugerencia is None and inv.cantidad <= inv.cantidad_minima:
             alertas.append({
                 "tipo": "nivel_bajo",
                 "inventario_id": inv.id,
@@ -196,6 +228,7 @@ async def actualizar_inventario(
     Update inventory record information.
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "inventario_insumos")
         # Find the inventory record
         stmt = select(InventarioInsumo).where(InventarioInsumo.id == inventario_id)
         result = await tx.execute(stmt)
@@ -219,6 +252,7 @@ async def delete_inventario(db: AsyncSession, inventario_id: int) -> bool:
     Only allowed if quantity is 0 to prevent data loss.
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "inventario_insumos")
         # Find the inventory record
         stmt = select(InventarioInsumo).where(InventarioInsumo.id == inventario_id)
         result = await tx.execute(stmt)
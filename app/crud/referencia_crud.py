@@ -10,6 +10,9 @@ from ..schemas.referencia_insumo_schema import (
     ReferenciaInsumoUpdate
 )
 from ..utils.transaction import transaction_scope
+from ..utils.cache_http import etiquetar
+from ..utils.catalogo import catalogo, coincide, paginar
+from . import statements
 
 async def create_referencia(
     db: AsyncSession,
@@ -29,6 +32,7 @@ async def create_referencia(
         ValueError: If validation fails or duplicate code exists
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "referencias_insumo")
         # Check for duplicate code
         stmt = select(ReferenciaInsumo).where(
             ReferenciaInsumo.codigo == referencia.codigo
@@ -42,7 +46,9 @@ async def create_referencia(
         db_ref = ReferenciaInsumo(**referencia.dict())
         tx.add(db_ref)
         await tx.flush()
-        return db_ref
+
+    await catalogo.recargar()
+    return db_ref
 
 async def get_referencia(
     db: AsyncSession,
@@ -58,8 +64,11 @@ async def get_referencia(
     Returns:
         Optional[ReferenciaInsumo]: The found reference or None
     """
-    stmt = select(ReferenciaInsumo).where(ReferenciaInsumo.id == referencia_id)
-    result = await db.execute(stmt)
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        return snapshot.referencias.get(referencia_id)
+
+    result = await db.execute(statements.REFERENCIA_POR_ID, {"referencia_id": referencia_id})
     return result.scalar_one_or_none()
 
 async def get_referencias(
@@ -80,6 +89,14 @@ async def get_referencias(
     Returns:
         List[ReferenciaInsumo]: List of references
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        referencias = [
+            r for r in snapshot.referencias.values()
+            if coincide(search, r.codigo, r.nombre)
+        ]
+        return paginar(referencias, skip, limit)
+
     query = select(ReferenciaInsumo)
     
     if search:
@@ -109,6 +126,10 @@ async def get_referencias_by_tipo(
     Returns:
         List[ReferenciaInsumo]: List of associated references
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        return list(snapshot.referencias_por_tipo.get(tipo_id, ()))
+
     stmt = (
         select(ReferenciaInsumo)
         .where(ReferenciaInsumo.tipo_insumo_id == tipo_id)
@@ -133,6 +154,7 @@ async def update_referencia(
         Optional[ReferenciaInsumo]: The updated reference or None if not found
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "referencias_insumo")
         # Find the reference
         stmt = select(ReferenciaInsumo).where(ReferenciaInsumo.id == referencia_id)
         result = await tx.execute(stmt)
@@ -159,7 +181,9 @@ async def update_referencia(
             setattr(db_ref, field, value)
         
         db_ref.fecha_actualizacion = datetime.utcnow()
-        return db_ref
+
+    await catalogo.recargar()
+    return db_ref
 
 async def delete_referencia(db: AsyncSession, referencia_id: int) -> bool:
     """
@@ -176,6 +200,7 @@ async def delete_referencia(db: AsyncSession, referencia_id: int) -> bool:
         ValueError: If the reference has associated colors or inventory
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "referencias_insumo")
         # Find the reference
         stmt = select(ReferenciaInsumo).where(ReferenciaInsumo.id == referencia_id)
         result = await tx.execute(stmt)
@@ -191,4 +216,6 @@ async def delete_referencia(db: AsyncSession, referencia_id: int) -> bool:
         #     )
 
         await tx.delete(db_ref)
-        return True
\ No newline at end of file
+
+    await catalogo.recargar()
+    return True
\ No newline at end of file
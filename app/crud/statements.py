@@ -0,0 +1,61 @@
+# app/crud/statements.py
+"""
+Pre-built lookup statements for the hottest CRUD paths.
+
+Each statement is built once at import time with named bindparam()s and
+executed with a parameter dict:
+
+    result = await db.execute(statements.COLOR_POR_ID, {"color_id": color_id})
+
+Building a select() per call costs the construct itself plus its cache key;
+a module-level statement memoizes its cache key, so every call goes straight
+to the engine's compiled cache. Lambda statements (lambda_stmt) were measured
+too, but under the ORM they clone the statement on every execution to inject
+the bound values and ended up slower than a plain select() for simple lookups
+(see `python -m app.bench.statements`).
+
+Rules for adding statements here:
+- every per-call value is a named bindparam(); never close over values;
+- one constant per statement shape.
+"""
+from sqlalchemy import and_, bindparam, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from ..models.color_insumo import ColorInsumo
+from ..models.cortina import Cortina
+from ..models.diseno import Diseno, DisenoTipoInsumo
+from ..models.inventario_insumo import InventarioInsumo
+from ..models.referencia_insumo import ReferenciaInsumo
+
+# Parameters: color_id
+COLOR_POR_ID = select(ColorInsumo).where(ColorInsumo.id == bindparam("color_id"))
+
+# Parameters: referencia_id
+REFERENCIA_POR_ID = select(ReferenciaInsumo).where(
+    ReferenciaInsumo.id == bindparam("referencia_id")
+)
+
+# Parameters: referencia_id, color_id
+INVENTARIO_POR_COLOR_REF = select(InventarioInsumo).where(
+    and_(
+        InventarioInsumo.referencia_id == bindparam("referencia_id"),
+        InventarioInsumo.color_id == bindparam("color_id")
+    )
+)
+
+# Parameters: cortina_id. Loads the design with its materials, references and colors
+CORTINA_POR_ID = (
+    select(Cortina)
+    .options(
+        selectinload(Cortina.diseno)
+        .selectinload(Diseno.tipos_insumo)
+        .joinedload(DisenoTipoInsumo.tipo_insumo),
+        selectinload(Cortina.diseno)
+        .selectinload(Diseno.tipos_insumo)
+        .joinedload(DisenoTipoInsumo.referencia),
+        selectinload(Cortina.diseno)
+        .selectinload(Diseno.tipos_insumo)
+        .joinedload(DisenoTipoInsumo.color)
+    )
+    .where(Cortina.id == bindparam("cortina_id"))
+)
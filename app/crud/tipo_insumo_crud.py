@@ -7,6 +7,8 @@ from datetime import datetime
 from ..models.tipo_insumo import TipoInsumo
 from ..schemas.tipo_insumo_schema import TipoInsumoCreate, TipoInsumoUpdate
 from ..utils.transaction import transaction_scope
+from ..utils.cache_http import etiquetar
+from ..utils.catalogo import catalogo, coincide, paginar
 
 async def create_tipo_insumo(db: AsyncSession, tipo: TipoInsumoCreate) -> TipoInsumo:
     """
@@ -23,6 +25,7 @@ async def create_tipo_insumo(db: AsyncSession, tipo: TipoInsumoCreate) -> TipoIn
         ValueError: If validation fails
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "tipos_insumo")
         # Check if name already exists
         stmt = select(TipoInsumo).where(TipoInsumo.nombre == tipo.nombre)
         result = await tx.execute(stmt)
@@ -34,7 +37,9 @@ async def create_tipo_insumo(db: AsyncSession, tipo: TipoInsumoCreate) -> TipoIn
         db_tipo = TipoInsumo(**tipo.dict())
         tx.add(db_tipo)
         await tx.flush()
-        return db_tipo
+
+    await catalogo.recargar()
+    return db_tipo
 
 async def get_tipo_insumo(db: AsyncSession, tipo_id: int) -> Optional[TipoInsumo]:
     """
@@ -47,6 +52,10 @@ async def get_tipo_insumo(db: AsyncSession, tipo_id: int) -> Optional[TipoInsumo
     Returns:
         Optional[TipoInsumo]: The found supply type or None
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        return snapshot.tipos_insumo.get(tipo_id)
+
     stmt = select(TipoInsumo).where(TipoInsumo.id == tipo_id)
     result = await db.execute(stmt)
     return result.scalar_one_or_none()
@@ -71,6 +80,11 @@ async def get_tipos_insumo(
     Returns:
         List[TipoInsumo]: List of supply types
     """
+    snapshot = catalogo.actual()
+    if snapshot is not None:
+        tipos = [t for t in snapshot.tipos_insumo.values() if coincide(search, t.nombre)]
+        return paginar(tipos, skip, limit)
+
     query = select(TipoInsumo)
     
     if search:
@@ -97,6 +111,7 @@ async def update_tipo_insumo(
         Optional[TipoInsumo]: The updated supply type or None if not found
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "tipos_insumo")
         # Find the supply type
         stmt = select(TipoInsumo).where(TipoInsumo.id == tipo_id)
         result = await tx.execute(stmt)
@@ -119,7 +134,9 @@ async def update_tipo_insumo(
             setattr(db_tipo, field, value)
         
         db_tipo.fecha_actualizacion = datetime.utcnow()
-        return db_tipo
+
+    await catalogo.recargar()
+    return db_tipo
 
 async def delete_tipo_insumo(db: AsyncSession, tipo_id: int) -> bool:
     """
@@ -136,6 +153,7 @@ async def delete_tipo_insumo(db: AsyncSession, tipo_id: int) -> bool:
         ValueError: If the supply type has associated references
     """
     async with transaction_scope(db) as tx:
+        etiquetar(tx, "tipos_insumo")
         # Find the supply type
         stmt = select(TipoInsumo).where(TipoInsumo.id == tipo_id)
         result = await tx.execute(stmt)
@@ -155,7 +173,9 @@ async def delete_tipo_insumo(db: AsyncSession, tipo_id: int) -> bool:
             )
 
         await tx.delete(db_tipo)
-        return True
+
+    await catalogo.recargar()
+    return True
 
 async def check_tipo_insumo_available(
     db: AsyncSession, 
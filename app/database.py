@@ -7,9 +7,15 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import MetaData, text, exc
+from sqlalchemy import MetaData, text, exc, create_engine
+from sqlalchemy.engine import URL, Engine, make_url
+from typing import Optional
 import os
 
+from .utils.metrics import db_metrics
+from .utils.n_plus_one import n_plus_one
+from .utils.sqlite_tuning import aplicar_perfil, usar_transacciones_explicitas
+
 # Remove model imports from here
 
 # Configure Robust Logging
@@ -26,6 +32,30 @@ DATABASE_URL = os.getenv(
     'sqlite+aiosqlite:///./cortinas.db'
 )
 
+# Connections in the writer pool; SQLite only admits one writer at a time
+DB_WRITE_POOL_SIZE = int(os.getenv('DB_WRITE_POOL_SIZE', '2'))
+DB_READ_POOL_SIZE = int(os.getenv('DB_READ_POOL_SIZE', '5'))
+
+def _read_only_url(database_url: str) -> URL:
+    """
+    URL for the read-only pool.
+
+    READ_DATABASE_URL can point to a replica. Otherwise file-based SQLite
+    databases are opened as a read-only URI (file:...?mode=ro), and other
+    backends reuse the main URL with their own pool.
+    """
+    if os.getenv('READ_DATABASE_URL'):
+        return make_url(os.environ['READ_DATABASE_URL'])
+
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return url
+    if url.database.startswith('file:'):
+        return url.update_query_dict({'mode': 'ro', 'uri': 'true'})
+    return url.set(database=f'file:{url.database}').update_query_dict({'mode': 'ro', 'uri': 'true'})
+
+READ_DATABASE_URL = _read_only_url(DATABASE_URL)
+
 # Naming Convention for Database Objects
 NAMING_CONVENTION = {
     "ix": "ix_%(column_0_label)s",
@@ -49,18 +79,44 @@ Base.to_dict = to_dict
 
 # Async Engine Creation
 try:
+    # Writer engine: small pool used by mutating routes, migrations and jobs
     engine = create_async_engine(
         DATABASE_URL,
         echo=os.getenv('SQL_ECHO', 'False').lower() == 'true',
         future=True,
         pool_pre_ping=True,
+        pool_size=DB_WRITE_POOL_SIZE,
+        max_overflow=0,
+        connect_args={"check_same_thread": False}
+    )
+    # PRAGMAs (foreign keys, WAL, synchronous...) once per pooled connection
+    aplicar_perfil(engine)
+    # Explicit BEGIN IMMEDIATE transactions: writers wait on busy_timeout
+    # instead of failing on lock upgrade, and SAVEPOINTs (used by the
+    # write queue's group commit) work as documented
+    usar_transacciones_explicitas(engine)
+    db_metrics.instrumentar(engine)
+    n_plus_one.instrumentar(engine)
+
+    # Read engine: read-only connections for GET routes (listings, stats,
+    # exports). journal_mode is a database-level setting owned by the
+    # writer; query_only rejects any accidental write.
+    read_engine = create_async_engine(
+        READ_DATABASE_URL,
+        echo=os.getenv('SQL_ECHO', 'False').lower() == 'true',
+        future=True,
+        pool_pre_ping=True,
+        pool_size=DB_READ_POOL_SIZE,
         connect_args={"check_same_thread": False}
     )
+    aplicar_perfil(read_engine, omitir=("journal_mode",), adicionales={"query_only": "ON"})
+    db_metrics.instrumentar(read_engine)
+    n_plus_one.instrumentar(read_engine)
 except Exception as db_init_error:
     logger.error(f"Database engine creation failed: {db_init_error}")
     raise
 
-# Async Session Factory
+# Async Session Factories
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -69,18 +125,51 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False
+)
+
+# Sync engine for blocking workloads (pandas reports) run in worker threads
+_sync_engine: Optional[Engine] = None
+
+def get_sync_engine() -> Engine:
+    """
+    Lazily create a synchronous, read-only engine on the same database.
+
+    The async driver is swapped for the dialect's default one
+    (sqlite+aiosqlite -> sqlite) so pandas can use it from a thread pool.
+    Reports only read, so it shares the read engine's settings.
+    """
+    global _sync_engine
+    if _sync_engine is None:
+        url = READ_DATABASE_URL
+        _sync_engine = create_engine(
+            url.set(drivername=url.get_backend_name()),
+            pool_pre_ping=True,
+            connect_args={"check_same_thread": False}
+        )
+        aplicar_perfil(_sync_engine, omitir=("journal_mode",), adicionales={"query_only": "ON"})
+        db_metrics.instrumentar(_sync_engine)
+        n_plus_one.instrumentar(_sync_engine)
+    return _sync_engine
+
+async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Database Session Dependency Injection
+    Database Session Dependency Injection for mutating routes
 
-    Provides a transactional database session with:
-    - Foreign key support
+    Provides a transactional database session from the writer pool with:
     - Error handling
     - Automatic resource management
+
+    Foreign key support and the rest of the SQLite settings are applied
+    when the pool opens each connection (see utils/sqlite_tuning.py).
     """
     async with AsyncSessionLocal() as session:
         try:
-            await session.execute(text("PRAGMA foreign_keys=ON"))
             yield session
         except exc.SQLAlchemyError as db_error:
             logger.error(f"Database session error: {db_error}")
@@ -89,59 +178,47 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
-async def init_db() -> None:
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Database Session Dependency Injection for read-only routes
+
+    Sessions come from the read-only pool, so long listings, statistics
+    and exports do not hold writer connections needed for order intake.
+    """
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        except exc.SQLAlchemyError as db_error:
+            logger.error(f"Database session error: {db_error}")
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+# Backwards compatible alias: unqualified sessions may write
+get_db = get_write_db
+
+async def init_db() -> int:
     """
-    Comprehensive database initialization method.
-    
-    Systematic approach to:
-    - Drop existing tables
-    - Create tables with precise dependency ordering
-    - Handle potential initialization errors
+    Bring the database schema up to date.
+
+    Runs the pending versioned migrations (see app/migrations). When the
+    schema is already current this is a single SELECT and no DDL, so
+    restarts keep their data and start almost instantly.
+
+    Returns:
+        The schema version after initialization
     """
     try:
-        # Dynamically import models to avoid circular imports
-        from .models.tipo_insumo import TipoInsumo
-        from .models.referencia_insumo import ReferenciaInsumo
-        from .models.color_insumo import ColorInsumo
-        from .models.diseno import Diseno, DisenoTipoInsumo
-        from .models.inventario_insumo import InventarioInsumo
-        from .models.cortina import Cortina
-
-        logger.info("Starting comprehensive database initialization...")
-        
-        async with engine.begin() as conn:
-            # Explicitly enable foreign key support
-            await conn.execute(text("PRAGMA foreign_keys=ON"))
-            
-            # Use a systematic table creation order
-            tables_creation_order = [
-                TipoInsumo.__table__,     # Foundational type categories
-                ReferenciaInsumo.__table__,  # References linked to types
-                ColorInsumo.__table__,    # Colors linked to references
-                Diseno.__table__,         # Design templates
-                DisenoTipoInsumo.__table__,  # Mapping between designs and types
-                InventarioInsumo.__table__,  # Inventory tracking
-                Cortina.__table__         # Final product representation
-            ]
-            
-            # Drop existing tables systematically
-            await conn.run_sync(Base.metadata.drop_all)
-            
-            # Create tables with explicit ordering
-            for table in tables_creation_order:
-                try:
-                    await conn.run_sync(
-                        lambda sync_conn: table.create(sync_conn, checkfirst=True)
-                    )
-                    logger.info(f"Successfully created table: {table.name}")
-                except Exception as table_error:
-                    logger.error(f"Error creating table {table.name}: {table_error}")
-                    raise
-        
-        logger.info("Database initialization completed successfully!")
-    
+        # Imported here to avoid circular imports with the models
+        from .migrations import run_migrations
+
+        version = await run_migrations(engine)
+        logger.info(f"Database initialization completed (schema version {version})")
+        return version
+
     except Exception as init_error:
-        logger.error(f"Comprehensive database initialization failed: {init_error}")
+        logger.error(f"Database initialization failed: {init_error}")
         raise
 
 # Additional utility functions
@@ -159,6 +236,9 @@ async def close_db_connections() -> None:
     """Safely close database connections"""
     try:
         await engine.dispose()
+        await read_engine.dispose()
+        if _sync_engine is not None:
+            _sync_engine.dispose()
         logger.info("Database connections closed successfully.")
     except Exception as close_error:
         logger.error(f"Error closing database connections: {close_error}")
@@ -167,8 +247,13 @@ async def close_db_connections() -> None:
 __all__ = [
     'Base', 
     'engine', 
+    'read_engine',
     'AsyncSessionLocal', 
+    'AsyncReadSessionLocal',
     'get_db', 
+    'get_read_db',
+    'get_write_db',
+    'get_sync_engine',
     'init_db', 
     'close_db_connections',
     'test_db_connection'
@@ -3,9 +3,25 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from .routes import export_routes
 import logging
+import time
 
 # Import database functions with their correct names
-from .database import init_db, close_db_connections
+from .database import init_db, close_db_connections, read_engine
+from .services.report_jobs import report_jobs
+from .utils.cache import iniciar_cache, cerrar_cache
+from .utils.cache_http import CacheHTTPMiddleware
+from .utils.catalogo import catalogo
+from .utils.metrics import (
+    STARTUP_DURATION,
+    SCHEMA_VERSION,
+    MetricsMiddleware,
+    QueryCountMiddleware,
+    init_metrics
+)
+from .utils.n_plus_one import NPlusOneMiddleware
+from .utils.perfilador import PERFILADOR_TOKEN, PerfiladorMiddleware
+from .utils.vigilante import vigilante
+from .utils.write_queue import write_queue
 from .routes import (
     tipo_insumo_routes,
     referencia_routes,
@@ -13,7 +29,10 @@ from .routes import (
     inventario_routes,
     diseno_routes,
     cortina_routes,
-    rentabilidad_routes
+    rentabilidad_routes,
+    reporte_routes,
+    importacion_routes,
+    perfil_routes
 )
 
 # Configure logging
@@ -27,6 +46,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Caché de respuestas de los GET de paneles; se registra antes que CORS
+# para quedar por dentro y que las cabeceras CORS se calculen siempre
+app.add_middleware(CacheHTTPMiddleware, prefijo="/api/v1")
+
 # Configure CORS
 origins = [
     "http://localhost:5173",  # Development frontend
@@ -50,6 +73,18 @@ app.add_middleware(
     max_age=600  # Cache preflight requests for 10 minutes
 )
 
+# Conteo de consultas SQL por petición
+app.add_middleware(QueryCountMiddleware)
+# Detección de consultas N+1 (N_PLUS_ONE_MODE=log en staging)
+app.add_middleware(NPlusOneMiddleware)
+# Conteo y latencia por plantilla de ruta; el último registrado es el más
+# externo, así que mide también lo que sirve la caché de respuestas
+app.add_middleware(MetricsMiddleware)
+# Perfilado bajo demanda (cabecera X-Profile); sin PERFILADOR_TOKEN no se registra
+if PERFILADOR_TOKEN:
+    app.add_middleware(PerfiladorMiddleware)
+init_metrics(app)
+
 # Register routers
 app.include_router(tipo_insumo_routes, prefix="/api/v1")
 app.include_router(referencia_routes, prefix="/api/v1")
@@ -60,6 +95,10 @@ app.include_router(cortina_routes, prefix="/api/v1")
 app.include_router(rentabilidad_routes, prefix="/api/v1")
 app.include_router(cortina_routes, prefix="/api/v1")
 app.include_router(export_routes.router, prefix="/api/v1")
+app.include_router(reporte_routes, prefix="/api/v1")
+app.include_router(importacion_routes, prefix="/api/v1")
+if PERFILADOR_TOKEN:
+    app.include_router(perfil_routes, prefix="/api/v1")
 
 @app.on_event("startup")
 async def startup_event():
@@ -68,8 +107,15 @@ async def startup_event():
     particularly the database connection and tables.
     """
     logger.info("Starting up the application...")
-    await init_db()
-    logger.info("Application startup completed!")
+    inicio = time.perf_counter()
+    SCHEMA_VERSION.set(await init_db())
+    await report_jobs.marcar_interrumpidos()
+    await catalogo.cargar(read_engine)
+    await iniciar_cache()
+    await vigilante.iniciar(read_engine)
+    duracion = time.perf_counter() - inicio
+    STARTUP_DURATION.set(duracion)
+    logger.info(f"Application startup completed in {duracion:.3f}s")
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -78,6 +124,10 @@ async def shutdown_event():
     particularly database connections.
     """
     logger.info("Shutting down the application...")
+    await report_jobs.cerrar()
+    await write_queue.cerrar()
+    await vigilante.cerrar()
+    await cerrar_cache()
     await close_db_connections()
     logger.info("Application shutdown completed!")
 
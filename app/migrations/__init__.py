@@ -0,0 +1,11 @@
+# app/migrations/__init__.py
+"""Migraciones versionadas del esquema de la base de datos."""
+from .runner import Migracion, run_migrations, get_schema_version
+from .versiones import MIGRACIONES
+
+__all__ = [
+    'Migracion',
+    'MIGRACIONES',
+    'run_migrations',
+    'get_schema_version'
+]
@@ -0,0 +1,17 @@
+# app/migrations/__main__.py
+import asyncio
+import logging
+
+from ..database import engine
+from .runner import run_migrations
+
+async def main() -> None:
+    try:
+        version = await run_migrations(engine)
+    finally:
+        await engine.dispose()
+    print(f"Esquema en la versión {version}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
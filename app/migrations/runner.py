@@ -0,0 +1,114 @@
+# app/migrations/runner.py
+"""
+Ejecutor de migraciones versionadas.
+
+La tabla schema_version guarda una fila por migración aplicada. Al iniciar,
+una sola consulta (MAX(version)) decide si hay algo que hacer; si el esquema
+está al día no se ejecuta ningún DDL.
+
+Varios procesos pueden arrancar a la vez sobre la misma base: la versión se
+vuelve a leer dentro de la transacción, con el bloqueo de escritura tomado,
+y solo se aplican las migraciones que ningún otro proceso registró.
+
+Uso manual:
+    python -m app.migrations
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, exc, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("descripcion", String(200), nullable=False),
+    Column("fecha_aplicacion", DateTime, nullable=False, default=datetime.utcnow)
+)
+
+@dataclass(frozen=True)
+class Migracion:
+    """
+    Paso de migración. `aplicar` recibe una conexión síncrona dentro de la
+    transacción del ejecutor (se invoca con run_sync) y debe ser idempotente
+    frente a bases creadas antes de existir el versionado.
+    """
+    version: int
+    descripcion: str
+    aplicar: Callable[[Connection], None]
+
+async def get_schema_version(engine: AsyncEngine) -> Optional[int]:
+    """
+    Versión actual del esquema, o None si la tabla schema_version no existe.
+    """
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(select(func.max(schema_version.c.version)))
+            return result.scalar() or 0
+    except (exc.OperationalError, exc.ProgrammingError):
+        return None
+
+def _bloquear_y_leer_version(conn: Connection) -> int:
+    """
+    Toma el bloqueo de escritura, crea schema_version si falta y lee la
+    versión ya con el bloqueo. En SQLite, un engine con
+    usar_transacciones_explicitas ya empezó con BEGIN IMMEDIATE; en otro
+    caso el driver aún no emitió BEGIN y se emite aquí.
+    """
+    if conn.dialect.name == "sqlite" and not conn.connection.driver_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    schema_version.create(conn, checkfirst=True)
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("LOCK TABLE schema_version IN EXCLUSIVE MODE")
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+async def run_migrations(
+    engine: AsyncEngine,
+    migraciones: Optional[Sequence[Migracion]] = None
+) -> int:
+    """
+    Aplica en orden las migraciones pendientes.
+
+    Returns:
+        La versión del esquema después de ejecutar
+    """
+    if migraciones is None:
+        from .versiones import MIGRACIONES
+        migraciones = MIGRACIONES
+
+    objetivo = max((m.version for m in migraciones), default=0)
+    actual = await get_schema_version(engine)
+    if actual is not None and actual >= objetivo:
+        logger.info(f"Esquema al día (versión {actual})")
+        return actual
+
+    async with engine.begin() as conn:
+        # Otro proceso pudo migrar mientras se esperaba el bloqueo
+        actual = await conn.run_sync(_bloquear_y_leer_version)
+
+        for migracion in sorted(migraciones, key=lambda m: m.version):
+            if migracion.version <= actual:
+                continue
+            inicio = time.perf_counter()
+            await conn.run_sync(migracion.aplicar)
+            await conn.execute(
+                insert(schema_version).values(
+                    version=migracion.version,
+                    descripcion=migracion.descripcion,
+                    fecha_aplicacion=datetime.utcnow()
+                )
+            )
+            logger.info(
+                f"Migración {migracion.version} aplicada: {migracion.descripcion} "
+                f"({time.perf_counter() - inicio:.3f}s)"
+            )
+            actual = migracion.version
+
+    return actual
@@ -0,0 +1,155 @@
+# app/migrations/versiones.py
+"""
+Historial del esquema. Agregar siempre al final con la siguiente versión;
+nunca modificar una migración ya publicada.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from .. import models
+from .runner import Migracion
+
+def _crear_tablas(conn: Connection, *nombres: str) -> None:
+    tablas = [models.Base.metadata.tables[nombre] for nombre in nombres]
+    models.Base.metadata.create_all(conn, tables=tablas, checkfirst=True)
+
+def v1_esquema_base(conn: Connection) -> None:
+    """Tablas originales; en bases existentes no hace nada"""
+    _crear_tablas(
+        conn,
+        "tipos_insumo",
+        "referencias_insumo",
+        "colores_insumo",
+        "disenos",
+        "diseno_tipos_insumo",
+        "inventario_insumos",
+        "cortinas",
+        "reservas_inventario"
+    )
+
+def v2_datos_cliente_cortinas(conn: Connection) -> None:
+    """Columnas de cliente en cortinas (reemplaza migrations/run_migration.py)"""
+    existentes = {c["name"] for c in inspect(conn).get_columns("cortinas")}
+    for nombre, tipo in (("cliente", "VARCHAR(100)"), ("telefono", "VARCHAR(20)"), ("email", "VARCHAR(100)")):
+        if nombre not in existentes:
+            conn.execute(text(f"ALTER TABLE cortinas ADD COLUMN {nombre} {tipo}"))
+
+def v3_reorden_y_reportes(conn: Connection) -> None:
+    """Sugerencias de compra y trabajos de reportes en segundo plano"""
+    _crear_tablas(conn, "sugerencias_compra", "reportes_jobs")
+
+def v4_inventario_unico_por_color(conn: Connection) -> None:
+    """Índice único (referencia_id, color_id) en inventario_insumos"""
+    duplicados = conn.execute(text(
+        "SELECT referencia_id, color_id FROM inventario_insumos "
+        "GROUP BY referencia_id, color_id HAVING COUNT(*) > 1"
+    )).all()
+    if duplicados:
+        pares = ", ".join(f"({r}, {c})" for r, c in duplicados[:20])
+        raise RuntimeError(
+            f"inventario_insumos tiene registros duplicados por (referencia_id, color_id): {pares}. "
+            "Consolídelos antes de migrar."
+        )
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_inventario_insumos_referencia_color "
+        "ON inventario_insumos (referencia_id, color_id)"
+    ))
+
+def v5_cortinas_historico(conn: Connection) -> None:
+    """Tabla de archivo para cortinas en estado terminal"""
+    _crear_tablas(conn, "cortinas_historico")
+
+# Tablas cuyos cambios se publican en cambios_tablas
+TABLAS_VIGILADAS = (
+    "tipos_insumo",
+    "referencias_insumo",
+    "colores_insumo",
+    "disenos",
+    "diseno_tipos_insumo",
+    "inventario_insumos",
+    "cortinas",
+    "cortinas_historico"
+)
+
+def v6_contadores_de_cambios(conn: Connection) -> None:
+    """Contador de cambios por tabla mantenido con triggers (solo SQLite)"""
+    _crear_tablas(conn, "cambios_tablas")
+    if conn.dialect.name != "sqlite":
+        return
+    for tabla in TABLAS_VIGILADAS:
+        conn.execute(
+            text("INSERT OR IGNORE INTO cambios_tablas (tabla, version) VALUES (:tabla, 0)"),
+            {"tabla": tabla}
+        )
+        for operacion in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS trg_cambios_{tabla}_{operacion.lower()} "
+                f"AFTER {operacion} ON {tabla} BEGIN "
+                f"UPDATE cambios_tablas SET version = version + 1 WHERE tabla = '{tabla}'; "
+                f"END"
+            ))
+
+def v7_cortinas_autoincrement(conn: Connection) -> None:
+    """
+    Ids de cortinas sin reutilizar (solo SQLite). Sin AUTOINCREMENT, SQLite
+    asigna MAX(id) + 1 y vuelve a entregar los ids de cortinas archivadas.
+    Reconstruye la tabla con AUTOINCREMENT conservando filas, índices y
+    triggers, y lleva la secuencia por encima de los ids del archivo.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    definicion = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'cortinas'"
+    )).scalar()
+    if "AUTOINCREMENT" not in definicion.upper():
+        dependientes = conn.execute(text(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE tbl_name = 'cortinas' AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+        )).all()
+        columnas = [c["name"] for c in inspect(conn).get_columns("cortinas")]
+
+        conn.execute(text("ALTER TABLE cortinas RENAME TO cortinas_anterior"))
+        for tipo, nombre, _ in dependientes:
+            if tipo == "index":
+                conn.execute(text(f'DROP INDEX "{nombre}"'))
+        _crear_tablas(conn, "cortinas")
+        nuevas = {c["name"] for c in inspect(conn).get_columns("cortinas")}
+        comunes = ", ".join(f'"{c}"' for c in columnas if c in nuevas)
+        conn.execute(text(f"INSERT INTO cortinas ({comunes}) SELECT {comunes} FROM cortinas_anterior"))
+        conn.execute(text("DROP TABLE cortinas_anterior"))
+
+        existentes = {n for (n,) in conn.execute(text("SELECT name FROM sqlite_master"))}
+        for _, nombre, sql in dependientes:
+            if nombre not in existentes:
+                conn.execute(text(sql))
+
+    tope = conn.execute(text(
+        "SELECT MAX(COALESCE((SELECT MAX(id) FROM cortinas), 0), "
+        "COALESCE((SELECT MAX(id) FROM cortinas_historico), 0))"
+    )).scalar()
+    actualizadas = conn.execute(
+        text("UPDATE sqlite_sequence SET seq = MAX(seq, :tope) WHERE name = 'cortinas'"),
+        {"tope": tope}
+    ).rowcount
+    if not actualizadas:
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('cortinas', :tope)"), {"tope": tope})
+
+def v8_propietario_reportes(conn: Connection) -> None:
+    """Worker que ejecuta cada trabajo de reportes"""
+    existentes = {c["name"] for c in inspect(conn).get_columns("reportes_jobs")}
+    if "propietario" not in existentes:
+        conn.execute(text("ALTER TABLE reportes_jobs ADD COLUMN propietario VARCHAR(100)"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_reportes_jobs_propietario ON reportes_jobs (propietario)"
+    ))
+
+MIGRACIONES = [
+    Migracion(1, "Esquema base", v1_esquema_base),
+    Migracion(2, "Datos de cliente en cortinas", v2_datos_cliente_cortinas),
+    Migracion(3, "Sugerencias de compra y trabajos de reportes", v3_reorden_y_reportes),
+    Migracion(4, "Inventario único por referencia y color", v4_inventario_unico_por_color),
+    Migracion(5, "Archivo histórico de cortinas", v5_cortinas_historico),
+    Migracion(6, "Contadores de cambios por tabla", v6_contadores_de_cambios),
+    Migracion(7, "Ids de cortinas sin reutilizar", v7_cortinas_autoincrement),
+    Migracion(8, "Propietario de los trabajos de reportes", v8_propietario_reportes),
+]
@@ -25,7 +25,11 @@ from .color_insumo import ColorInsumo
 from .diseno import Diseno, DisenoTipoInsumo
 from .inventario_insumo import InventarioInsumo
 from .cortina import Cortina
+from .cortina_historico import CortinaHistorico
 from .reserva_inventario import ReservaInventario
+from .sugerencia_compra import SugerenciaCompra
+from .reporte_job import ReporteJob
+from .cambio_tabla import CambioTabla
 
 __all__ = [
     'Base',
@@ -36,5 +40,9 @@ __all__ = [
     'Diseno',
     'DisenoTipoInsumo',
     'Cortina',
-    'ReservaInventario'
+    'CortinaHistorico',
+    'ReservaInventario',
+    'SugerenciaCompra',
+    'ReporteJob',
+    'CambioTabla'
 ]
\ No newline at end of file
@@ -0,0 +1,18 @@
+# app/models/cambio_tabla.py
+from sqlalchemy import Column, Integer, String
+
+from . import Base
+
+class CambioTabla(Base):
+    """
+    Change counter per table, bumped by SQLite triggers on every insert,
+    update and delete (see migration v6). Other workers poll it to tell
+    which of their in-process caches went stale; see app.utils.vigilante.
+    """
+    __tablename__ = "cambios_tablas"
+
+    tabla = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CambioTabla {self.tabla} v{self.version}>"
@@ -12,6 +12,9 @@ class Cortina(Base):
     This model tracks each curtain's measurements, costs, and production status.
     """
     __tablename__ = 'cortinas'
+    # AUTOINCREMENT: ids are never reused, including those of curtains moved
+    # to cortinas_historico (see migration v7)
+    __table_args__ = {'sqlite_autoincrement': True}
 
     # Primary key and relationships
     id = Column(Integer, primary_key=True, index=True)
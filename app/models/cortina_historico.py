@@ -0,0 +1,56 @@
+# app/models/cortina_historico.py
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, Text, Index, text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from . import Base
+
+class CortinaHistorico(Base):
+    """
+    Archived curtains in a terminal state, moved out of `cortinas` by
+    app.services.archivo_service. Columns mirror Cortina and ids are preserved,
+    so a curtain keeps its id whether it is hot or archived; `cortinas` uses
+    AUTOINCREMENT, so archived ids are never handed out again.
+    """
+    __tablename__ = 'cortinas_historico'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    # No foreign key: the archive must outlive design deletions
+    diseno_id = Column(Integer, nullable=False)
+
+    ancho = Column(Numeric(10, 2), nullable=False)
+    alto = Column(Numeric(10, 2), nullable=False)
+    partida = Column(Boolean, default=False)
+    multiplicador = Column(Integer, default=1)
+    estado = Column(String(50), nullable=False)
+    notas = Column(Text, nullable=True)
+
+    fecha_creacion = Column(DateTime, nullable=False)
+    fecha_actualizacion = Column(DateTime, nullable=False)
+
+    costo_materiales = Column(Numeric(10, 2), nullable=False, server_default=text('0.0'))
+    costo_mano_obra = Column(Numeric(10, 2), nullable=False, server_default=text('0.0'))
+    costo_total = Column(Numeric(10, 2), nullable=False, server_default=text('0.0'))
+    cliente = Column(String(100), nullable=True)
+    telefono = Column(String(20), nullable=True)
+    email = Column(String(100), nullable=True)
+
+    fecha_archivo = Column(DateTime, default=datetime.utcnow, nullable=False, comment='When the row was archived')
+
+    diseno = relationship(
+        "Diseno",
+        primaryjoin="foreign(CortinaHistorico.diseno_id) == Diseno.id",
+        viewonly=True,
+        lazy="select"
+    )
+
+    __table_args__ = (
+        Index('idx_cortinas_historico_fecha_creacion', 'fecha_creacion'),
+        Index('idx_cortinas_historico_diseno', 'diseno_id'),
+    )
+
+    def __repr__(self):
+        return (
+            f"<CortinaHistorico(id={self.id}, "
+            f"estado='{self.estado}', archivada={self.fecha_archivo})>"
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Numeric, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from . import Base
@@ -8,6 +8,10 @@ class InventarioInsumo(Base):
     
     """Modelo que gestiona el inventario de insumos por color"""
     __tablename__ = "inventario_insumos"
+    __table_args__ = (
+        # Un registro por referencia y color; clave de los upserts de importación
+        Index("uq_inventario_insumos_referencia_color", "referencia_id", "color_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     referencia_id = Column(Integer, ForeignKey('referencias_insumo.id'), nullable=False)
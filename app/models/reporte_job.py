@@ -0,0 +1,32 @@
+# app/models/reporte_job.py
+from sqlalchemy import Column, String, Text, DateTime
+from datetime import datetime
+from uuid import uuid4
+from . import Base
+
+class ReporteJob(Base):
+    """
+    Trabajo de generación de reportes ejecutado en segundo plano.
+    Registra el estado del trabajo y la ruta del archivo generado.
+    """
+    __tablename__ = "reportes_jobs"
+
+    PENDIENTE = "pendiente"
+    EN_PROCESO = "en_proceso"
+    COMPLETADO = "completado"
+    ERROR = "error"
+
+    id = Column(String(32), primary_key=True, default=lambda: uuid4().hex)
+    tipo = Column(String(50), nullable=False, index=True)
+    parametros = Column(Text, nullable=False, default="{}")  # JSON con los argumentos del reporte
+    estado = Column(String(20), nullable=False, default=PENDIENTE, index=True)
+    ruta_archivo = Column(String(500), nullable=True)
+    error = Column(Text, nullable=True)
+    propietario = Column(String(100), nullable=True, index=True)  # "host:pid" del worker que lo ejecuta
+
+    fecha_creacion = Column(DateTime, default=datetime.utcnow, nullable=False)
+    fecha_inicio = Column(DateTime, nullable=True)
+    fecha_fin = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ReporteJob(id='{self.id}', tipo='{self.tipo}', estado='{self.estado}')>"
@@ -0,0 +1,44 @@
+# app/models/sugerencia_compra.py
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from . import Base
+
+class SugerenciaCompra(Base):
+    """
+    Punto de reorden y cantidad sugerida de compra por registro de inventario.
+    La tabla se recalcula completa en cada ejecución del motor de reorden.
+    """
+    __tablename__ = "sugerencias_compra"
+
+    id = Column(Integer, primary_key=True, index=True)
+    inventario_id = Column(
+        Integer,
+        ForeignKey('inventario_insumos.id', ondelete='CASCADE'),
+        nullable=False,
+        unique=True,
+        index=True
+    )
+    referencia_id = Column(Integer, nullable=False)
+    color_id = Column(Integer, nullable=False)
+
+    # Parámetros usados en el cálculo
+    consumo_diario = Column(Float, nullable=False, default=0)
+    lead_time_dias = Column(Float, nullable=False)
+    dias_seguridad = Column(Float, nullable=False)
+
+    # Resultados
+    stock_seguridad = Column(Float, nullable=False)
+    punto_reorden = Column(Float, nullable=False)
+    stock_objetivo = Column(Float, nullable=False)
+    cantidad_sugerida = Column(Float, nullable=False, default=0)
+    requiere_compra = Column(Boolean, nullable=False, default=False, index=True)
+    fecha_calculo = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    inventario = relationship("InventarioInsumo")
+
+    def __repr__(self):
+        return (
+            f"<SugerenciaCompra(inventario_id={self.inventario_id}, "
+            f"punto_reorden={self.punto_reorden}, cantidad_sugerida={self.cantidad_sugerida})>"
+        )
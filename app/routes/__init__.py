@@ -11,6 +11,9 @@ from .inventario_routes import router as inventario_routes
 from .diseno_routes import router as diseno_routes
 from .cortina_routes import router as cortina_routes
 from .rentabilidad_routes import router as rentabilidad_routes
+from .reporte_routes import router as reporte_routes
+from .importacion_routes import router as importacion_routes
+from .perfil_routes import router as perfil_routes
 
 # Export all routers to be available when importing from app.routes
 __all__ = [
@@ -20,5 +23,8 @@ __all__ = [
     'inventario_routes',
     'diseno_routes',
     'cortina_routes',
-    'rentabilidad_routes'
+    'rentabilidad_routes',
+    'reporte_routes',
+    'importacion_routes',
+    'perfil_routes'
 ]
\ No newline at end of file
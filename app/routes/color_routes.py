@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_read_db, get_write_db
 from ..schemas.color_insumo_schema import ColorInsumoCreate, ColorInsumoUpdate, ColorInsumoInDB
 from ..crud.color_crud import (
     create_color,
@@ -24,7 +24,7 @@ router = APIRouter(
 @router.post("/", response_model=ColorInsumoInDB)
 async def crear_color(
     color: ColorInsumoCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Create a new color for a specific supply reference.
@@ -38,7 +38,7 @@ async def crear_color(
 async def obtener_colores_por_referencia(
     referencia_id: int = Path(..., ge=1),
     disponibles: bool = Query(False, description="Filtrar solo colores con stock"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all colors available for a specific reference.
@@ -52,7 +52,7 @@ async def obtener_colores_por_referencia(
 @router.get("/{color_id}", response_model=ColorInsumoInDB)
 async def obtener_color(
     color_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific color by its ID.
@@ -66,7 +66,7 @@ async def obtener_color(
 async def actualizar_color(
     color_id: int = Path(..., ge=1),
     color: ColorInsumoUpdate = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Update an existing color.
@@ -82,7 +82,7 @@ async def actualizar_color(
 @router.delete("/{color_id}")
 async def eliminar_color(
     color_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Delete a color if it has no associated inventory.
@@ -99,7 +99,7 @@ async def eliminar_color(
 async def buscar_colores(
     termino: str = Query(..., min_length=2),
     referencia_id: Optional[int] = Query(None, ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Search colors by name or code.
@@ -110,7 +110,7 @@ async def buscar_colores(
 async def obtener_colores_con_stock(
     referencia_id: int = Path(..., ge=1),
     cantidad_minima: float = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all colors for a reference that have at least the specified stock.
@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
-from ..database import get_db
+from ..database import get_read_db, get_write_db
 from ..schemas.cortina_schema import CortinaCreate, CortinaUpdate, CortinaInDB
 from ..crud.cortina_crud import (
     crear_cortina,
@@ -16,6 +16,7 @@ from ..crud.cortina_crud import (
     get_cortinas_by_diseno,
     get_consumo_materiales
 )
+from ..utils.write_queue import ejecutar_escritura
 
 router = APIRouter(
     prefix="/cortinas",
@@ -26,18 +27,20 @@ router = APIRouter(
 @router.post("/", response_model=CortinaInDB)
 async def crear_nueva_cortina(
     cortina: CortinaCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Create a new curtain with the given specifications."""
     try:
-        return await crear_cortina(db=db, cortina=cortina)
+        return await ejecutar_escritura(
+            db, lambda session: crear_cortina(db=session, cortina=cortina)
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{cortina_id}", response_model=CortinaInDB)
 async def get_cortina_by_id(
     cortina_id: int = Path(..., ge=1, description="ID de la cortina"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific curtain by ID."""
     db_cortina = await obtener_cortina(db, cortina_id=cortina_id)
@@ -52,7 +55,7 @@ async def obtener_cortinas(
     estado: Optional[str] = Query(None, description="Estado de la cortina"),
     fecha_inicio: Optional[datetime] = Query(None, description="Fecha inicial"),
     fecha_fin: Optional[datetime] = Query(None, description="Fecha final"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a list of curtains with optional filtering and pagination."""
     return await get_cortinas(
@@ -68,7 +71,7 @@ async def obtener_cortinas(
 async def actualizar_cortina(
     cortina_id: int = Path(..., ge=1, description="ID de la cortina a actualizar"),
     cortina: CortinaUpdate = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Update an existing curtain."""
     try:
@@ -82,7 +85,7 @@ async def actualizar_cortina(
 @router.delete("/{cortina_id}")
 async def eliminar_cortina(
     cortina_id: int = Path(..., ge=1, description="ID de la cortina a eliminar"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Delete a curtain and restore its inventory."""
     try:
@@ -97,7 +100,7 @@ async def eliminar_cortina(
 async def obtener_estadisticas(
     fecha_inicio: Optional[datetime] = None,
     fecha_fin: Optional[datetime] = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get curtain production statistics."""
     return await get_estadisticas_cortinas(
@@ -111,7 +114,7 @@ async def obtener_cortinas_por_diseno(
     diseno_id: int = Path(..., ge=1),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all curtains for a specific design."""
     return await get_cortinas_by_diseno(
@@ -125,7 +128,7 @@ async def obtener_cortinas_por_diseno(
 async def obtener_consumo_materiales(
     fecha_inicio: Optional[datetime] = None,
     fecha_fin: Optional[datetime] = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get material consumption statistics."""
     return await get_consumo_materiales(
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_read_db, get_write_db
 from ..schemas.diseno_schema import DisenoCreate, DisenoUpdate, DisenoInDB
 from ..crud.diseno_crud import (
     create_diseno,
@@ -22,7 +22,7 @@ router = APIRouter(
 @router.post("/", response_model=DisenoInDB)
 async def crear_diseno(
     diseno: DisenoCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Create a new curtain design with its associated supplies.
@@ -37,7 +37,7 @@ async def obtener_disenos(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = Query(None, min_length=2),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get list of designs with optional search.
@@ -47,7 +47,7 @@ async def obtener_disenos(
 @router.get("/{diseno_id}", response_model=DisenoInDB)
 async def obtener_diseno(
     diseno_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific design by its numeric ID.
@@ -60,7 +60,7 @@ async def obtener_diseno(
 @router.get("/codigo/{id_diseno}", response_model=DisenoInDB)
 async def obtener_diseno_por_codigo(
     id_diseno: str = Path(..., min_length=3),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific design by its friendly code.
@@ -74,7 +74,7 @@ async def obtener_diseno_por_codigo(
 async def actualizar_diseno(
     diseno_id: int = Path(..., ge=1),
     diseno: DisenoUpdate = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Update an existing design.
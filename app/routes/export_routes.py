@@ -5,7 +5,7 @@ from datetime import datetime
 import pandas as pd
 import io
 
-from ..database import get_db
+from ..database import get_read_db
 from ..crud.cortina_crud import get_cortinas
 from ..crud.diseno_crud import get_diseno
 
@@ -19,7 +19,7 @@ async def export_cortinas_to_excel(
     estado: Optional[str] = None,
     fecha_inicio: Optional[datetime] = None,
     fecha_fin: Optional[datetime] = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Exporta los datos de las cortinas a un archivo Excel.
@@ -0,0 +1,33 @@
+# app/routes/importacion_routes.py
+import io
+
+from fastapi import APIRouter, Depends, File, HTTPException, Path, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_write_db
+from ..schemas.importacion_schema import EntidadImportacion, ResultadoImportacion
+from ..services.importacion_service import importar_csv
+
+router = APIRouter(
+    prefix="/importacion",
+    tags=["importacion"]
+)
+
+@router.post("/{entidad}", response_model=ResultadoImportacion)
+async def importar_archivo(
+    entidad: EntidadImportacion = Path(..., description="Tabla destino de la importación"),
+    archivo: UploadFile = File(..., description="CSV en UTF-8 con cabecera"),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """
+    Importa un CSV de tipos de insumo, referencias, colores o inventario.
+    Las filas existentes (por nombre, código o referencia+color) se actualizan;
+    las filas con errores se informan sin detener la importación.
+    """
+    lineas = io.TextIOWrapper(archivo.file, encoding="utf-8-sig", newline="")
+    try:
+        return await importar_csv(db, entidad, lineas)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        lineas.detach()
@@ -3,12 +3,15 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Optional
 
-from ..database import get_db
+from ..database import get_read_db, get_write_db
 from ..schemas.inventario_schema import (
     InventarioInsumoCreate,
     InventarioInsumoUpdate,
     InventarioInsumoInDB,
-    MovimientoInventario
+    MovimientoInventario,
+    PronosticoInventario,
+    SugerenciaCompraInDB,
+    ParametrosReorden
 )
 from ..crud.inventario_crud import (
     create_inventario,
@@ -19,6 +22,9 @@ from ..crud.inventario_crud import (
     get_alertas_stock,
     verificar_disponibilidad
 )
+from ..services.forecasting import DemandForecaster, MetodoPronostico
+from ..services.reorden_service import recalcular_puntos_reorden, get_sugerencias_compra
+from ..utils.write_queue import ejecutar_escritura
 
 router = APIRouter(
     prefix="/inventario",
@@ -29,7 +35,7 @@ router = APIRouter(
 @router.post("/", response_model=InventarioInsumoInDB)
 async def crear_inventario(
     inventario: InventarioInsumoCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Create a new inventory record.
@@ -45,7 +51,7 @@ async def obtener_inventario(
     limit: int = Query(100, ge=1, le=100),
     solo_bajo_minimo: bool = Query(False, description="Solo mostrar items bajo mínimo"),
     tipo_insumo_id: Optional[int] = Query(None, description="Filtrar por tipo de insumo"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get list of inventory records with filtering options.
@@ -62,13 +68,15 @@ async def obtener_inventario(
 async def actualizar_stock(
     inventario_id: int = Path(..., ge=1),
     movimiento: MovimientoInventario = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Update stock levels for an inventory item.
     """
     try:
-        inventario, nivel_bajo = await update_stock(db, inventario_id, movimiento)
+        inventario, nivel_bajo = await ejecutar_escritura(
+            db, lambda session: update_stock(session, inventario_id, movimiento)
+        )
         return {
             "mensaje": "Stock actualizado correctamente",
             "nuevo_stock": inventario.cantidad,
@@ -79,13 +87,59 @@ async def actualizar_stock(
 
 @router.get("/alertas", response_model=List[Dict])
 async def obtener_alertas(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get list of inventory alerts.
     """
     return await get_alertas_stock(db)
 
+@router.get("/pronostico", response_model=List[PronosticoInventario])
+async def obtener_pronostico(
+    metodo: MetodoPronostico = Query(MetodoPronostico.EMA, description="media_movil o ema"),
+    ventana: int = Query(30, ge=1, le=365, description="Días para la media móvil"),
+    alpha: float = Query(0.3, gt=0, le=1, description="Factor de suavizado exponencial"),
+    historial_dias: int = Query(90, ge=7, le=730, description="Días de historial a considerar"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get consumption rate, days of stock and reorder date for every inventory item.
+    """
+    forecaster = DemandForecaster(
+        db,
+        metodo=metodo,
+        ventana=ventana,
+        alpha=alpha,
+        historial_dias=historial_dias
+    )
+    return await forecaster.pronosticar()
+
+@router.post("/reorden/recalcular", response_model=Dict)
+async def recalcular_reorden(
+    parametros: Optional[ParametrosReorden] = None,
+    db: AsyncSession = Depends(get_write_db)
+):
+    """
+    Recompute reorder points and purchase suggestions for the whole inventory.
+    """
+    parametros = parametros or ParametrosReorden()
+    return await recalcular_puntos_reorden(
+        db,
+        lead_time_dias=parametros.lead_time_dias,
+        dias_seguridad=parametros.dias_seguridad,
+        dias_cobertura=parametros.dias_cobertura
+    )
+
+@router.get("/reorden", response_model=List[SugerenciaCompraInDB])
+async def obtener_sugerencias_compra(
+    solo_requieren_compra: bool = Query(True, description="Solo items que requieren compra"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get the purchase suggestions from the last reorder computation.
+    """
+    return await get_sugerencias_compra(db, solo_requieren_compra=solo_requieren_compra)
+
 # @router.get("/stats", response_model=Dict)
 # async def obtener_estadisticas(
 #     db: AsyncSession = Depends(get_db)
@@ -111,7 +165,7 @@ async def verificar_stock_disponible(
     referencia_id: int = Path(..., ge=1),
     color_id: int = Path(..., ge=1),
     cantidad: float = Query(..., gt=0),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Check if there's enough stock available.
@@ -127,7 +181,7 @@ async def verificar_stock_disponible(
 @router.delete("/{inventario_id}")
 async def eliminar_inventario(
     inventario_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Delete an inventory record.
@@ -0,0 +1,44 @@
+# app/routes/perfil_routes.py
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query
+from fastapi.responses import FileResponse
+from typing import List, Optional
+
+from ..utils.perfilador import PERFILADOR_DIR, ruta_perfil, token_valido
+
+def _verificar_token(x_profile: Optional[str] = Header(None)):
+    """Same token as the profiled requests; anything else looks like a missing route"""
+    if not token_valido(x_profile):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+router = APIRouter(
+    prefix="/debug/perfiles",
+    tags=["debug"],
+    dependencies=[Depends(_verificar_token)],
+    include_in_schema=False
+)
+
+@router.get("/", response_model=List[str])
+async def listar_perfiles():
+    """
+    List stored profile ids, newest first.
+    """
+    if not PERFILADOR_DIR.exists():
+        return []
+    return sorted(
+        (ruta.name.split(".", 1)[0] for ruta in PERFILADOR_DIR.glob("*.speedscope.json")),
+        reverse=True
+    )
+
+@router.get("/{perfil_id}")
+async def descargar_perfil(
+    perfil_id: str = Path(..., pattern=r"^\d{8}T\d{6}-[0-9a-f]{8}$"),
+    formato: str = Query("speedscope", pattern="^(speedscope|colapsado)$")
+):
+    """
+    Download a profile as speedscope JSON or collapsed stacks.
+    """
+    ruta = ruta_perfil(perfil_id, formato)
+    if not ruta.exists():
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    media_type = "application/json" if formato == "speedscope" else "text/plain"
+    return FileResponse(ruta, media_type=media_type, filename=ruta.name)
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_read_db, get_write_db
 from ..schemas.referencia_insumo_schema import (
     ReferenciaInsumoCreate,
     ReferenciaInsumoUpdate,
@@ -27,7 +27,7 @@ router = APIRouter(
 @router.post("/", response_model=ReferenciaInsumoInDB)
 async def crear_referencia(
     referencia: ReferenciaInsumoCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Create a new supply reference.
@@ -43,7 +43,7 @@ async def obtener_referencias(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = Query(None, min_length=2),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get list of references with optional filtering and search.
@@ -55,7 +55,7 @@ async def obtener_referencias(
 @router.get("/{referencia_id}", response_model=ReferenciaInsumoInDB)
 async def obtener_referencia(
     referencia_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific reference by ID.
@@ -69,7 +69,7 @@ async def obtener_referencia(
 async def actualizar_referencia(
     referencia_id: int = Path(..., ge=1),
     referencia: ReferenciaInsumoUpdate = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Update an existing reference.
@@ -85,7 +85,7 @@ async def actualizar_referencia(
 @router.delete("/{referencia_id}")
 async def eliminar_referencia(
     referencia_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Delete a reference if it has no dependencies.
@@ -101,7 +101,7 @@ async def eliminar_referencia(
 @router.get("/tipo/{tipo_id}", response_model=List[ReferenciaInsumoInDB])
 async def obtener_referencias_por_tipo(
     tipo_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all references for a specific supply type.
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict
 
-from ..database import get_db
+from ..database import get_read_db
 from ..services.rentabilidad_service import calcular_precio_venta
 
 router = APIRouter(
@@ -27,7 +27,7 @@ async def calcular_precio_rentable(
         gt=0,
         le=2
     ),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     try:
         resultado = await calcular_precio_venta(db, cortina_id, rentabilidad)
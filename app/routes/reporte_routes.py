@@ -0,0 +1,94 @@
+# app/routes/reporte_routes.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime
+
+from ..database import get_read_db
+from ..schemas.reporte_schema import TendenciasResponse, ReporteJobCreate, ReporteJobStatus
+from ..models.reporte_job import ReporteJob
+from ..services.report_jobs import report_jobs
+from ..services.tendencias_service import get_tendencias
+from ..utils.time_buckets import Granularidad
+
+router = APIRouter(
+    prefix="/reportes",
+    tags=["reportes"]
+)
+
+@router.get("/tendencias", response_model=TendenciasResponse)
+async def obtener_tendencias(
+    granularidad: Granularidad = Query(Granularidad.MES, description="Tamaño del periodo: day, week o month"),
+    fecha_inicio: Optional[datetime] = Query(None, description="Fecha inicial"),
+    fecha_fin: Optional[datetime] = Query(None, description="Fecha final"),
+    diseno_id: Optional[int] = Query(None, ge=1, description="Filtrar por diseño"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get production trend series already bucketed by period and design.
+    """
+    return await get_tendencias(
+        db,
+        granularidad=granularidad,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        diseno_id=diseno_id
+    )
+
+@router.post("/jobs", response_model=ReporteJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def crear_job_reporte(solicitud: ReporteJobCreate):
+    """
+    Submit a report to be generated in the background.
+    Poll the returned job until it is completed, then download it.
+    """
+    if solicitud.fecha_inicio > solicitud.fecha_fin:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha inicial debe ser anterior a la fecha final"
+        )
+    return await report_jobs.enviar(
+        solicitud.tipo,
+        {
+            "fecha_inicio": solicitud.fecha_inicio,
+            "fecha_fin": solicitud.fecha_fin,
+            "formato": solicitud.formato
+        }
+    )
+
+async def _get_job_or_404(job_id: str) -> ReporteJob:
+    job = await report_jobs.obtener(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Trabajo de reporte {job_id} no encontrado"
+        )
+    return job
+
+@router.get("/jobs/{job_id}", response_model=ReporteJobStatus)
+async def obtener_job_reporte(job_id: str):
+    """
+    Get the status of a report job.
+    """
+    return await _get_job_or_404(job_id)
+
+@router.get("/jobs/{job_id}/descarga")
+async def descargar_job_reporte(job_id: str):
+    """
+    Download the file generated by a completed report job.
+    """
+    job = await _get_job_or_404(job_id)
+    if job.estado != ReporteJob.COMPLETADO:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El reporte aún no está disponible (estado: {job.estado})"
+        )
+
+    ruta = Path(job.ruta_archivo)
+    if not ruta.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El archivo del reporte ya no existe"
+        )
+    return FileResponse(ruta, filename=f"{job.tipo}_{job.id}{ruta.suffix}")
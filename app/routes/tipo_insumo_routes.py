@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_read_db, get_write_db
 from ..schemas.tipo_insumo_schema import TipoInsumoCreate, TipoInsumoUpdate, TipoInsumoInDB
 from ..crud.tipo_insumo_crud import (
     create_tipo_insumo,
@@ -23,7 +23,7 @@ router = APIRouter(
 @router.post("/", response_model=TipoInsumoInDB)
 async def crear_tipo_insumo(
     tipo: TipoInsumoCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Create a new supply type.
@@ -38,7 +38,7 @@ async def obtener_tipos_insumo(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = Query(None, min_length=2),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get list of supply types with optional search.
@@ -48,7 +48,7 @@ async def obtener_tipos_insumo(
 @router.get("/{tipo_id}", response_model=TipoInsumoInDB)
 async def obtener_tipo_insumo(
     tipo_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific supply type by ID.
@@ -62,7 +62,7 @@ async def obtener_tipo_insumo(
 async def actualizar_tipo_insumo(
     tipo_id: int = Path(..., ge=1),
     tipo: TipoInsumoUpdate = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Update an existing supply type.
@@ -78,7 +78,7 @@ async def actualizar_tipo_insumo(
 @router.delete("/{tipo_id}")
 async def eliminar_tipo_insumo(
     tipo_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Delete a supply type if it has no references.
@@ -94,7 +94,7 @@ async def eliminar_tipo_insumo(
 @router.get("/{tipo_id}/disponible")
 async def verificar_disponibilidad(
     tipo_id: int = Path(..., ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Check if a supply type is available for use.
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+EntidadImportacion = Literal["tipos_insumo", "referencias_insumo", "colores_insumo", "inventario_insumos"]
+
+class FilaTipoInsumo(BaseModel):
+    """Fila del CSV de tipos de insumo; clave: nombre"""
+    nombre: str = Field(..., min_length=3, max_length=100)
+    descripcion: Optional[str] = Field(None, max_length=500)
+
+class FilaReferencia(BaseModel):
+    """Fila del CSV de referencias; clave: codigo"""
+    codigo: str = Field(..., min_length=3, max_length=50)
+    nombre: str = Field(..., min_length=3, max_length=100)
+    precio_unitario: float = Field(..., gt=0)
+    tipo_insumo: str = Field(..., description="Nombre del tipo de insumo")
+
+class FilaColor(BaseModel):
+    """Fila del CSV de colores; clave: codigo"""
+    codigo: str = Field(..., min_length=3, max_length=50)
+    nombre: str = Field(..., min_length=3, max_length=100)
+    referencia_codigo: str = Field(..., description="Código de la referencia del color")
+
+class FilaInventario(BaseModel):
+    """Fila del CSV de inventario; clave: referencia_codigo + color_codigo"""
+    referencia_codigo: str
+    color_codigo: str
+    cantidad: float = Field(..., ge=0)
+    cantidad_minima: Optional[float] = Field(None, ge=0)
+    ubicacion: Optional[str] = Field(None, max_length=100)
+
+class ErrorFilaImportacion(BaseModel):
+    """Fila rechazada durante la importación"""
+    fila: int = Field(..., description="Número de línea en el CSV (la cabecera es la línea 1)")
+    clave: Optional[str] = Field(None, description="Clave natural de la fila, si se pudo leer")
+    error: str
+
+class ResultadoImportacion(BaseModel):
+    """Resumen de una importación masiva"""
+    entidad: EntidadImportacion
+    filas_leidas: int
+    duplicadas: int = Field(..., description="Filas repetidas en el archivo; se conserva la última")
+    nuevas: int
+    actualizadas: int
+    errores: List[ErrorFilaImportacion]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
 
 
 class MovimientoInventario(BaseModel):
@@ -67,4 +67,51 @@ class InventarioInsumoInDB(InventarioInsumoBase):
     fecha_actualizacion: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class PronosticoInventario(BaseModel):
+    """Schema para el pronóstico de consumo y días de stock de un registro de inventario"""
+    inventario_id: int
+    referencia_id: int
+    color_id: int
+    cantidad: float
+    cantidad_minima: float
+    consumo_diario: float = Field(..., description="Consumo diario estimado")
+    dias_stock: Optional[float] = Field(
+        None,
+        description="Días estimados hasta agotar el stock (None si no hay consumo)"
+    )
+    fecha_reorden: Optional[date] = Field(
+        None,
+        description="Fecha estimada en que el stock llega a la cantidad mínima"
+    )
+
+class SugerenciaCompraInDB(BaseModel):
+    """Schema para el punto de reorden y la compra sugerida de un registro de inventario"""
+    inventario_id: int
+    referencia_id: int
+    color_id: int
+    consumo_diario: float
+    lead_time_dias: float
+    dias_seguridad: float
+    stock_seguridad: float
+    punto_reorden: float
+    stock_objetivo: float
+    cantidad_sugerida: float
+    requiere_compra: bool
+    fecha_calculo: datetime
+
+    class Config:
+        orm_mode = True
+
+class ParametrosReorden(BaseModel):
+    """Parámetros opcionales para recalcular los puntos de reorden"""
+    lead_time_dias: Optional[float] = Field(
+        None, ge=0, description="Días entre el pedido y la llegada del material"
+    )
+    dias_seguridad: Optional[float] = Field(
+        None, ge=0, description="Días de consumo a mantener como stock de seguridad"
+    )
+    dias_cobertura: Optional[float] = Field(
+        None, ge=0, description="Días de consumo que debe cubrir cada compra"
+    )
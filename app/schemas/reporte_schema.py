@@ -0,0 +1,43 @@
+# app/schemas/reporte_schema.py
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional
+from datetime import datetime
+
+class PuntoTendencia(BaseModel):
+    """Valor agregado de un periodo dentro de una serie temporal"""
+    periodo: str = Field(..., description="Inicio del periodo (YYYY-MM-DD)")
+    cantidad: int = Field(..., description="Cortinas creadas en el periodo")
+    costo_total: float = Field(..., description="Suma del costo total de las cortinas del periodo")
+
+class SerieTendencia(BaseModel):
+    """Serie temporal de un diseño"""
+    diseno_id: int
+    diseno: str
+    puntos: List[PuntoTendencia]
+
+class TendenciasResponse(BaseModel):
+    """Series ya agrupadas por periodo, listas para graficar"""
+    granularidad: str = Field(..., description="day, week o month")
+    fecha_inicio: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+    series: List[SerieTendencia]
+    totales: List[PuntoTendencia]
+
+class ReporteJobCreate(BaseModel):
+    """Solicitud de un reporte a generar en segundo plano"""
+    tipo: Literal["rentabilidad"] = Field("rentabilidad", description="Tipo de reporte")
+    fecha_inicio: datetime
+    fecha_fin: datetime
+    formato: Literal["excel", "csv"] = Field("excel", description="excel genera un .xlsx; csv un .zip con los archivos")
+
+class ReporteJobStatus(BaseModel):
+    """Estado de un trabajo de reporte"""
+    id: str
+    tipo: str
+    estado: str = Field(..., description="pendiente, en_proceso, completado o error")
+    error: Optional[str] = None
+    fecha_creacion: datetime
+    fecha_inicio: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,10 @@
+# app/seed/__init__.py
+"""
+Generación de datos sintéticos para desarrollo, pruebas de carga y benchmarks.
+
+    python -m app.seed --preset 10k
+    python -m app.seed --preset 1m --semilla 7 --url sqlite+aiosqlite:///./bench_1m.db
+"""
+from .generador import PRESETS, Parametros, generar, parametros
+
+__all__ = ["PRESETS", "Parametros", "generar", "parametros"]
@@ -0,0 +1,55 @@
+# app/seed/__main__.py
+import argparse
+import asyncio
+import logging
+import os
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from ..migrations import run_migrations
+from ..utils.sqlite_tuning import PERFILES, aplicar_perfil
+from .generador import PRESETS, generar, parametros
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Genera catálogo y pedidos sintéticos reproducibles",
+        epilog="Presets: " + ", ".join(
+            f"{n} ({p.cortinas} cortinas, {p.referencias} referencias)" for n, p in PRESETS.items()
+        )
+    )
+    parser.add_argument("--preset", choices=list(PRESETS), default="10k")
+    parser.add_argument("--url", default=os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./cortinas.db"),
+                        help="Base de datos destino (por defecto DATABASE_URL)")
+    parser.add_argument("--semilla", type=int)
+    parser.add_argument("--cortinas", type=int)
+    parser.add_argument("--referencias", type=int)
+    parser.add_argument("--disenos", type=int)
+    parser.add_argument("--anios", type=float, help="Años de historia de pedidos")
+    parser.add_argument("--zipf", type=float, help="Sesgo de popularidad de los diseños")
+    parser.add_argument("--lote", type=int, help="Filas por INSERT")
+    parser.add_argument("--no-limpiar", action="store_true",
+                        help="Conserva los datos; si ya hay diseños solo agrega cortinas")
+    parser.add_argument("--perfil", choices=list(PERFILES), default="fast",
+                        help="Perfil de SQLite durante la carga")
+    args = parser.parse_args()
+
+    p = parametros(
+        args.preset, semilla=args.semilla, cortinas=args.cortinas, referencias=args.referencias,
+        disenos=args.disenos, anios=args.anios, zipf=args.zipf, lote=args.lote
+    )
+    engine = create_async_engine(args.url)
+    aplicar_perfil(engine, args.perfil)
+    try:
+        await run_migrations(engine)
+        resultado = await generar(engine, p, limpiar_antes=not args.no_limpiar)
+    finally:
+        await engine.dispose()
+
+    print(
+        f"{resultado['cortinas']} cortinas y {resultado['disenos']} diseños en "
+        f"{resultado['segundos_total']} s (catálogo {resultado['segundos_catalogo']} s)"
+    )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,351 @@
+# app/seed/generador.py
+"""
+Generador de datos sintéticos reproducibles (misma semilla, mismos datos).
+
+Produce un catálogo realista (tipos, referencias con precios log-normales,
+colores, inventario y diseños con sus materiales) y pedidos de cortinas con:
+
+- popularidad de diseños sesgada (ley de Zipf: pocos diseños concentran
+  la mayoría de los pedidos);
+- fechas con tendencia de crecimiento, estacionalidad anual y menos pedidos
+  los fines de semana, en horario laboral;
+- estado según la antigüedad del pedido y costos coherentes con el diseño.
+
+Las cortinas se generan por lotes con numpy y se insertan con INSERT de Core
+(executemany), en orden cronológico para que los ids crezcan con la fecha.
+"""
+import logging
+import time
+import unicodedata
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..models.color_insumo import ColorInsumo
+from ..models.cortina import Cortina
+from ..models.cortina_historico import CortinaHistorico
+from ..models.diseno import Diseno, DisenoTipoInsumo
+from ..models.inventario_insumo import InventarioInsumo
+from ..models.referencia_insumo import ReferenciaInsumo
+from ..models.reserva_inventario import ReservaInventario
+from ..models.sugerencia_compra import SugerenciaCompra
+from ..models.tipo_insumo import TipoInsumo
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Parametros:
+    """Tamaño y forma del conjunto de datos"""
+    referencias: int
+    disenos: int
+    cortinas: int
+    colores_por_tela: int = 8
+    anios: float = 3.0
+    zipf: float = 1.1
+    crecimiento_anual: float = 0.3
+    semilla: int = 42
+    lote: int = 50_000
+
+PRESETS: Dict[str, Parametros] = {
+    "demo": Parametros(referencias=30, disenos=5, cortinas=200),
+    "10k": Parametros(referencias=2_000, disenos=50, cortinas=10_000),
+    "1m": Parametros(referencias=5_000, disenos=200, cortinas=1_000_000),
+    "10m": Parametros(referencias=10_000, disenos=500, cortinas=10_000_000, lote=100_000)
+}
+
+# nombre, descripción, prefijo de código, precio base, peso en el catálogo
+TIPOS = [
+    ("Tela", "Telas para cortinas y persianas", "TEL", 55_000, 0.22),
+    ("Screen", "Telas tipo screen para control solar", "SCR", 85_000, 0.18),
+    ("Blackout", "Telas blackout para oscuridad total", "BLK", 75_000, 0.20),
+    ("Riel", "Sistemas de rieles y soportes", "RIL", 45_000, 0.08),
+    ("Cadena", "Sistemas de control manual", "CAD", 10_000, 0.06),
+    ("Motor", "Sistemas de automatización", "MOT", 250_000, 0.05),
+    ("Terminal", "Terminales y acabados decorativos", "TER", 20_000, 0.06),
+    ("Soporte", "Soportes de pared y techo", "SOP", 15_000, 0.06),
+    ("Cenefa", "Elementos decorativos superiores", "CEN", 30_000, 0.05),
+    ("Componente", "Componentes y accesorios varios", "COM", 8_000, 0.04)
+]
+TELAS = ("Tela", "Screen", "Blackout")
+
+LINEAS = ["Basic", "Premium", "Ultra", "Eco", "Pro", "Home", "Contract", "Select", "Plus", "Max"]
+COLORES = [
+    "Blanco", "Blanco Arena", "Marfil", "Beige", "Beige Claro", "Crema", "Lino", "Arena",
+    "Gris Perla", "Gris", "Gris Oxford", "Grafito", "Negro", "Azul", "Azul Marino",
+    "Verde Sage", "Verde Oliva", "Terracota", "Mostaza", "Chocolate", "Café", "Plata",
+    "Champagne", "Vino", "Coral", "Turquesa", "Lavanda", "Rosa Palo", "Durazno", "Bronce"
+]
+ACABADOS = ["Blanco", "Negro", "Plata", "Bronce", "Gris"]
+NOMBRES = ["Ana", "Carlos", "María", "Juan", "Laura", "Andrés", "Camila", "Felipe",
+           "Valentina", "Santiago", "Daniela", "Jorge", "Paula", "Diego", "Sofía", "Luis"]
+APELLIDOS = ["García", "Rodríguez", "Martínez", "López", "Gómez", "Pérez", "Sánchez",
+             "Ramírez", "Torres", "Díaz", "Vargas", "Castro", "Rojas", "Moreno", "Ortiz"]
+COMPLEJIDAD_MANO_OBRA = {"bajo": (30_000, 45_000), "medio": (45_000, 70_000), "alto": (90_000, 150_000)}
+
+# Tablas en orden de borrado (dependientes primero)
+TABLAS_LIMPIEZA = [
+    ReservaInventario, SugerenciaCompra, Cortina, CortinaHistorico,
+    DisenoTipoInsumo, Diseno, InventarioInsumo, ColorInsumo, ReferenciaInsumo, TipoInsumo
+]
+
+def _lotes(filas: List[Dict], tamano: int) -> Iterator[List[Dict]]:
+    for i in range(0, len(filas), tamano):
+        yield filas[i:i + tamano]
+
+async def _insertar(conn: AsyncConnection, modelo, filas: List[Dict], tamano: int) -> None:
+    for lote in _lotes(filas, tamano):
+        await conn.execute(insert(modelo.__table__), lote)
+
+async def limpiar(conn: AsyncConnection) -> None:
+    """Borra los datos de catálogo, inventario y pedidos"""
+    for modelo in TABLAS_LIMPIEZA:
+        await conn.execute(delete(modelo.__table__))
+
+async def generar_catalogo(conn: AsyncConnection, p: Parametros, rng: np.random.Generator) -> List[Dict]:
+    """
+    Inserta tipos, referencias, colores, inventario y diseños.
+
+    Returns:
+        Diseños generados con su costo de materiales por metro (para los pedidos)
+    """
+    ahora = datetime.utcnow()
+    await _insertar(conn, TipoInsumo, [
+        {"nombre": n, "descripcion": d, "fecha_creacion": ahora, "fecha_actualizacion": ahora}
+        for n, d, *_ in TIPOS
+    ], p.lote)
+    tipo_ids = dict((await conn.execute(select(TipoInsumo.nombre, TipoInsumo.id))).all())
+
+    # Referencias repartidas por tipo según su peso; al menos una por tipo
+    pesos = np.array([t[4] for t in TIPOS])
+    por_tipo = np.maximum(1, np.round(pesos / pesos.sum() * p.referencias)).astype(int)
+    referencias = []
+    for (nombre, _, prefijo, base, _), cantidad in zip(TIPOS, por_tipo):
+        precios = np.round(base * rng.lognormal(0, 0.35, cantidad), -2)
+        for i, precio in enumerate(precios, start=1):
+            referencias.append({
+                "tipo_insumo_id": tipo_ids[nombre],
+                "codigo": f"{prefijo}-{i:05d}",
+                "nombre": f"{nombre} {LINEAS[rng.integers(len(LINEAS))]} {i}",
+                "precio_unitario": float(max(precio, 1_000)),
+                "fecha_creacion": ahora,
+                "fecha_actualizacion": ahora
+            })
+    await _insertar(conn, ReferenciaInsumo, referencias, p.lote)
+    refs = (await conn.execute(
+        select(ReferenciaInsumo.id, ReferenciaInsumo.codigo, ReferenciaInsumo.precio_unitario, TipoInsumo.nombre)
+        .join(TipoInsumo, TipoInsumo.id == ReferenciaInsumo.tipo_insumo_id)
+        .order_by(ReferenciaInsumo.id)
+    )).all()
+
+    # Telas con muchos colores; herrajes con pocos acabados
+    colores = []
+    for ref_id, codigo, _, tipo in refs:
+        if tipo in TELAS:
+            cantidad = int(np.clip(rng.poisson(p.colores_por_tela), 1, len(COLORES)))
+            nombres = rng.choice(COLORES, cantidad, replace=False)
+        else:
+            nombres = rng.choice(ACABADOS, int(rng.integers(1, 4)), replace=False)
+        colores.extend(
+            {"referencia_id": ref_id, "codigo": f"{codigo}-{k:02d}", "nombre": str(n),
+             "fecha_creacion": ahora, "fecha_actualizacion": ahora}
+            for k, n in enumerate(nombres, start=1)
+        )
+    await _insertar(conn, ColorInsumo, colores, p.lote)
+
+    color_rows = (await conn.execute(
+        select(ColorInsumo.id, ColorInsumo.referencia_id).order_by(ColorInsumo.id)
+    )).all()
+    cantidades = np.round(rng.gamma(2.0, 60.0, len(color_rows)), 1)
+    minimos = np.round(rng.uniform(5, 40, len(color_rows)), 0)
+    await _insertar(conn, InventarioInsumo, [
+        {"referencia_id": ref_id, "color_id": color_id, "cantidad": float(c), "cantidad_minima": float(m),
+         "ubicacion": f"Bodega {1 + color_id % 3}", "fecha_ultima_entrada": ahora,
+         "fecha_creacion": ahora, "fecha_actualizacion": ahora}
+        for (color_id, ref_id), c, m in zip(color_rows, cantidades, minimos)
+    ], p.lote)
+
+    # Precio medio por tipo, para estimar el costo de materiales de cada diseño
+    precio_medio = {}
+    for _, _, precio, tipo in refs:
+        precio_medio.setdefault(tipo, []).append(precio)
+    precio_medio = {t: float(np.mean(v)) for t, v in precio_medio.items()}
+
+    disenos = []
+    for i in range(1, p.disenos + 1):
+        complejidad = str(rng.choice(["bajo", "medio", "alto"], p=[0.4, 0.4, 0.2]))
+        tela = str(rng.choice(TELAS))
+        control = "Motor" if complejidad == "alto" else "Cadena"
+        materiales = [(tela, float(np.round(rng.uniform(2.0, 2.6), 2))), ("Riel", 1.0), (control, 1.0), ("Terminal", 1.0)]
+        if rng.random() < 0.5:
+            materiales.append(("Cenefa", 1.0))
+        disenos.append({
+            "id_diseno": f"DIS-{i:04d}",
+            "nombre": f"Cortina {tela} {LINEAS[i % len(LINEAS)]} {i}",
+            "descripcion": f"Cortina de {tela.lower()} con control {control.lower()}",
+            "costo_mano_obra": float(np.round(rng.uniform(*COMPLEJIDAD_MANO_OBRA[complejidad]), -2)),
+            "complejidad": complejidad,
+            "fecha_creacion": ahora,
+            "fecha_actualizacion": ahora,
+            "_materiales": materiales
+        })
+    await _insertar(conn, Diseno, [
+        {k: v for k, v in d.items() if not k.startswith("_")} for d in disenos
+    ], p.lote)
+    diseno_ids = dict((await conn.execute(select(Diseno.id_diseno, Diseno.id))).all())
+
+    await _insertar(conn, DisenoTipoInsumo, [
+        {"diseno_id": diseno_ids[d["id_diseno"]], "tipo_insumo_id": tipo_ids[tipo],
+         "cantidad_por_metro": cantidad, "descripcion": f"{tipo} del diseño"}
+        for d in disenos for tipo, cantidad in d["_materiales"]
+    ], p.lote)
+
+    return [
+        {
+            "id": diseno_ids[d["id_diseno"]],
+            "costo_mano_obra": d["costo_mano_obra"],
+            "costo_por_metro": sum(precio_medio.get(t, 0.0) * c for t, c in d["_materiales"])
+        }
+        for d in disenos
+    ]
+
+async def disenos_existentes(conn: AsyncConnection) -> List[Dict]:
+    """Diseños ya cargados, con su costo de materiales por metro estimado"""
+    precio_tipo = dict((await conn.execute(
+        select(ReferenciaInsumo.tipo_insumo_id, func.avg(ReferenciaInsumo.precio_unitario))
+        .group_by(ReferenciaInsumo.tipo_insumo_id)
+    )).all())
+    costos: Dict[int, float] = {}
+    for diseno_id, tipo_id, cantidad in (await conn.execute(
+        select(DisenoTipoInsumo.diseno_id, DisenoTipoInsumo.tipo_insumo_id, DisenoTipoInsumo.cantidad_por_metro)
+    )).all():
+        costos[diseno_id] = costos.get(diseno_id, 0.0) + float(precio_tipo.get(tipo_id) or 0) * cantidad
+    return [
+        {"id": diseno_id, "costo_mano_obra": float(mano_obra or 0), "costo_por_metro": costos.get(diseno_id, 0.0)}
+        for diseno_id, mano_obra in (await conn.execute(select(Diseno.id, Diseno.costo_mano_obra))).all()
+    ]
+
+def _pesos_diarios(dias: int, p: Parametros, inicio: datetime) -> np.ndarray:
+    t = np.arange(dias)
+    fechas = np.datetime64(inicio.date()) + t
+    dia_semana = (fechas.astype("datetime64[D]").view("int64") - 4) % 7  # 0 = lunes
+    tendencia = (1 + p.crecimiento_anual) ** (t / 365.25)
+    estacionalidad = 1 + 0.25 * np.sin(2 * np.pi * (t / 365.25 - 0.2))
+    semana = np.where(dia_semana == 6, 0.15, np.where(dia_semana == 5, 0.5, 1.0))
+    pesos = tendencia * estacionalidad * semana
+    return pesos / pesos.sum()
+
+def lotes_cortinas(
+    disenos: List[Dict], p: Parametros, rng: np.random.Generator, hasta: Optional[datetime] = None
+) -> Iterator[List[Dict]]:
+    """
+    Genera las cortinas por lotes de p.lote filas, en orden cronológico.
+    """
+    hasta = hasta or datetime.utcnow().replace(microsecond=0)
+    dias = max(1, int(p.anios * 365.25))
+    inicio = (hasta - timedelta(days=dias)).replace(hour=0, minute=0, second=0)
+
+    # Pedidos por día (multinomial) y popularidad de diseños (Zipf sobre un orden aleatorio)
+    por_dia = rng.multinomial(p.cortinas, _pesos_diarios(dias, p, inicio))
+    limites = np.cumsum(por_dia)
+    rangos = rng.permutation(len(disenos)) + 1
+    popularidad = 1.0 / rangos ** p.zipf
+    popularidad /= popularidad.sum()
+
+    ids = np.array([d["id"] for d in disenos])
+    mano_obra = np.array([d["costo_mano_obra"] for d in disenos])
+    por_metro = np.array([d["costo_por_metro"] for d in disenos])
+    clientes = [f"{n} {a}" for n in NOMBRES for a in APELLIDOS]
+    usuarios = [
+        unicodedata.normalize("NFKD", c.lower().replace(" ", ".")).encode("ascii", "ignore").decode()
+        for c in clientes
+    ]
+
+    for desde in range(0, p.cortinas, p.lote):
+        n = min(p.lote, p.cortinas - desde)
+        dia = np.searchsorted(limites, np.arange(desde, desde + n), side="right")
+        segundos = rng.integers(8 * 3600, 19 * 3600, n)
+        # Orden cronológico dentro del lote: los días ya vienen ordenados
+        orden = np.lexsort((segundos, dia))
+        dia, segundos = dia[orden], segundos[orden]
+        edad = dias - dia
+
+        d = rng.choice(len(disenos), n, p=popularidad)
+        ancho = np.round(np.clip(rng.normal(160, 45, n), 40, 400), 0)
+        alto = np.round(np.clip(rng.normal(200, 35, n), 60, 350), 0)
+        partida = rng.random(n) < 0.1
+        multiplicador = np.where(rng.random(n) < 0.12, rng.integers(2, 5, n), 1)
+        materiales = np.round(ancho / 100 * (alto / 200) * por_metro[d] * multiplicador, 2)
+        mano = np.round(mano_obra[d] * multiplicador, 2)
+        azar = rng.random(n)
+        # Estados de la aplicación: pendiente -> produccion -> finalizado -> entregado
+        estado = np.where(
+            azar < 0.04, "cancelado",
+            np.where(edad > 30, "entregado",
+                     np.where(edad > 7, np.where(azar < 0.7, "finalizado", "produccion"),
+                              np.where(azar < 0.6, "pendiente", "produccion")))
+        )
+        cliente = rng.integers(len(clientes), size=n)
+        telefono = rng.integers(3_000_000_000, 3_299_999_999, size=n)
+
+        fechas = [inicio + timedelta(days=int(x), seconds=int(s)) for x, s in zip(dia, segundos)]
+        yield [
+            {
+                "diseno_id": int(ids[di]),
+                "ancho": float(an), "alto": float(al),
+                "partida": bool(pa), "multiplicador": int(mu),
+                "costo_materiales": float(ma), "costo_mano_obra": float(mo), "costo_total": float(ma + mo),
+                "estado": str(es),
+                "cliente": clientes[cl], "telefono": str(te),
+                "email": f"{usuarios[cl]}{cl}@example.com",
+                "fecha_creacion": fe, "fecha_actualizacion": fe
+            }
+            for di, an, al, pa, mu, ma, mo, es, cl, te, fe in zip(
+                d, ancho, alto, partida, multiplicador, materiales, mano, estado, cliente, telefono, fechas
+            )
+        ]
+
+async def generar(engine: AsyncEngine, p: Parametros, limpiar_antes: bool = True) -> Dict:
+    """
+    Genera el conjunto de datos completo.
+
+    Con limpiar_antes=False y diseños ya cargados, conserva el catálogo y
+    solo agrega cortinas.
+
+    Returns:
+        Dict con los conteos generados y la duración
+    """
+    rng = np.random.default_rng(p.semilla)
+    inicio = time.perf_counter()
+
+    async with engine.begin() as conn:
+        if limpiar_antes:
+            await limpiar(conn)
+        disenos = [] if limpiar_antes else await disenos_existentes(conn)
+        if not disenos:
+            disenos = await generar_catalogo(conn, p, rng)
+    catalogo = time.perf_counter() - inicio
+    logger.info(f"Catálogo listo en {catalogo:.1f} s ({len(disenos)} diseños)")
+
+    insertadas = 0
+    tabla = insert(Cortina.__table__)
+    for lote in lotes_cortinas(disenos, p, rng):
+        # Una transacción por lote: progreso visible y WAL acotado
+        async with engine.begin() as conn:
+            await conn.execute(tabla, lote)
+        insertadas += len(lote)
+        logger.info(f"{insertadas}/{p.cortinas} cortinas")
+
+    return {
+        "disenos": len(disenos),
+        "cortinas": insertadas,
+        "segundos_catalogo": round(catalogo, 1),
+        "segundos_total": round(time.perf_counter() - inicio, 1)
+    }
+
+def parametros(preset: str, **cambios) -> Parametros:
+    """Parámetros del preset con los cambios indicados (los None se ignoran)"""
+    return replace(PRESETS[preset], **{k: v for k, v in cambios.items() if v is not None})
@@ -0,0 +1,378 @@
+# app/services/analytics_export.py
+"""
+Exportación de snapshots columnares (Parquet / Arrow IPC) para análisis offline.
+
+Cada dataset se escribe en su propio directorio como archivos `part-*.parquet`
+(o `part-*.arrow`) generados por bloques, sin cargar la tabla completa en
+memoria. En modo incremental solo se exportan las filas con
+`fecha_actualizacion` igual o posterior a la marca de agua guardada en
+`_estado.json`; las que tienen la misma marca y ya se exportaron (sus claves
+quedan en el estado) se omiten, así no se pierden filas escritas en el mismo
+instante que la última exportada. Los lectores deben quedarse con la versión más
+reciente de cada `id` al combinar las partes. Los datasets de cortinas incluyen
+las archivadas en cortinas_historico.
+
+Uso:
+    python -m app.services.analytics_export --salida analytics --incremental
+"""
+import argparse
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Float, Select, and_, cast, not_, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..crud.cortina_historico_crud import fuente_cortinas
+from ..database import engine
+from ..models.color_insumo import ColorInsumo
+from ..models.diseno import Diseno, DisenoTipoInsumo
+from ..models.inventario_insumo import InventarioInsumo
+from ..models.referencia_insumo import ReferenciaInsumo
+from ..models.tipo_insumo import TipoInsumo
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = ("parquet", "arrow")
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    Describe un dataset exportable: su esquema, consulta, columna de marca de
+    agua y el campo que identifica a la fila de origen (`clave`)
+    """
+    nombre: str
+    schema: pa.Schema
+    consulta: Callable[[], Select]
+    marca_agua: object
+    clave: str = "id"
+
+# Cortinas activas y archivadas: el snapshot cubre toda la historia
+_CORTINAS = fuente_cortinas(True)
+
+def _consulta_cortinas() -> Select:
+    # Teléfono y email del cliente no se exportan: no aportan al análisis
+    return (
+        select(
+            _CORTINAS.c.id,
+            _CORTINAS.c.diseno_id,
+            Diseno.nombre.label("diseno"),
+            cast(_CORTINAS.c.ancho, Float).label("ancho"),
+            cast(_CORTINAS.c.alto, Float).label("alto"),
+            _CORTINAS.c.partida,
+            _CORTINAS.c.multiplicador,
+            _CORTINAS.c.estado,
+            cast(_CORTINAS.c.costo_materiales, Float).label("costo_materiales"),
+            cast(_CORTINAS.c.costo_mano_obra, Float).label("costo_mano_obra"),
+            cast(_CORTINAS.c.costo_total, Float).label("costo_total"),
+            _CORTINAS.c.cliente,
+            _CORTINAS.c.fecha_creacion,
+            _CORTINAS.c.fecha_actualizacion
+        )
+        .select_from(_CORTINAS)
+        # outer: el archivo no tiene clave foránea y sobrevive a los diseños borrados
+        .outerjoin(Diseno, _CORTINAS.c.diseno_id == Diseno.id)
+    )
+
+def _consulta_consumo_materiales() -> Select:
+    cantidad = (
+        DisenoTipoInsumo.cantidad_por_metro
+        * cast(_CORTINAS.c.ancho, Float) / 100
+        * _CORTINAS.c.multiplicador
+    )
+    return (
+        select(
+            _CORTINAS.c.id.label("cortina_id"),
+            _CORTINAS.c.diseno_id,
+            DisenoTipoInsumo.tipo_insumo_id,
+            TipoInsumo.nombre.label("tipo_insumo"),
+            DisenoTipoInsumo.referencia_id,
+            ReferenciaInsumo.codigo.label("referencia_codigo"),
+            DisenoTipoInsumo.color_id,
+            ColorInsumo.codigo.label("color_codigo"),
+            cantidad.label("cantidad"),
+            (cantidad * ReferenciaInsumo.precio_unitario).label("costo"),
+            _CORTINAS.c.estado,
+            _CORTINAS.c.fecha_creacion,
+            _CORTINAS.c.fecha_actualizacion
+        )
+        .select_from(_CORTINAS)
+        .join(DisenoTipoInsumo, DisenoTipoInsumo.diseno_id == _CORTINAS.c.diseno_id)
+        .join(TipoInsumo, TipoInsumo.id == DisenoTipoInsumo.tipo_insumo_id)
+        .outerjoin(ReferenciaInsumo, ReferenciaInsumo.id == DisenoTipoInsumo.referencia_id)
+        .outerjoin(ColorInsumo, ColorInsumo.id == DisenoTipoInsumo.color_id)
+    )
+
+def _consulta_inventario() -> Select:
+    return select(
+        InventarioInsumo.id,
+        InventarioInsumo.referencia_id,
+        InventarioInsumo.color_id,
+        InventarioInsumo.cantidad,
+        InventarioInsumo.cantidad_minima,
+        InventarioInsumo.ubicacion,
+        InventarioInsumo.fecha_ultima_entrada,
+        InventarioInsumo.fecha_ultima_salida,
+        InventarioInsumo.fecha_creacion,
+        InventarioInsumo.fecha_actualizacion
+    )
+
+TIMESTAMP = pa.timestamp("us")
+
+DATASETS: Dict[str, Dataset] = {
+    "cortinas": Dataset(
+        nombre="cortinas",
+        schema=pa.schema([
+            ("id", pa.int64()),
+            ("diseno_id", pa.int64()),
+            ("diseno", pa.string()),
+            ("ancho", pa.float64()),
+            ("alto", pa.float64()),
+            ("partida", pa.bool_()),
+            ("multiplicador", pa.int32()),
+            ("estado", pa.string()),
+            ("costo_materiales", pa.float64()),
+            ("costo_mano_obra", pa.float64()),
+            ("costo_total", pa.float64()),
+            ("cliente", pa.string()),
+            ("fecha_creacion", TIMESTAMP),
+            ("fecha_actualizacion", TIMESTAMP)
+        ]),
+        consulta=_consulta_cortinas,
+        marca_agua=_CORTINAS.c.fecha_actualizacion
+    ),
+    "consumo_materiales": Dataset(
+        nombre="consumo_materiales",
+        schema=pa.schema([
+            ("cortina_id", pa.int64()),
+            ("diseno_id", pa.int64()),
+            ("tipo_insumo_id", pa.int64()),
+            ("tipo_insumo", pa.string()),
+            ("referencia_id", pa.int64()),
+            ("referencia_codigo", pa.string()),
+            ("color_id", pa.int64()),
+            ("color_codigo", pa.string()),
+            ("cantidad", pa.float64()),
+            ("costo", pa.float64()),
+            ("estado", pa.string()),
+            ("fecha_creacion", TIMESTAMP),
+            ("fecha_actualizacion", TIMESTAMP)
+        ]),
+        consulta=_consulta_consumo_materiales,
+        marca_agua=_CORTINAS.c.fecha_actualizacion,
+        # Todas las filas de una cortina comparten su fecha_actualizacion
+        clave="cortina_id"
+    ),
+    "inventario_insumos": Dataset(
+        nombre="inventario_insumos",
+        schema=pa.schema([
+            ("id", pa.int64()),
+            ("referencia_id", pa.int64()),
+            ("color_id", pa.int64()),
+            ("cantidad", pa.float64()),
+            ("cantidad_minima", pa.float64()),
+            ("ubicacion", pa.string()),
+            ("fecha_ultima_entrada", TIMESTAMP),
+            ("fecha_ultima_salida", TIMESTAMP),
+            ("fecha_creacion", TIMESTAMP),
+            ("fecha_actualizacion", TIMESTAMP)
+        ]),
+        consulta=_consulta_inventario,
+        marca_agua=InventarioInsumo.fecha_actualizacion
+    )
+}
+
+class AnalyticsSnapshotExporter:
+    """
+    Escribe los datasets de análisis en formato columnar comprimido,
+    leyendo la base de datos por bloques mediante un cursor de streaming.
+    """
+    def __init__(
+        self,
+        salida: Path = Path("analytics"),
+        formato: str = "parquet",
+        chunk_size: int = 50_000,
+        compresion: str = "zstd",
+        db_engine: AsyncEngine = engine
+    ):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {formato}")
+        self.salida = Path(salida)
+        self.formato = formato
+        self.chunk_size = chunk_size
+        self.compresion = compresion
+        self.engine = db_engine
+        self.archivo_estado = self.salida / "_estado.json"
+
+    def _leer_estado(self) -> Dict[str, Dict]:
+        if not self.archivo_estado.exists():
+            return {}
+        return json.loads(self.archivo_estado.read_text(encoding="utf-8"))
+
+    def _guardar_estado(self, estado: Dict[str, Dict]) -> None:
+        temporal = self.archivo_estado.with_suffix(".tmp")
+        temporal.write_text(json.dumps(estado, indent=2), encoding="utf-8")
+        temporal.replace(self.archivo_estado)
+
+    def _abrir_writer(self, ruta: Path, schema: pa.Schema):
+        if self.formato == "parquet":
+            return pq.ParquetWriter(ruta, schema, compression=self.compresion)
+        opciones = pa.ipc.IpcWriteOptions(compression=self.compresion)
+        return pa.ipc.new_file(pa.OSFile(str(ruta), "wb"), schema, options=opciones)
+
+    @staticmethod
+    def _a_tabla(filas: List, schema: pa.Schema) -> pa.Table:
+        """Convierte un bloque de filas a columnas Arrow con el esquema fijo del dataset"""
+        columnas = list(zip(*filas))
+        return pa.Table.from_arrays(
+            [pa.array(col, type=campo.type) for col, campo in zip(columnas, schema)],
+            schema=schema
+        )
+
+    async def exportar_dataset(
+        self,
+        dataset: Dataset,
+        desde: Optional[datetime] = None,
+        exportados: Iterable = ()
+    ) -> Dict:
+        """
+        Exporta un dataset a una nueva parte. Con `desde` solo incluye las filas
+        modificadas en esa fecha o después, salvo las de fecha igual a `desde`
+        cuya clave está en `exportados`.
+
+        Returns:
+            Dict con la ruta escrita, filas exportadas, la nueva marca de agua y
+            las claves de las filas con esa marca (`ids_marca`)
+        """
+        directorio = self.salida / dataset.nombre
+        directorio.mkdir(parents=True, exist_ok=True)
+        marca = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        ruta = directorio / f"part-{marca}.{self.formato}"
+
+        stmt = dataset.consulta()
+        exportados = set(exportados)
+        if desde is not None:
+            stmt = stmt.where(dataset.marca_agua >= desde)
+            if exportados:
+                clave = stmt.selected_columns[dataset.clave]
+                stmt = stmt.where(not_(and_(
+                    dataset.marca_agua == desde, clave.in_(sorted(exportados))
+                )))
+
+        filas_totales = 0
+        nueva_marca = desde
+        # Si la marca no avanza se conservan las claves ya exportadas con ella
+        ids_marca = exportados if desde is not None else set()
+        indice_marca = dataset.schema.get_field_index("fecha_actualizacion")
+        indice_clave = dataset.schema.get_field_index(dataset.clave)
+        writer = None
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.stream(
+                    stmt.execution_options(yield_per=self.chunk_size)
+                )
+                async for bloque in result.partitions(self.chunk_size):
+                    if writer is None:
+                        writer = self._abrir_writer(ruta, dataset.schema)
+                    tabla = self._a_tabla(bloque, dataset.schema)
+                    await asyncio.to_thread(writer.write_table, tabla)
+
+                    filas_totales += len(bloque)
+                    for fila in bloque:
+                        fecha = fila[indice_marca]
+                        if fecha is None:
+                            continue
+                        if nueva_marca is None or fecha > nueva_marca:
+                            nueva_marca, ids_marca = fecha, {fila[indice_clave]}
+                        elif fecha == nueva_marca:
+                            ids_marca.add(fila[indice_clave])
+        finally:
+            if writer is not None:
+                await asyncio.to_thread(writer.close)
+
+        logger.info(f"Dataset {dataset.nombre}: {filas_totales} filas exportadas")
+        return {
+            "ruta": ruta if filas_totales else None,
+            "filas": filas_totales,
+            "marca_agua": nueva_marca,
+            "ids_marca": sorted(ids_marca)
+        }
+
+    async def exportar(
+        self,
+        incremental: bool = False,
+        datasets: Optional[List[str]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Exporta los datasets solicitados (todos por defecto).
+
+        En modo completo reemplaza las partes existentes de cada dataset una vez
+        escrita la nueva; en modo incremental agrega una parte con los cambios.
+        """
+        self.salida.mkdir(parents=True, exist_ok=True)
+        estado = self._leer_estado()
+        resumen = {}
+
+        for nombre in datasets or list(DATASETS):
+            dataset = DATASETS[nombre]
+            previo = estado.get(nombre, {})
+            desde = None
+            exportados = []
+            if incremental and previo.get("marca_agua"):
+                desde = datetime.fromisoformat(previo["marca_agua"])
+                exportados = previo.get("ids_marca", [])
+
+            resultado = await self.exportar_dataset(dataset, desde=desde, exportados=exportados)
+
+            if not incremental:
+                for parte in (self.salida / nombre).glob(f"part-*.{self.formato}"):
+                    if parte != resultado["ruta"]:
+                        parte.unlink()
+
+            marca_agua = resultado["marca_agua"]
+            estado[nombre] = {
+                "marca_agua": marca_agua.isoformat() if marca_agua else None,
+                "ids_marca": resultado["ids_marca"],
+                "ultima_ejecucion": datetime.utcnow().isoformat(),
+                "filas_ultima_ejecucion": resultado["filas"],
+                "modo": "incremental" if incremental else "completo"
+            }
+            self._guardar_estado(estado)
+            resumen[nombre] = resultado
+
+        return resumen
+
+async def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Exporta snapshots columnares de cortinas, consumo e inventario"
+    )
+    parser.add_argument("--salida", default="analytics", help="Directorio de salida")
+    parser.add_argument("--formato", choices=FORMATOS, default="parquet")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Exporta solo filas modificadas desde la última ejecución")
+    parser.add_argument("--chunk", type=int, default=50_000, help="Filas por bloque")
+    parser.add_argument("--dataset", action="append", choices=list(DATASETS),
+                        help="Dataset a exportar (repetible); por defecto todos")
+    args = parser.parse_args(argv)
+
+    exporter = AnalyticsSnapshotExporter(
+        salida=Path(args.salida),
+        formato=args.formato,
+        chunk_size=args.chunk
+    )
+    try:
+        resumen = await exporter.exportar(incremental=args.incremental, datasets=args.dataset)
+    finally:
+        await engine.dispose()
+
+    for nombre, resultado in resumen.items():
+        print(f"{nombre}: {resultado['filas']} filas -> {resultado['ruta'] or 'sin cambios'}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+# app/services/archivo_service.py
+"""
+Archivo de cortinas en estado terminal.
+
+La tabla cortinas crece sin límite y la recorren los listados, las
+estadísticas y los reportes. Este módulo mueve, en lotes, las cortinas en
+estado terminal (por defecto entregado y cancelado; ARCHIVO_ESTADOS) cuya
+fecha_creacion supera una antigüedad configurable a cortinas_historico,
+conservando el id. Cada lote se copia y se borra de cortinas en una misma
+transacción; opcionalmente se escribe además un segmento JSONL comprimido
+con las filas archivadas.
+
+Las lecturas consultan el archivo solo cuando el rango de fechas pedido
+alcanza fechas archivadas; ver app.crud.cortina_historico_crud.
+
+Uso como tarea programada:
+    python -m app.services.archivo_service [--dias 365] [--lote 5000] [--segmentos DIR]
+        [--estados entregado cancelado finalizado]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..crud.cortina_historico_crud import COLUMNAS
+from ..models.cortina import Cortina
+from ..models.cortina_historico import CortinaHistorico
+from ..utils.cache_http import etiquetar
+from ..utils.transaction import transaction_scope
+
+logger = logging.getLogger(__name__)
+
+# Estados que ya no cambian, separados por comas. "finalizado" (fabricada,
+# sin entregar) no se incluye por defecto porque todavía pasa a entregado
+ESTADOS_TERMINALES = tuple(
+    e.strip() for e in os.getenv("ARCHIVO_ESTADOS", "entregado,cancelado").split(",") if e.strip()
+)
+
+ARCHIVO_DIAS = int(os.getenv("ARCHIVO_DIAS", "365"))
+ARCHIVO_LOTE = int(os.getenv("ARCHIVO_LOTE", "5000"))
+# Directorio para segmentos JSONL comprimidos; vacío los desactiva
+ARCHIVO_SEGMENTOS_DIR = os.getenv("ARCHIVO_SEGMENTOS_DIR") or None
+
+def _valor_json(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return valor
+
+def _escribir_segmento(directorio: Path, filas: List[Dict[str, Any]]) -> Path:
+    """Escribe un segmento JSONL gzip con las filas de un lote (bloqueante)"""
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta = directorio / f"cortinas_{filas[0]['id']}_{filas[-1]['id']}.jsonl.gz"
+    temporal = ruta.with_suffix(".tmp")
+    with gzip.open(temporal, "wt", encoding="utf-8") as archivo:
+        for fila in filas:
+            archivo.write(json.dumps({k: _valor_json(v) for k, v in fila.items()}, ensure_ascii=False))
+            archivo.write("\n")
+    temporal.replace(ruta)
+    return ruta
+
+async def _archivar_lote(
+    db: AsyncSession,
+    corte: datetime,
+    desde_id: int,
+    lote: int,
+    segmentos: Optional[Path],
+    estados: Tuple[str, ...]
+) -> Tuple[int, int]:
+    """Archiva un lote con id > desde_id; retorna (filas archivadas, último id)"""
+    activas = Cortina.__table__
+    async with transaction_scope(db):
+        etiquetar(db, "cortinas", "cortinas_historico")
+        result = await db.execute(
+            select(*[activas.c[n] for n in COLUMNAS])
+            .where(
+                activas.c.estado.in_(estados),
+                activas.c.fecha_creacion < corte,
+                activas.c.id > desde_id
+            )
+            .order_by(activas.c.id)
+            .limit(lote)
+        )
+        filas = [dict(fila) for fila in result.mappings()]
+        if not filas:
+            return 0, desde_id
+
+        ahora = datetime.utcnow()
+        await db.execute(
+            insert(CortinaHistorico.__table__),
+            [{**fila, "fecha_archivo": ahora} for fila in filas]
+        )
+        ids = [fila["id"] for fila in filas]
+        await db.execute(delete(activas).where(activas.c.id.in_(ids)))
+
+        # El segmento se escribe antes del commit: si el commit falla las filas
+        # siguen activas y el siguiente intento reescribe el mismo archivo
+        if segmentos is not None:
+            await asyncio.to_thread(_escribir_segmento, segmentos, filas)
+
+    return len(filas), ids[-1]
+
+async def archivar_cortinas(
+    db: AsyncSession,
+    dias: Optional[int] = None,
+    lote: Optional[int] = None,
+    directorio_segmentos: Optional[str] = None,
+    estados: Optional[Sequence[str]] = None
+) -> Dict:
+    """
+    Mueve a cortinas_historico las cortinas en estado terminal con más de
+    `dias` de antigüedad, en lotes de `lote` filas con un commit por lote.
+
+    Args:
+        db: Sesión de base de datos asíncrona
+        dias: Antigüedad mínima en días (por defecto ARCHIVO_DIAS)
+        lote: Filas por transacción (por defecto ARCHIVO_LOTE)
+        directorio_segmentos: Directorio para segmentos JSONL gzip
+            (por defecto ARCHIVO_SEGMENTOS_DIR; None los desactiva)
+        estados: Estados a archivar (por defecto ESTADOS_TERMINALES)
+
+    Returns:
+        Dict con el resumen de la ejecución
+    """
+    dias = ARCHIVO_DIAS if dias is None else dias
+    lote = ARCHIVO_LOTE if lote is None else lote
+    if lote <= 0:
+        raise ValueError("El tamaño de lote debe ser mayor que cero")
+    estados = tuple(ESTADOS_TERMINALES if estados is None else estados)
+    if not estados:
+        raise ValueError("Debe indicarse al menos un estado a archivar")
+    directorio = directorio_segmentos or ARCHIVO_SEGMENTOS_DIR
+    segmentos = Path(directorio) if directorio else None
+
+    corte = datetime.utcnow() - timedelta(days=dias)
+    total, lotes, ultimo_id = 0, 0, 0
+    while True:
+        archivadas, ultimo_id = await _archivar_lote(db, corte, ultimo_id, lote, segmentos, estados)
+        if not archivadas:
+            break
+        total += archivadas
+        lotes += 1
+        logger.info(f"Lote {lotes}: {archivadas} cortinas archivadas (hasta id {ultimo_id})")
+
+    return {
+        "corte": corte,
+        "estados": list(estados),
+        "archivadas": total,
+        "lotes": lotes,
+        "segmentos": str(segmentos) if segmentos is not None and total else None
+    }
+
+async def main() -> None:
+    from ..database import AsyncSessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Archiva cortinas en estado terminal")
+    parser.add_argument("--dias", type=int, default=None, help=f"Antigüedad mínima (por defecto {ARCHIVO_DIAS})")
+    parser.add_argument("--lote", type=int, default=None, help=f"Filas por transacción (por defecto {ARCHIVO_LOTE})")
+    parser.add_argument("--segmentos", default=None, help="Directorio para segmentos JSONL comprimidos")
+    parser.add_argument("--estados", nargs="+", default=None,
+                        help=f"Estados a archivar (por defecto {' '.join(ESTADOS_TERMINALES)})")
+    args = parser.parse_args()
+
+    try:
+        async with AsyncSessionLocal() as db:
+            resumen = await archivar_cortinas(db, args.dias, args.lote, args.segmentos, args.estados)
+    finally:
+        await engine.dispose()
+    print(
+        f"{resumen['archivadas']} cortinas archivadas en {resumen['lotes']} lotes "
+        f"(creadas antes de {resumen['corte']:%Y-%m-%d})"
+    )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+# app/services/excel_writer.py
+"""
+Escritura rápida de reportes Excel de varias hojas con xlsxwriter.
+
+A diferencia del backend openpyxl de ReportGenerator, que recorre todas las
+celdas para ajustar anchos y aplicar formatos, aquí:
+
+- los formatos numéricos y de fecha se asignan una vez por columna
+  (worksheet.set_column), no por celda;
+- el ancho de cada columna se estima con longitudes de texto vectorizadas
+  sobre una muestra de filas;
+- los valores se escriben columna por columna con el método tipado de
+  xlsxwriter, sin pasar por el formateador celda a celda de pandas.
+
+El backend se elige con REPORT_EXCEL_BACKEND (xlsxwriter | openpyxl).
+"""
+import io
+import os
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+EXCEL_BACKEND = os.getenv("REPORT_EXCEL_BACKEND", "xlsxwriter").lower()
+
+# Filas usadas para estimar el ancho de cada columna
+MUESTRA_ANCHO = 1000
+ANCHO_MINIMO = 8
+ANCHO_MAXIMO = 60
+
+FORMATO_DECIMAL = '#,##0.00'
+FORMATO_ENTERO = '#,##0'
+FORMATO_FECHA = 'yyyy-mm-dd hh:mm'
+
+def aplanar_columnas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte columnas MultiIndex (tablas pivot) en columnas simples y pasa
+    un índice con nombre a columnas, para escribir la hoja como tabla plana.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = [
+            " / ".join(str(nivel) for nivel in columna if str(nivel) != "")
+            for columna in df.columns.to_flat_index()
+        ]
+    if not isinstance(df.index, pd.RangeIndex) or any(df.index.names):
+        df = df.reset_index()
+    return df
+
+def _muestra(serie: pd.Series) -> pd.Series:
+    """Muestra equiespaciada de la serie, incluyendo los extremos"""
+    if len(serie) <= MUESTRA_ANCHO:
+        return serie
+    posiciones = np.linspace(0, len(serie) - 1, MUESTRA_ANCHO).astype(int)
+    return serie.iloc[posiciones]
+
+def estimar_ancho(nombre: str, serie: pd.Series) -> int:
+    """
+    Estima el ancho de una columna a partir de la longitud de su encabezado
+    y de los valores de una muestra (como texto, con el formato numérico).
+    """
+    muestra = _muestra(serie).dropna()
+    if muestra.empty:
+        largo = 0
+    elif pd.api.types.is_datetime64_any_dtype(muestra):
+        largo = len(FORMATO_FECHA)
+    elif pd.api.types.is_numeric_dtype(muestra) and not pd.api.types.is_bool_dtype(muestra):
+        valores = muestra.to_numpy(dtype=float)
+        valores = valores[np.isfinite(valores)]
+        maximo = float(np.abs(valores).max()) if valores.size else 0.0
+        # Dígitos enteros + separadores de miles + signo + decimales
+        digitos = len(str(int(maximo)))
+        largo = digitos + (digitos - 1) // 3 + 1 + 3
+    else:
+        largo = int(muestra.astype(str).str.len().max())
+    return int(np.clip(max(len(str(nombre)), largo) + 2, ANCHO_MINIMO, ANCHO_MAXIMO))
+
+def _escribir_columna(worksheet, fila_inicio: int, columna: int, serie: pd.Series) -> None:
+    """Escribe los valores no nulos de una columna con el método de su tipo"""
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        valores = serie.to_numpy(dtype=float)
+        filas = np.flatnonzero(np.isfinite(valores))
+        for fila, valor in zip((filas + fila_inicio).tolist(), valores[filas].tolist()):
+            worksheet.write_number(fila, columna, valor)
+        return
+
+    validos = serie.dropna()
+    filas = (np.flatnonzero(serie.notna().to_numpy()) + fila_inicio).tolist()
+    if pd.api.types.is_bool_dtype(serie):
+        for fila, valor in zip(filas, validos.tolist()):
+            worksheet.write_boolean(fila, columna, bool(valor))
+    elif pd.api.types.is_datetime64_any_dtype(serie):
+        for fila, valor in zip(filas, validos.dt.tz_localize(None).dt.to_pydatetime()):
+            worksheet.write_datetime(fila, columna, valor)
+    else:
+        for fila, valor in zip(filas, validos.astype(str).tolist()):
+            worksheet.write_string(fila, columna, valor)
+
+def escribir_excel(dataframes: Dict[str, pd.DataFrame], titulo: str) -> bytes:
+    """
+    Genera un libro de Excel con una hoja por DataFrame y retorna sus bytes.
+
+    Cada hoja lleva el título en la fila 1, encabezados con estilo en la
+    fila 2, los datos desde la fila 3 y un autofiltro sobre la tabla.
+    """
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {'in_memory': True})
+
+    formato_titulo = workbook.add_format({'bold': True, 'font_size': 14, 'align': 'center'})
+    formato_encabezado = workbook.add_format({
+        'bold': True,
+        'font_color': '#FFFFFF',
+        'bg_color': '#1F4E78',
+        'align': 'center',
+        'valign': 'vcenter'
+    })
+    formatos = {
+        'decimal': workbook.add_format({'num_format': FORMATO_DECIMAL, 'align': 'right'}),
+        'entero': workbook.add_format({'num_format': FORMATO_ENTERO, 'align': 'right'}),
+        'fecha': workbook.add_format({'num_format': FORMATO_FECHA})
+    }
+
+    for nombre_hoja, df in dataframes.items():
+        df = aplanar_columnas(df)
+        worksheet = workbook.add_worksheet(nombre_hoja[:31])
+
+        worksheet.merge_range(0, 0, 0, max(len(df.columns) - 1, 7), f"{titulo} - {nombre_hoja}", formato_titulo)
+
+        for columna, (nombre, serie) in enumerate(df.items()):
+            if pd.api.types.is_bool_dtype(serie):
+                formato = None
+            elif pd.api.types.is_integer_dtype(serie):
+                formato = formatos['entero']
+            elif pd.api.types.is_numeric_dtype(serie):
+                formato = formatos['decimal']
+            elif pd.api.types.is_datetime64_any_dtype(serie):
+                formato = formatos['fecha']
+            else:
+                formato = None
+
+            worksheet.set_column(columna, columna, estimar_ancho(nombre, serie), formato)
+            worksheet.write_string(1, columna, str(nombre), formato_encabezado)
+            _escribir_columna(worksheet, 2, columna, serie)
+
+        if len(df.columns):
+            worksheet.autofilter(1, 0, max(len(df), 1) + 1, len(df.columns) - 1)
+
+    workbook.close()
+    return buffer.getvalue()
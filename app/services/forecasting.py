@@ -0,0 +1,204 @@
+# app/services/forecasting.py
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..crud.cortina_historico_crud import fuente_cortinas, incluir_archivo
+from ..models.diseno import DisenoTipoInsumo
+from ..models.inventario_insumo import InventarioInsumo
+from ..utils.time_buckets import Granularidad, date_bucket
+
+SKU = ["referencia_id", "color_id"]
+
+class MetodoPronostico(str, Enum):
+    """Métodos disponibles para estimar el consumo diario"""
+    MEDIA_MOVIL = "media_movil"
+    EMA = "ema"
+
+def calcular_dias_stock(
+    stock_actual: Union[float, np.ndarray],
+    consumo_diario: Union[float, np.ndarray]
+) -> Union[float, np.ndarray]:
+    """
+    Calcula los días estimados de stock basado en el consumo promedio.
+    Acepta escalares o arreglos; retorna infinito donde el consumo es 0.
+    """
+    stock = np.asarray(stock_actual, dtype=float)
+    consumo = np.asarray(consumo_diario, dtype=float)
+    dias = np.divide(
+        stock, consumo,
+        out=np.full(np.broadcast(stock, consumo).shape, np.inf),
+        where=consumo > 0
+    )
+    return dias if dias.ndim else float(dias)
+
+class DemandForecaster:
+    """
+    Pronostica el consumo de materiales por SKU (referencia, color) a partir
+    del historial de cortinas.
+
+    Todo el cálculo se hace en una sola pasada: una consulta agregada por día
+    y SKU, una matriz días × SKUs en pandas y operaciones vectorizadas sobre
+    todas las columnas a la vez.
+    """
+    def __init__(
+        self,
+        db: AsyncSession,
+        metodo: MetodoPronostico = MetodoPronostico.EMA,
+        ventana: int = 30,
+        alpha: float = 0.3,
+        historial_dias: int = 90
+    ):
+        self.db = db
+        self.metodo = MetodoPronostico(metodo)
+        self.ventana = ventana
+        self.alpha = alpha
+        self.historial_dias = historial_dias
+
+    async def consumo_diario(self, hasta: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Construye la serie diaria de consumo de todos los SKUs.
+
+        Returns:
+            DataFrame con un índice de fechas continuo (días sin pedidos en 0)
+            y una columna por (referencia_id, color_id)
+        """
+        hasta = (hasta or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+        desde = hasta - timedelta(days=self.historial_dias - 1)
+        fin = hasta + timedelta(days=1)
+        # Con un historial largo el rango alcanza cortinas archivadas
+        cortinas = fuente_cortinas(await incluir_archivo(self.db, desde, fin))
+        dia = date_bucket(Granularidad.DIA, cortinas.c.fecha_creacion).label("dia")
+
+        stmt = (
+            select(
+                dia,
+                DisenoTipoInsumo.referencia_id,
+                DisenoTipoInsumo.color_id,
+                func.sum(
+                    DisenoTipoInsumo.cantidad_por_metro
+                    * cast(cortinas.c.ancho, Float) / 100
+                    * cortinas.c.multiplicador
+                ).label("cantidad")
+            )
+            .select_from(cortinas)
+            .join(DisenoTipoInsumo, DisenoTipoInsumo.diseno_id == cortinas.c.diseno_id)
+            .where(
+                DisenoTipoInsumo.referencia_id.is_not(None),
+                DisenoTipoInsumo.color_id.is_not(None),
+                cortinas.c.fecha_creacion >= desde,
+                cortinas.c.fecha_creacion < fin
+            )
+            .group_by(dia, DisenoTipoInsumo.referencia_id, DisenoTipoInsumo.color_id)
+        )
+        result = await self.db.execute(stmt)
+        df = pd.DataFrame(result.all(), columns=["dia", *SKU, "cantidad"])
+
+        dias = pd.date_range(desde, hasta, freq="D")
+        if df.empty:
+            return pd.DataFrame(
+                index=dias,
+                columns=pd.MultiIndex.from_tuples([], names=SKU),
+                dtype=float
+            )
+
+        df["dia"] = pd.to_datetime(df["dia"])
+        return (
+            df.pivot_table(index="dia", columns=SKU, values="cantidad", aggfunc="sum")
+            .reindex(dias, fill_value=0.0)
+            .fillna(0.0)
+        )
+
+    def calcular_tasas(self, consumo: pd.DataFrame) -> pd.Series:
+        """
+        Estima el consumo diario de cada SKU con el método configurado.
+
+        Returns:
+            Serie indexada por (referencia_id, color_id)
+        """
+        if consumo.columns.empty:
+            return pd.Series(dtype=float, index=consumo.columns)
+
+        if self.metodo is MetodoPronostico.MEDIA_MOVIL:
+            valores = consumo.to_numpy()[-self.ventana:]
+            return pd.Series(valores.mean(axis=0), index=consumo.columns)
+
+        return consumo.ewm(alpha=self.alpha, adjust=False).mean().iloc[-1]
+
+    async def calcular_pronostico(self) -> pd.DataFrame:
+        """
+        Calcula consumo diario, días de stock y fecha de reorden de todo el inventario.
+
+        La fecha de reorden es el día estimado en que el stock llega a la
+        cantidad mínima; es NaT cuando no hay consumo registrado.
+
+        Returns:
+            DataFrame con una fila por registro de inventario
+        """
+        tasas = self.calcular_tasas(await self.consumo_diario())
+
+        result = await self.db.execute(
+            select(
+                InventarioInsumo.id,
+                InventarioInsumo.referencia_id,
+                InventarioInsumo.color_id,
+                InventarioInsumo.cantidad,
+                InventarioInsumo.cantidad_minima
+            )
+        )
+        inventario = pd.DataFrame(
+            result.all(),
+            columns=["inventario_id", *SKU, "cantidad", "cantidad_minima"]
+        )
+
+        if tasas.empty or inventario.empty:
+            inventario["consumo_diario"] = 0.0
+        else:
+            inventario = inventario.merge(
+                tasas.rename("consumo_diario").reset_index(), on=SKU, how="left"
+            )
+            inventario["consumo_diario"] = inventario["consumo_diario"].fillna(0.0)
+
+        consumo = inventario["consumo_diario"].to_numpy(dtype=float)
+        stock = inventario["cantidad"].to_numpy(dtype=float)
+        sobre_minimo = np.clip(stock - inventario["cantidad_minima"].to_numpy(dtype=float), 0, None)
+
+        inventario["dias_stock"] = calcular_dias_stock(stock, consumo)
+        dias_reorden = calcular_dias_stock(sobre_minimo, consumo)
+        hoy = pd.Timestamp(datetime.utcnow().date())
+        inventario["fecha_reorden"] = hoy + pd.to_timedelta(
+            np.where(np.isfinite(dias_reorden), np.floor(dias_reorden), np.nan), unit="D"
+        )
+        return inventario
+
+    async def pronosticar(self) -> List[Dict]:
+        """
+        Pronóstico de todo el inventario listo para serializar, ordenado
+        por los SKUs que se agotan primero.
+        """
+        inventario = await self.calcular_pronostico()
+        if inventario.empty:
+            return []
+
+        inventario = inventario.sort_values("dias_stock", kind="stable")
+        dias_stock = inventario["dias_stock"].round(1)
+
+        # inf / NaT no son serializables en JSON: se exponen como None
+        return [
+            {
+                "inventario_id": int(fila.inventario_id),
+                "referencia_id": int(fila.referencia_id),
+                "color_id": int(fila.color_id),
+                "cantidad": float(fila.cantidad),
+                "cantidad_minima": float(fila.cantidad_minima),
+                "consumo_diario": round(float(fila.consumo_diario), 4),
+                "dias_stock": float(dias) if np.isfinite(dias) else None,
+                "fecha_reorden": None if pd.isna(fila.fecha_reorden) else fila.fecha_reorden.date()
+            }
+            for fila, dias in zip(inventario.itertuples(index=False), dias_stock)
+        ]
@@ -0,0 +1,330 @@
+# app/services/importacion_service.py
+"""
+Importación masiva de catálogo e inventario desde CSV.
+
+Reemplaza el alta uno a uno (un POST, un SELECT de duplicados, un INSERT y
+un commit por fila) por un proceso en tres pasos:
+
+1. Lectura en streaming del CSV, validando cada fila con su schema y
+   deduplicando en memoria por la clave natural (gana la última aparición).
+2. Resolución de las claves naturales a ids con un SELECT ... IN por lote
+   (tipo_insumo por nombre, referencia y color por código).
+3. Escritura con INSERT ... ON CONFLICT DO UPDATE en lotes executemany de
+   IMPORT_CHUNK_SIZE filas, todo en una sola transacción.
+
+Las filas que no pasan la validación o la resolución se devuelven en el
+informe con su número de línea; el resto se importa igual.
+
+Columnas por entidad (* obligatoria):
+    tipos_insumo:        nombre*, descripcion
+    referencias_insumo:  codigo*, nombre*, precio_unitario*, tipo_insumo*
+    colores_insumo:      codigo*, nombre*, referencia_codigo*
+    inventario_insumos:  referencia_codigo*, color_codigo*, cantidad*,
+                         cantidad_minima, ubicacion
+
+Uso desde la línea de comandos:
+    python -m app.services.importacion_service referencias_insumo proveedor.csv
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Table, select, tuple_
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.color_insumo import ColorInsumo
+from ..models.inventario_insumo import InventarioInsumo
+from ..models.referencia_insumo import ReferenciaInsumo
+from ..models.tipo_insumo import TipoInsumo
+from ..schemas.importacion_schema import FilaColor, FilaInventario, FilaReferencia, FilaTipoInsumo
+from ..utils.cache_http import etiquetar
+from ..utils.catalogo import catalogo
+from ..utils.transaction import transaction_scope
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+
+@dataclass(frozen=True)
+class _Entidad:
+    tabla: Table
+    esquema: Type[BaseModel]
+    clave: Tuple[str, ...]        # columnas del CSV que identifican la fila
+    conflicto: Tuple[str, ...]    # columnas del índice único de la tabla
+
+ENTIDADES: Dict[str, _Entidad] = {
+    "tipos_insumo": _Entidad(TipoInsumo.__table__, FilaTipoInsumo, ("nombre",), ("nombre",)),
+    "referencias_insumo": _Entidad(ReferenciaInsumo.__table__, FilaReferencia, ("codigo",), ("codigo",)),
+    "colores_insumo": _Entidad(ColorInsumo.__table__, FilaColor, ("codigo",), ("codigo",)),
+    "inventario_insumos": _Entidad(
+        InventarioInsumo.__table__, FilaInventario,
+        ("referencia_codigo", "color_codigo"), ("referencia_id", "color_id")
+    )
+}
+
+# (número de línea, valores validados)
+FilasLeidas = Dict[tuple, Tuple[int, dict]]
+
+def _error(fila: int, clave: Optional[str], error: str) -> Dict:
+    return {"fila": fila, "clave": clave, "error": error}
+
+def _clave_texto(valores: Dict, clave: Tuple[str, ...]) -> Optional[str]:
+    partes = [str(valores.get(c)) for c in clave if valores.get(c) is not None]
+    return "/".join(partes) or None
+
+def _mensaje_validacion(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+def leer_csv(entidad: str, lineas: Iterable[str]) -> Tuple[FilasLeidas, List[Dict], int, int]:
+    """
+    Lee y valida el CSV fila a fila, deduplicando por la clave natural.
+
+    Returns:
+        (filas válidas por clave, errores, filas leídas, filas duplicadas)
+
+    Raises:
+        ValueError: Si el archivo está vacío o le faltan columnas obligatorias
+    """
+    spec = ENTIDADES[entidad]
+    lector = csv.DictReader(lineas)
+    if not lector.fieldnames:
+        raise ValueError("El archivo CSV está vacío")
+
+    lector.fieldnames = [c.strip().lower() for c in lector.fieldnames]
+    campos = spec.esquema.model_fields
+    faltantes = [n for n, f in campos.items() if f.is_required() and n not in lector.fieldnames]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias para {entidad}: {', '.join(faltantes)}")
+    presentes = [c for c in lector.fieldnames if c in campos]
+
+    filas: FilasLeidas = {}
+    errores: List[Dict] = []
+    leidas = duplicadas = 0
+    for fila in lector:
+        leidas += 1
+        datos = {c: (fila.get(c) or "").strip() or None for c in presentes}
+        try:
+            valores = spec.esquema.model_validate(datos).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            errores.append(_error(lector.line_num, _clave_texto(datos, spec.clave), _mensaje_validacion(e)))
+            continue
+
+        clave = tuple(valores[c] for c in spec.clave)
+        if clave in filas:
+            duplicadas += 1
+        filas[clave] = (lector.line_num, valores)
+
+    return filas, errores, leidas, duplicadas
+
+async def _buscar(db: AsyncSession, columna, valores: Iterable, *extra) -> Dict:
+    """Mapa valor de `columna` -> fila (id, *extra) para los valores dados"""
+    valores = list(set(valores))
+    mapa = {}
+    for i in range(0, len(valores), IMPORT_CHUNK_SIZE):
+        stmt = select(columna, *extra).where(columna.in_(valores[i:i + IMPORT_CHUNK_SIZE]))
+        for fila in (await db.execute(stmt)).all():
+            mapa[fila[0]] = fila[1:]
+    return mapa
+
+async def _resolver(
+    db: AsyncSession, entidad: str, filas: FilasLeidas
+) -> Tuple[List[Tuple[int, dict]], List[Dict]]:
+    """
+    Reemplaza las claves naturales (nombre de tipo, códigos de referencia y
+    color) por ids. Las filas con claves desconocidas pasan a errores.
+    """
+    spec = ENTIDADES[entidad]
+    registros: List[Tuple[int, dict]] = []
+    errores: List[Dict] = []
+    valores = [v for _, v in filas.values()]
+
+    if entidad == "referencias_insumo":
+        tipos = await _buscar(db, TipoInsumo.nombre, (v["tipo_insumo"] for v in valores), TipoInsumo.id)
+    elif entidad == "colores_insumo":
+        referencias = await _buscar(
+            db, ReferenciaInsumo.codigo, (v["referencia_codigo"] for v in valores), ReferenciaInsumo.id
+        )
+    elif entidad == "inventario_insumos":
+        referencias = await _buscar(
+            db, ReferenciaInsumo.codigo, (v["referencia_codigo"] for v in valores), ReferenciaInsumo.id
+        )
+        colores = await _buscar(
+            db, ColorInsumo.codigo, (v["color_codigo"] for v in valores),
+            ColorInsumo.id, ColorInsumo.referencia_id
+        )
+
+    for clave, (numero, v) in filas.items():
+        texto = "/".join(str(c) for c in clave)
+        fila = dict(v)
+        if entidad == "referencias_insumo":
+            tipo = tipos.get(fila.pop("tipo_insumo"))
+            if tipo is None:
+                errores.append(_error(numero, texto, f"Tipo de insumo '{v['tipo_insumo']}' no existe"))
+                continue
+            fila["tipo_insumo_id"] = tipo[0]
+        elif entidad == "colores_insumo":
+            referencia = referencias.get(fila.pop("referencia_codigo"))
+            if referencia is None:
+                errores.append(_error(numero, texto, f"Referencia '{v['referencia_codigo']}' no existe"))
+                continue
+            fila["referencia_id"] = referencia[0]
+        elif entidad == "inventario_insumos":
+            referencia = referencias.get(fila.pop("referencia_codigo"))
+            color = colores.get(fila.pop("color_codigo"))
+            if referencia is None:
+                errores.append(_error(numero, texto, f"Referencia '{v['referencia_codigo']}' no existe"))
+                continue
+            if color is None:
+                errores.append(_error(numero, texto, f"Color '{v['color_codigo']}' no existe"))
+                continue
+            if color[1] != referencia[0]:
+                errores.append(_error(
+                    numero, texto,
+                    f"El color '{v['color_codigo']}' no pertenece a la referencia '{v['referencia_codigo']}'"
+                ))
+                continue
+            fila["referencia_id"], fila["color_id"] = referencia[0], color[0]
+
+        # Celdas vacías en columnas NOT NULL: se conserva el valor actual
+        # (o el default de la columna si la fila es nueva)
+        fila = {
+            c: valor for c, valor in fila.items()
+            if valor is not None or spec.tabla.c[c].nullable
+        }
+        registros.append((numero, fila))
+
+    return registros, errores
+
+async def _claves_existentes(db: AsyncSession, spec: _Entidad, registros: List[Tuple[int, dict]]) -> set:
+    columnas = [spec.tabla.c[c] for c in spec.conflicto]
+    claves = [tuple(fila[c] for c in spec.conflicto) for _, fila in registros]
+    existentes = set()
+    for i in range(0, len(claves), IMPORT_CHUNK_SIZE):
+        lote = claves[i:i + IMPORT_CHUNK_SIZE]
+        if len(columnas) == 1:
+            stmt = select(*columnas).where(columnas[0].in_([c[0] for c in lote]))
+        else:
+            stmt = select(*columnas).where(tuple_(*columnas).in_(lote))
+        existentes.update(tuple(f) for f in (await db.execute(stmt)).all())
+    return existentes
+
+def _upsert(dialecto: str, spec: _Entidad, columnas: Tuple[str, ...]):
+    """INSERT ... ON CONFLICT DO UPDATE (ON DUPLICATE KEY UPDATE en MySQL)"""
+    actualizar = [c for c in columnas if c not in spec.conflicto]
+    if dialecto == "mysql":
+        stmt = mysql.insert(spec.tabla)
+        return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in actualizar})
+    if dialecto == "postgresql":
+        stmt = postgresql.insert(spec.tabla)
+    elif dialecto == "sqlite":
+        stmt = sqlite.insert(spec.tabla)
+    else:
+        raise ValueError(f"La importación masiva no soporta la base de datos {dialecto}")
+    return stmt.on_conflict_do_update(
+        index_elements=list(spec.conflicto),
+        set_={c: stmt.excluded[c] for c in actualizar}
+    )
+
+async def importar_csv(
+    db: AsyncSession,
+    entidad: str,
+    lineas: Iterable[str],
+    tamano_lote: Optional[int] = None
+) -> Dict:
+    """
+    Importa un CSV de la entidad indicada con upserts por lotes.
+
+    Args:
+        db: Sesión de base de datos asíncrona (de escritura)
+        entidad: tipos_insumo, referencias_insumo, colores_insumo o inventario_insumos
+        lineas: Líneas del CSV (archivo de texto abierto con newline="")
+        tamano_lote: Filas por executemany; por defecto IMPORT_CHUNK_SIZE
+
+    Returns:
+        Dict con filas leídas, duplicadas, nuevas, actualizadas y errores por fila
+
+    Raises:
+        ValueError: Si la entidad no existe o el archivo no tiene las columnas obligatorias
+    """
+    if entidad not in ENTIDADES:
+        raise ValueError(f"Entidad desconocida: {entidad}. Opciones: {', '.join(ENTIDADES)}")
+    spec = ENTIDADES[entidad]
+    tamano_lote = tamano_lote or IMPORT_CHUNK_SIZE
+
+    # El parseo y la validación son CPU: fuera del event loop
+    filas, errores, leidas, duplicadas = await asyncio.to_thread(leer_csv, entidad, lineas)
+    registros, errores_resolucion = await _resolver(db, entidad, filas)
+    errores.extend(errores_resolucion)
+
+    existentes = await _claves_existentes(db, spec, registros)
+    nuevas = sum(
+        1 for _, fila in registros
+        if tuple(fila[c] for c in spec.conflicto) not in existentes
+    )
+
+    ahora = datetime.utcnow()
+    dialecto = db.bind.dialect.name
+    async with transaction_scope(db) as tx:
+        etiquetar(tx, spec.tabla.name)
+        for i in range(0, len(registros), tamano_lote):
+            # executemany exige las mismas columnas en todas las filas del lote
+            grupos: Dict[Tuple[str, ...], List[dict]] = defaultdict(list)
+            for _, fila in registros[i:i + tamano_lote]:
+                fila["fecha_actualizacion"] = ahora
+                grupos[tuple(sorted(fila))].append(fila)
+            for columnas, lote in grupos.items():
+                await tx.execute(_upsert(dialecto, spec, columnas), lote)
+
+    if entidad != "inventario_insumos":
+        await catalogo.recargar()
+
+    resultado = {
+        "entidad": entidad,
+        "filas_leidas": leidas,
+        "duplicadas": duplicadas,
+        "nuevas": nuevas,
+        "actualizadas": len(registros) - nuevas,
+        "errores": sorted(errores, key=lambda e: e["fila"])
+    }
+    logger.info(
+        f"Importación de {entidad}: {leidas} filas, {resultado['nuevas']} nuevas, "
+        f"{resultado['actualizadas']} actualizadas, {len(errores)} con error"
+    )
+    return resultado
+
+async def main() -> None:
+    from ..database import AsyncSessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Importación masiva de catálogo e inventario desde CSV")
+    parser.add_argument("entidad", choices=list(ENTIDADES))
+    parser.add_argument("archivo", help="Archivo CSV (UTF-8, con cabecera)")
+    parser.add_argument("--lote", type=int, default=IMPORT_CHUNK_SIZE, help="Filas por lote de escritura")
+    args = parser.parse_args()
+
+    try:
+        with open(args.archivo, encoding="utf-8-sig", newline="") as archivo:
+            async with AsyncSessionLocal() as db:
+                resultado = await importar_csv(db, args.entidad, archivo, args.lote)
+    finally:
+        await engine.dispose()
+
+    print(
+        f"{resultado['filas_leidas']} filas leídas: {resultado['nuevas']} nuevas, "
+        f"{resultado['actualizadas']} actualizadas, {resultado['duplicadas']} duplicadas, "
+        f"{len(resultado['errores'])} con error"
+    )
+    for error in resultado["errores"]:
+        print(f"  línea {error['fila']} ({error['clave']}): {error['error']}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+# app/services/reorden_service.py
+"""
+Motor de puntos de reorden y sugerencias de compra.
+
+Para cada registro de inventario, con el consumo diario estimado por
+DemandForecaster:
+
+    stock_seguridad   = max(cantidad_minima, consumo_diario * dias_seguridad)
+    punto_reorden     = consumo_diario * lead_time_dias + stock_seguridad
+    stock_objetivo    = punto_reorden + consumo_diario * dias_cobertura
+    cantidad_sugerida = stock_objetivo - cantidad   (si cantidad <= punto_reorden)
+
+El cálculo se hace vectorizado para todo el inventario y el resultado
+reemplaza la tabla sugerencias_compra en una sola transacción.
+
+Uso como tarea programada:
+    python -m app.services.reorden_service
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.sugerencia_compra import SugerenciaCompra
+from ..utils.transaction import transaction_scope
+from .forecasting import DemandForecaster, MetodoPronostico
+
+logger = logging.getLogger(__name__)
+
+LEAD_TIME_DIAS = float(os.getenv("REORDEN_LEAD_TIME_DIAS", "7"))
+DIAS_SEGURIDAD = float(os.getenv("REORDEN_DIAS_SEGURIDAD", "3"))
+DIAS_COBERTURA = float(os.getenv("REORDEN_DIAS_COBERTURA", "30"))
+
+async def recalcular_puntos_reorden(
+    db: AsyncSession,
+    lead_time_dias: Optional[float] = None,
+    dias_seguridad: Optional[float] = None,
+    dias_cobertura: Optional[float] = None,
+    metodo: MetodoPronostico = MetodoPronostico.EMA
+) -> Dict:
+    """
+    Recalcula puntos de reorden y cantidades sugeridas para todo el inventario.
+
+    Args:
+        db: Sesión de base de datos asíncrona
+        lead_time_dias: Días entre el pedido y la llegada del material
+        dias_seguridad: Días de consumo a mantener como stock de seguridad
+        dias_cobertura: Días de consumo que debe cubrir cada compra
+        metodo: Método de pronóstico del consumo diario
+
+    Returns:
+        Dict con el resumen de la ejecución
+    """
+    lead_time_dias = LEAD_TIME_DIAS if lead_time_dias is None else lead_time_dias
+    dias_seguridad = DIAS_SEGURIDAD if dias_seguridad is None else dias_seguridad
+    dias_cobertura = DIAS_COBERTURA if dias_cobertura is None else dias_cobertura
+
+    pronostico = await DemandForecaster(db, metodo=metodo).calcular_pronostico()
+    fecha_calculo = datetime.utcnow()
+
+    consumo = pronostico["consumo_diario"].to_numpy(dtype=float)
+    cantidad = pronostico["cantidad"].to_numpy(dtype=float)
+    minima = pronostico["cantidad_minima"].to_numpy(dtype=float)
+
+    stock_seguridad = np.maximum(minima, consumo * dias_seguridad)
+    punto_reorden = consumo * lead_time_dias + stock_seguridad
+    stock_objetivo = punto_reorden + consumo * dias_cobertura
+    requiere_compra = cantidad <= punto_reorden
+    cantidad_sugerida = np.where(
+        requiere_compra, np.maximum(stock_objetivo - cantidad, 0), 0
+    )
+
+    filas = [
+        {
+            "inventario_id": int(inv_id),
+            "referencia_id": int(ref_id),
+            "color_id": int(color_id),
+            "consumo_diario": round(float(c), 4),
+            "lead_time_dias": lead_time_dias,
+            "dias_seguridad": dias_seguridad,
+            "stock_seguridad": round(float(ss), 2),
+            "punto_reorden": round(float(pr), 2),
+            "stock_objetivo": round(float(so), 2),
+            "cantidad_sugerida": round(float(cs), 2),
+            "requiere_compra": bool(rc),
+            "fecha_calculo": fecha_calculo
+        }
+        for inv_id, ref_id, color_id, c, ss, pr, so, cs, rc in zip(
+            pronostico["inventario_id"], pronostico["referencia_id"], pronostico["color_id"],
+            consumo, stock_seguridad, punto_reorden, stock_objetivo,
+            cantidad_sugerida, requiere_compra
+        )
+    ]
+
+    async with transaction_scope(db) as tx:
+        await tx.execute(delete(SugerenciaCompra))
+        if filas:
+            await tx.execute(insert(SugerenciaCompra), filas)
+
+    resumen = {
+        "items": len(filas),
+        "requieren_compra": int(requiere_compra.sum()),
+        "lead_time_dias": lead_time_dias,
+        "dias_seguridad": dias_seguridad,
+        "dias_cobertura": dias_cobertura,
+        "fecha_calculo": fecha_calculo
+    }
+    logger.info(
+        f"Puntos de reorden recalculados: {resumen['items']} items, "
+        f"{resumen['requieren_compra']} requieren compra"
+    )
+    return resumen
+
+async def get_sugerencias_compra(
+    db: AsyncSession,
+    solo_requieren_compra: bool = True
+) -> List[SugerenciaCompra]:
+    """
+    Obtiene las sugerencias calculadas en la última ejecución.
+    """
+    stmt = select(SugerenciaCompra)
+    if solo_requieren_compra:
+        stmt = stmt.where(SugerenciaCompra.requiere_compra.is_(True))
+    stmt = stmt.order_by(SugerenciaCompra.cantidad_sugerida.desc())
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+async def main() -> None:
+    from ..database import AsyncSessionLocal, engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            resumen = await recalcular_puntos_reorden(db)
+    finally:
+        await engine.dispose()
+    print(
+        f"{resumen['items']} items evaluados, "
+        f"{resumen['requieren_compra']} requieren compra"
+    )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+# app/services/report_cache.py
+"""
+Caché en disco de los archivos de reportes generados.
+
+Cada reporte se identifica por el hash SHA-256 de su tipo, sus parámetros
+(rango de fechas, formato) y una marca de agua de los datos de origen
+(máximo fecha_actualizacion y número de filas). Mientras los datos no
+cambien, la misma solicitud reutiliza el archivo ya generado.
+
+Los archivos viven en reports/cache/ y se expulsan por antigüedad de uso
+(mtime, que se renueva en cada acierto) cuando el total supera
+REPORT_CACHE_MAX_MB. Con REPORT_CACHE_MAX_MB=0 la caché queda desactivada.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..utils.metrics import REPORT_CACHE_BYTES, REPORT_CACHE_HITS, REPORT_CACHE_MISSES
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_DIR = Path(os.getenv("REPORT_CACHE_DIR", "reports/cache"))
+REPORT_CACHE_MAX_MB = float(os.getenv("REPORT_CACHE_MAX_MB", "500"))
+
+class ReportArtifactCache:
+    """
+    Caché LRU de archivos direccionada por contenido.
+
+    Una entrada agrupa uno o varios archivos (p.ej. los CSV de un reporte)
+    guardados como <clave>-<nombre><extensión>. Los métodos son bloqueantes;
+    ReportGenerator los llama desde su executor.
+    """
+    def __init__(self, directorio: Path = REPORT_CACHE_DIR, max_mb: float = REPORT_CACHE_MAX_MB):
+        self.directorio = Path(directorio)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clave(tipo: str, parametros: Dict[str, Any], watermark: Any) -> str:
+        """Hash estable de la solicitud y del estado de los datos"""
+        contenido = json.dumps(
+            {"tipo": tipo, "parametros": parametros, "watermark": watermark},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+    def contiene(self, ruta: Path) -> bool:
+        """Indica si la ruta es un archivo administrado por la caché"""
+        return Path(ruta).resolve().parent == self.directorio.resolve()
+
+    def _archivos(self, clave: str):
+        return sorted(self.directorio.glob(f"{clave}-*"))
+
+    def buscar(self, tipo: str, clave: str, nombres: int = 1) -> Optional[Dict[str, Path]]:
+        """
+        Retorna los archivos de la entrada (nombre -> ruta) o None si no existe.
+
+        Args:
+            tipo: Tipo de reporte, usado como etiqueta de las métricas
+            clave: Clave calculada con clave()
+            nombres: Número de archivos que forman una entrada completa
+        """
+        with self._lock:
+            archivos = self._archivos(clave) if self.directorio.exists() else []
+            if len(archivos) < nombres:
+                REPORT_CACHE_MISSES.labels(tipo=tipo).inc()
+                return None
+
+            # Renovamos el mtime para que la expulsión sea por uso reciente
+            for archivo in archivos:
+                os.utime(archivo)
+            REPORT_CACHE_HITS.labels(tipo=tipo).inc()
+            return {
+                archivo.stem[len(clave) + 1:]: archivo
+                for archivo in archivos
+            }
+
+    def guardar(self, clave: str, archivos: Dict[str, Path]) -> Dict[str, Path]:
+        """
+        Mueve los archivos generados a la caché y expulsa las entradas
+        menos usadas si se supera el tamaño máximo.
+
+        Returns:
+            Las nuevas rutas de los archivos dentro de la caché
+        """
+        with self._lock:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            destinos = {}
+            for nombre, origen in archivos.items():
+                destino = self.directorio / f"{clave}-{nombre}{Path(origen).suffix}"
+                os.replace(origen, destino)
+                destinos[nombre] = destino
+            self._expulsar(conservar=set(destinos.values()))
+            return destinos
+
+    def _expulsar(self, conservar=frozenset()) -> None:
+        archivos = []
+        for ruta in self.directorio.iterdir():
+            if ruta.is_file():
+                estado = ruta.stat()
+                archivos.append((estado.st_mtime, estado.st_size, ruta))
+
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= self.max_bytes:
+                break
+            if ruta in conservar:
+                continue
+            ruta.unlink(missing_ok=True)
+            total -= tamano
+            logger.info(f"Reporte expulsado de la caché: {ruta.name}")
+        REPORT_CACHE_BYTES.set(total)
+
+report_cache: Optional[ReportArtifactCache] = (
+    ReportArtifactCache() if REPORT_CACHE_MAX_MB > 0 else None
+)
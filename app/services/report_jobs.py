@@ -0,0 +1,220 @@
+# app/services/report_jobs.py
+"""
+Ejecución de reportes en segundo plano.
+
+Los reportes de ReportGenerator usan pandas sobre una conexión síncrona y
+generan archivos grandes; aquí se ejecutan en un ThreadPoolExecutor propio
+y su estado queda en la tabla reportes_jobs, de modo que el endpoint que
+los solicita responde de inmediato y el event loop sigue atendiendo pedidos.
+
+Cada trabajo registra su propietario ("host:pid" del worker que lo ejecuta).
+Al arrancar, un worker solo da por interrumpidos los trabajos de procesos
+de su mismo host que ya no existen, y los de cualquier worker que superan
+REPORT_JOB_TIMEOUT segundos sin terminar; los trabajos en curso de los demás
+workers no se tocan.
+"""
+import asyncio
+import io
+import json
+import logging
+import os
+import socket
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+import aiofiles
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from ..database import AsyncReadSessionLocal, AsyncSessionLocal, get_sync_engine
+from ..models.reporte_job import ReporteJob
+from ..utils.transaction import transaction_scope
+from .reporting import ReportGenerator
+
+logger = logging.getLogger(__name__)
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+# Segundos tras los que un trabajo sin terminar se da por perdido sea cual sea su worker
+REPORT_JOB_TIMEOUT = float(os.getenv("REPORT_JOB_TIMEOUT", "3600"))
+
+# Reportes disponibles: tipo -> método de ReportGenerator
+TIPOS_REPORTE = {
+    "rentabilidad": "generar_reporte_rentabilidad"
+}
+
+def _comprimir_csv(rutas: Dict[str, Path]) -> bytes:
+    """Empaqueta los CSV de un reporte en un solo zip (bloqueante)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archivo:
+        for nombre, ruta in rutas.items():
+            archivo.write(ruta, arcname=f"{nombre}{ruta.suffix}")
+    return buffer.getvalue()
+
+def _propietario() -> str:
+    """Identificador del proceso actual (se calcula en cada llamada por los fork)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def _proceso_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe pero pertenece a otro usuario
+        return True
+    return True
+
+def _propietario_caido(propietario: str, host: str) -> bool:
+    """True si el propietario es un proceso de este host que ya terminó"""
+    prop_host, _, pid = propietario.rpartition(":")
+    if prop_host != host or not pid.isdigit():
+        return False
+    return int(pid) != os.getpid() and not _proceso_vivo(int(pid))
+
+class ReportJobManager:
+    """
+    Cola de trabajos de reportes.
+
+    Cada trabajo se registra como pendiente, se ejecuta como una tarea del
+    event loop cuyo trabajo pesado (consultas y generación de archivos)
+    corre en el pool de hilos, y termina como completado o error.
+    """
+    def __init__(self, max_workers: int = REPORT_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Referencias a las tareas en curso para que no las recolecte el GC
+        self._tareas: Set[asyncio.Task] = set()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="reportes"
+            )
+        return self._executor
+
+    async def enviar(self, tipo: str, parametros: Dict[str, Any]) -> ReporteJob:
+        """
+        Registra un trabajo y lo programa para su ejecución.
+
+        Raises:
+            ValueError: Si el tipo de reporte no existe
+        """
+        if tipo not in TIPOS_REPORTE:
+            raise ValueError(f"Tipo de reporte no soportado: {tipo}")
+
+        job = ReporteJob(
+            tipo=tipo,
+            parametros=json.dumps(parametros, default=str),
+            estado=ReporteJob.PENDIENTE,
+            propietario=_propietario()
+        )
+        async with AsyncSessionLocal() as db:
+            async with transaction_scope(db) as tx:
+                tx.add(job)
+
+        tarea = asyncio.create_task(self._ejecutar(job.id, tipo, parametros))
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+        return job
+
+    async def _actualizar(self, job_id: str, **valores) -> None:
+        async with AsyncSessionLocal() as db:
+            async with transaction_scope(db) as tx:
+                await tx.execute(
+                    update(ReporteJob).where(ReporteJob.id == job_id).values(**valores)
+                )
+
+    async def _ejecutar(self, job_id: str, tipo: str, parametros: Dict[str, Any]) -> None:
+        await self._actualizar(
+            job_id, estado=ReporteJob.EN_PROCESO, fecha_inicio=datetime.utcnow()
+        )
+        try:
+            with Session(bind=get_sync_engine()) as sync_db:
+                generador = ReportGenerator(sync_db, executor=self.executor)
+                resultado = await getattr(generador, TIPOS_REPORTE[tipo])(**parametros)
+
+            if isinstance(resultado, dict):
+                # Los reportes CSV generan varios archivos: se entregan como zip
+                contenido = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, _comprimir_csv, resultado
+                )
+                ruta = generador.report_path / f"{tipo}_{job_id}.zip"
+                async with aiofiles.open(ruta, "wb") as archivo:
+                    await archivo.write(contenido)
+                # Las partes que quedaron en la caché se conservan para próximas solicitudes
+                for parcial in resultado.values():
+                    if generador.cache is None or not generador.cache.contiene(parcial):
+                        await asyncio.to_thread(parcial.unlink, missing_ok=True)
+            else:
+                ruta = resultado
+
+            await self._actualizar(
+                job_id,
+                estado=ReporteJob.COMPLETADO,
+                ruta_archivo=str(ruta),
+                fecha_fin=datetime.utcnow()
+            )
+            logger.info(f"Reporte {tipo} ({job_id}) generado en {ruta}")
+        except Exception as e:
+            logger.error(f"Error en el trabajo de reporte {job_id}: {str(e)}")
+            await self._actualizar(
+                job_id,
+                estado=ReporteJob.ERROR,
+                error=str(e),
+                fecha_fin=datetime.utcnow()
+            )
+
+    async def obtener(self, job_id: str) -> Optional[ReporteJob]:
+        async with AsyncReadSessionLocal() as db:
+            return await db.get(ReporteJob, job_id)
+
+    async def marcar_interrumpidos(self, timeout: float = REPORT_JOB_TIMEOUT) -> int:
+        """
+        Marca como error los trabajos que quedaron a medias: los de procesos
+        de este host que ya terminaron y los que llevan más de `timeout`
+        segundos sin terminar, tengan o no propietario.
+        """
+        activos = (ReporteJob.PENDIENTE, ReporteJob.EN_PROCESO)
+        host = socket.gethostname()
+        async with AsyncSessionLocal() as db:
+            async with transaction_scope(db) as tx:
+                propietarios = (await tx.execute(
+                    select(ReporteJob.propietario)
+                    .where(ReporteJob.estado.in_(activos))
+                    .where(ReporteJob.propietario.is_not(None))
+                    .distinct()
+                )).scalars().all()
+                caidos = [p for p in propietarios if _propietario_caido(p, host)]
+                limite = datetime.utcnow() - timedelta(seconds=timeout)
+
+                result = await tx.execute(
+                    update(ReporteJob)
+                    .where(ReporteJob.estado.in_(activos))
+                    .where(or_(
+                        ReporteJob.propietario.in_(caidos),
+                        ReporteJob.fecha_creacion < limite
+                    ))
+                    .values(
+                        estado=ReporteJob.ERROR,
+                        error="Interrumpido por reinicio del servidor",
+                        fecha_fin=datetime.utcnow()
+                    )
+                )
+        if result.rowcount:
+            logger.warning(f"{result.rowcount} trabajos de reportes marcados como interrumpidos")
+        return result.rowcount
+
+    async def cerrar(self) -> None:
+        """Espera los trabajos en curso y libera el pool de hilos"""
+        if self._tareas:
+            await asyncio.gather(*self._tareas, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+report_jobs = ReportJobManager()
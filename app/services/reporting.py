@@ -1,121 +1,247 @@
 # app/services/reporting.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Union
 import pandas as pd
 from datetime import datetime, timedelta
 from sqlalchemy import text
 from sqlalchemy.orm import Session
+import asyncio
+import functools
+import io
 import logging
+from concurrent.futures import Executor
 from pathlib import Path
 import json
+import aiofiles
 from openpyxl.styles import PatternFill, Font, Alignment
 from openpyxl.utils import get_column_letter
 
+from ..crud.cortina_historico_crud import fuente_cortinas_sql, stmt_archivo_en_rango
+from ..utils.time_buckets import Granularidad, render_date_bucket
+from .forecasting import calcular_dias_stock
+from .excel_writer import EXCEL_BACKEND, escribir_excel
+from .report_cache import ReportArtifactCache, report_cache
+
 logger = logging.getLogger(__name__)
 
 class ReportGenerator:
     """
     Sistema centralizado para la generación de reportes del negocio.
     Permite crear reportes detallados en diferentes formatos y con análisis automático.
+
+    Las consultas (pandas sobre una sesión síncrona) y la generación de los
+    archivos se ejecutan en un executor, y la escritura a disco usa aiofiles,
+    de modo que los métodos async no bloquean el event loop.
+
+    Los archivos generados se guardan en la caché de reportes; una solicitud
+    repetida sobre datos sin cambios retorna el archivo ya existente.
     """
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        executor: Optional[Executor] = None,
+        cache: Optional[ReportArtifactCache] = report_cache
+    ):
         self.db = db
+        self.executor = executor  # None usa el ThreadPoolExecutor por defecto del loop
+        self.cache = cache
         self.report_path = Path("reports")
         self.report_path.mkdir(exist_ok=True)
-    
+
+    async def _en_executor(self, func: Callable, *args, **kwargs) -> Any:
+        """Ejecuta una función bloqueante fuera del event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def _escribir_archivo(self, ruta: Path, contenido: bytes) -> Path:
+        """Escribe el contenido generado sin bloquear el event loop"""
+        async with aiofiles.open(ruta, "wb") as archivo:
+            await archivo.write(contenido)
+        return ruta
+
     async def generar_reporte_rentabilidad(
         self,
         fecha_inicio: datetime,
         fecha_fin: datetime,
         formato: str = "excel"
-    ) -> Path:
+    ) -> Union[Path, Dict[str, Path]]:
         """
         Genera un análisis detallado de rentabilidad por tipo de cortina y cliente.
         Incluye métricas clave como margen de ganancia, costo promedio y tendencias.
         """
         try:
-            query = """
-                SELECT 
-                    d.nombre as diseno,
-                    COUNT(c.id) as cantidad_cortinas,
-                    AVG(c.costo_total) as costo_promedio,
-                    AVG(c.precio_venta) as precio_promedio,
-                    SUM(c.precio_venta - c.costo_total) as ganancia_total,
-                    AVG((c.precio_venta - c.costo_total) / c.precio_venta * 100) as margen_porcentaje
-                FROM cortinas c
-                JOIN disenos d ON c.diseno_id = d.id
-                WHERE c.fecha_creacion BETWEEN :fecha_inicio AND :fecha_fin
-                GROUP BY d.id, d.nombre
-                ORDER BY ganancia_total DESC
-            """
-            
-            df_rentabilidad = pd.read_sql(
-                query,
-                self.db.bind,
-                params={"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
-            )
-            
-            # Calculamos métricas adicionales
-            df_rentabilidad['roi'] = (
-                (df_rentabilidad['ganancia_total'] / 
-                (df_rentabilidad['cantidad_cortinas'] * df_rentabilidad['costo_promedio'])) * 100
-            )
-            
-            # Agregamos análisis de tendencias mensuales
-            query_tendencias = """
-                SELECT 
-                    DATE_TRUNC('month', c.fecha_creacion) as mes,
-                    d.nombre as diseno,
-                    COUNT(c.id) as ventas_mes,
-                    SUM(c.precio_venta - c.costo_total) as ganancia_mes
-                FROM cortinas c
-                JOIN disenos d ON c.diseno_id = d.id
-                WHERE c.fecha_creacion BETWEEN :fecha_inicio AND :fecha_fin
-                GROUP BY DATE_TRUNC('month', c.fecha_creacion), d.id, d.nombre
-                ORDER BY mes, diseno
-            """
-            
-            df_tendencias = pd.read_sql(
-                query_tendencias,
-                self.db.bind,
-                params={"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
-            )
-            
-            # Creamos análisis de pivot para ver tendencias
-            pivot_tendencias = df_tendencias.pivot_table(
-                index='mes',
-                columns='diseno',
-                values=['ventas_mes', 'ganancia_mes'],
-                aggfunc='sum'
+            if formato not in ("excel", "csv"):
+                raise ValueError(f"Formato no soportado: {formato}")
+
+            clave = None
+            if self.cache is not None:
+                watermark = await self._en_executor(
+                    self._watermark_rentabilidad, fecha_inicio, fecha_fin
+                )
+                clave = self.cache.clave(
+                    "rentabilidad",
+                    {
+                        "fecha_inicio": fecha_inicio,
+                        "fecha_fin": fecha_fin,
+                        "formato": formato,
+                        "backend": EXCEL_BACKEND if formato == "excel" else None
+                    },
+                    watermark
+                )
+                cacheado = await self._en_executor(
+                    self.cache.buscar, "rentabilidad", clave, 1 if formato == "excel" else 2
+                )
+                if cacheado:
+                    logger.info(f"Reporte de rentabilidad servido desde la caché ({clave[:12]})")
+                    return cacheado['reporte'] if formato == "excel" else cacheado
+
+            dataframes = await self._en_executor(
+                self._datos_rentabilidad, fecha_inicio, fecha_fin
             )
-            
+
             # Generamos el reporte en el formato solicitado
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
+
             if formato == "excel":
-                return await self._guardar_excel_multiple(
+                ruta = await self._guardar_excel_multiple(
                     {
-                        'Resumen Rentabilidad': df_rentabilidad,
-                        'Tendencias Mensuales': df_tendencias,
-                        'Análisis Pivot': pivot_tendencias
+                        'Resumen Rentabilidad': dataframes['rentabilidad'],
+                        'Tendencias Mensuales': dataframes['tendencias'],
+                        'Análisis Pivot': dataframes['pivot']
                     },
                     f"rentabilidad_{timestamp}.xlsx",
                     "Análisis de Rentabilidad"
                 )
-            elif formato == "csv":
-                return await self._guardar_csv_multiple(
-                    {
-                        'rentabilidad': df_rentabilidad,
-                        'tendencias': df_tendencias
-                    },
-                    f"rentabilidad_{timestamp}"
-                )
-            else:
-                raise ValueError(f"Formato no soportado: {formato}")
-                
+                if clave is None:
+                    return ruta
+                guardados = await self._en_executor(self.cache.guardar, clave, {'reporte': ruta})
+                return guardados['reporte']
+
+            rutas = await self._guardar_csv_multiple(
+                {
+                    'rentabilidad': dataframes['rentabilidad'],
+                    'tendencias': dataframes['tendencias']
+                },
+                f"rentabilidad_{timestamp}"
+            )
+            if clave is None:
+                return rutas
+            return await self._en_executor(self.cache.guardar, clave, rutas)
+
         except Exception as e:
             logger.error(f"Error generando reporte de rentabilidad: {str(e)}")
             raise
-    
+
+    def _fuente_cortinas(self, fecha_inicio: datetime, fecha_fin: datetime) -> str:
+        """Tabla de cortinas a consultar: incluye el archivo solo si el rango lo alcanza"""
+        archivadas = self.db.execute(stmt_archivo_en_rango(fecha_inicio, fecha_fin)).first()
+        return fuente_cortinas_sql(archivadas is not None)
+
+    def _watermark_rentabilidad(
+        self,
+        fecha_inicio: datetime,
+        fecha_fin: datetime
+    ) -> Dict[str, Any]:
+        """
+        Estado de los datos que alimentan el reporte de rentabilidad: cualquier
+        alta, baja o modificación de cortinas del rango o de diseños lo cambia.
+        """
+        fuente = self._fuente_cortinas(fecha_inicio, fecha_fin)
+        fila = self.db.execute(
+            text(f"""
+                SELECT
+                    (SELECT MAX(fecha_actualizacion) FROM {fuente} c
+                     WHERE fecha_creacion BETWEEN :fecha_inicio AND :fecha_fin) as cortinas_max,
+                    (SELECT COUNT(*) FROM {fuente} c
+                     WHERE fecha_creacion BETWEEN :fecha_inicio AND :fecha_fin) as cortinas_total,
+                    (SELECT MAX(fecha_actualizacion) FROM disenos) as disenos_max,
+                    (SELECT COUNT(*) FROM disenos) as disenos_total
+            """),
+            {"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
+        ).mappings().one()
+        return {k: str(v) for k, v in fila.items()}
+
+    def _datos_rentabilidad(
+        self,
+        fecha_inicio: datetime,
+        fecha_fin: datetime
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Ejecuta las consultas del reporte de rentabilidad (bloqueante).
+
+        El precio de venta de una cortina es su costo_total, que ya incluye la
+        rentabilidad; el costo de producción es materiales más mano de obra.
+        """
+        fuente = self._fuente_cortinas(fecha_inicio, fecha_fin)
+        query = f"""
+            SELECT
+                d.nombre as diseno,
+                COUNT(c.id) as cantidad_cortinas,
+                AVG(c.costo_materiales + c.costo_mano_obra) as costo_promedio,
+                AVG(c.costo_total) as precio_promedio,
+                SUM(c.costo_total - (c.costo_materiales + c.costo_mano_obra)) as ganancia_total,
+                AVG(
+                    (c.costo_total - (c.costo_materiales + c.costo_mano_obra))
+                    / NULLIF(c.costo_total, 0) * 100
+                ) as margen_porcentaje
+            FROM {fuente} c
+            JOIN disenos d ON c.diseno_id = d.id
+            WHERE c.fecha_creacion BETWEEN :fecha_inicio AND :fecha_fin
+            GROUP BY d.id, d.nombre
+            ORDER BY ganancia_total DESC
+        """
+
+        df_rentabilidad = pd.read_sql(
+            text(query),
+            self.db.bind,
+            params={"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
+        )
+
+        # Calculamos métricas adicionales
+        df_rentabilidad['roi'] = (
+            (df_rentabilidad['ganancia_total'] /
+            (df_rentabilidad['cantidad_cortinas'] * df_rentabilidad['costo_promedio'])) * 100
+        )
+
+        # Agregamos análisis de tendencias mensuales, agrupando en la base de
+        # datos con la expresión de periodo propia del dialecto (strftime en SQLite)
+        mes = render_date_bucket(
+            Granularidad.MES, "c.fecha_creacion", self.db.bind.dialect
+        )
+        query_tendencias = f"""
+            SELECT
+                {mes} as mes,
+                d.nombre as diseno,
+                COUNT(c.id) as ventas_mes,
+                SUM(c.costo_total - (c.costo_materiales + c.costo_mano_obra)) as ganancia_mes
+            FROM {fuente} c
+            JOIN disenos d ON c.diseno_id = d.id
+            WHERE c.fecha_creacion BETWEEN :fecha_inicio AND :fecha_fin
+            GROUP BY {mes}, d.id, d.nombre
+            ORDER BY mes, diseno
+        """
+
+        df_tendencias = pd.read_sql(
+            text(query_tendencias),
+            self.db.bind,
+            params={"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
+        )
+
+        # Creamos análisis de pivot para ver tendencias
+        pivot_tendencias = df_tendencias.pivot_table(
+            index='mes',
+            columns='diseno',
+            values=['ventas_mes', 'ganancia_mes'],
+            aggfunc='sum'
+        )
+
+        return {
+            'rentabilidad': df_rentabilidad,
+            'tendencias': df_tendencias,
+            'pivot': pivot_tendencias
+        }
+
     async def _guardar_excel_multiple(
         self,
         dataframes: Dict[str, pd.DataFrame],
@@ -126,64 +252,86 @@ class ReportGenerator:
         Guarda múltiples DataFrames en diferentes hojas de un archivo Excel,
         aplicando formato profesional y análisis visual.
         """
-        ruta_archivo = self.report_path / nombre_archivo
-        
-        # Creamos un writer de Excel
-        writer = pd.ExcelWriter(ruta_archivo, engine='openpyxl')
-        
+        contenido = await self._en_executor(self._generar_excel, dataframes, titulo)
+        return await self._escribir_archivo(self.report_path / nombre_archivo, contenido)
+
+    def _generar_excel(
+        self,
+        dataframes: Dict[str, pd.DataFrame],
+        titulo: str
+    ) -> bytes:
+        """
+        Construye el libro de Excel en memoria (bloqueante) y retorna sus bytes.
+        Usa el backend xlsxwriter salvo que REPORT_EXCEL_BACKEND=openpyxl.
+        """
+        if EXCEL_BACKEND == "openpyxl":
+            return self._generar_excel_openpyxl(dataframes, titulo)
+        return escribir_excel(dataframes, titulo)
+
+    def _generar_excel_openpyxl(
+        self,
+        dataframes: Dict[str, pd.DataFrame],
+        titulo: str
+    ) -> bytes:
+        """
+        Backend openpyxl: formatea celda por celda después de escribir cada hoja.
+        """
+        buffer = io.BytesIO()
+
         # Definimos estilos
         header_style = {
             'fill': PatternFill(start_color='1F4E78', end_color='1F4E78', fill_type='solid'),
             'font': Font(color='FFFFFF', bold=True),
             'alignment': Alignment(horizontal='center', vertical='center')
         }
-        
-        # Escribimos cada DataFrame en su propia hoja
-        for nombre_hoja, df in dataframes.items():
-            df.to_excel(writer, sheet_name=nombre_hoja, index=False, startrow=1)
-            
-            worksheet = writer.sheets[nombre_hoja]
-            
-            # Agregamos el título
-            worksheet.merge_cells('A1:H1')
-            title_cell = worksheet['A1']
-            title_cell.value = f"{titulo} - {nombre_hoja}"
-            title_cell.font = Font(size=14, bold=True)
-            title_cell.alignment = Alignment(horizontal='center')
-            
-            # Formato para encabezados
-            for cell in worksheet[2]:
-                cell.fill = header_style['fill']
-                cell.font = header_style['font']
-                cell.alignment = header_style['alignment']
-            
-            # Ajustamos anchos de columna
-            for column in worksheet.columns:
-                max_length = 0
-                column = [cell for cell in column]
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                worksheet.column_dimensions[get_column_letter(column[0].column)].width = adjusted_width
-            
-            # Agregamos filtros
-            worksheet.auto_filter.ref = worksheet.dimensions
-            
-            # Formato condicional para números
-            for row in worksheet.iter_rows(min_row=3):
-                for cell in row:
-                    if isinstance(cell.value, (int, float)):
-                        cell.number_format = '#,##0.00'
-                        cell.alignment = Alignment(horizontal='right')
-        
-        # Guardamos el archivo
-        writer.save()
-        return ruta_archivo
-    
+
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            # Escribimos cada DataFrame en su propia hoja
+            for nombre_hoja, df in dataframes.items():
+                # Las columnas MultiIndex (p.ej. tablas pivot) necesitan el índice
+                escribir_indice = isinstance(df.columns, pd.MultiIndex)
+                df.to_excel(writer, sheet_name=nombre_hoja, index=escribir_indice, startrow=1)
+
+                worksheet = writer.sheets[nombre_hoja]
+
+                # Agregamos el título
+                worksheet.merge_cells('A1:H1')
+                title_cell = worksheet['A1']
+                title_cell.value = f"{titulo} - {nombre_hoja}"
+                title_cell.font = Font(size=14, bold=True)
+                title_cell.alignment = Alignment(horizontal='center')
+
+                # Formato para encabezados
+                for cell in worksheet[2]:
+                    cell.fill = header_style['fill']
+                    cell.font = header_style['font']
+                    cell.alignment = header_style['alignment']
+
+                # Ajustamos anchos de columna
+                for column in worksheet.columns:
+                    max_length = 0
+                    column = [cell for cell in column]
+                    for cell in column:
+                        try:
+                            if len(str(cell.value)) > max_length:
+                                max_length = len(str(cell.value))
+                        except:
+                            pass
+                    adjusted_width = (max_length + 2)
+                    worksheet.column_dimensions[get_column_letter(column[0].column)].width = adjusted_width
+
+                # Agregamos filtros
+                worksheet.auto_filter.ref = worksheet.dimensions
+
+                # Formato condicional para números
+                for row in worksheet.iter_rows(min_row=3):
+                    for cell in row:
+                        if isinstance(cell.value, (int, float)):
+                            cell.number_format = '#,##0.00'
+                            cell.alignment = Alignment(horizontal='right')
+
+        return buffer.getvalue()
+
     async def _guardar_csv_multiple(
         self,
         dataframes: Dict[str, pd.DataFrame],
@@ -196,15 +344,16 @@ class ReportGenerator:
         rutas = {}
         for nombre, df in dataframes.items():
             ruta = self.report_path / f"{base_nombre}_{nombre}.csv"
-            df.to_csv(ruta, index=False)
-            rutas[nombre] = ruta
+            contenido = await self._en_executor(
+                lambda frame: frame.to_csv(index=False).encode('utf-8'), df
+            )
+            rutas[nombre] = await self._escribir_archivo(ruta, contenido)
         return rutas
-    
+
     def _calcular_dias_stock(self, stock_actual: float, consumo_diario: float) -> float:
         """
         Calcula los días estimados de stock basado en el consumo promedio.
-        Retorna infinito si el consumo es 0.
+        Retorna infinito si el consumo es 0. Acepta también arreglos de NumPy,
+        como las tasas que produce DemandForecaster.
         """
-        if consumo_diario == 0:
-            return float('inf')
-        return stock_actual / consumo_diario
\ No newline at end of file
+        return calcular_dias_stock(stock_actual, consumo_diario)
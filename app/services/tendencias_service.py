@@ -0,0 +1,97 @@
+# app/services/tendencias_service.py
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Dict, Optional
+from datetime import datetime
+
+from ..crud.cortina_historico_crud import incluir_archivo, fuente_cortinas
+from ..models.diseno import Diseno
+from ..utils.cache import cached
+from ..utils.time_buckets import Granularidad, date_bucket, normalizar_periodo
+
+@cached("tendencias", etiquetas=("cortinas", "cortinas_historico", "disenos"))
+async def get_tendencias(
+    db: AsyncSession,
+    granularidad: Granularidad = Granularidad.MES,
+    fecha_inicio: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = None,
+    diseno_id: Optional[int] = None
+) -> Dict:
+    """
+    Calcula series temporales de producción agrupadas por periodo y diseño.
+
+    La agregación se hace completamente en la base de datos, de modo que
+    solo viaja una fila por (periodo, diseño) sin importar cuántas cortinas haya.
+    Las cortinas archivadas se incluyen cuando el rango de fechas las alcanza.
+    El resultado queda en caché hasta que cambian cortinas o diseños.
+
+    Args:
+        db: Sesión de base de datos asíncrona
+        granularidad: Tamaño del periodo (day, week, month)
+        fecha_inicio: Fecha inicial opcional
+        fecha_fin: Fecha final opcional
+        diseno_id: Restringe las series a un diseño
+
+    Returns:
+        Dict con una serie por diseño y la serie total por periodo
+    """
+    granularidad = Granularidad(granularidad)
+    cortinas = fuente_cortinas(await incluir_archivo(db, fecha_inicio, fecha_fin))
+    periodo = date_bucket(granularidad, cortinas.c.fecha_creacion).label("periodo")
+
+    stmt = (
+        select(
+            periodo,
+            Diseno.id.label("diseno_id"),
+            Diseno.nombre.label("diseno"),
+            func.count(cortinas.c.id).label("cantidad"),
+            func.coalesce(func.sum(cortinas.c.costo_total), 0).label("costo_total")
+        )
+        .select_from(cortinas)
+        .join(Diseno, cortinas.c.diseno_id == Diseno.id)
+        .group_by(periodo, Diseno.id, Diseno.nombre)
+        .order_by(periodo, Diseno.nombre)
+    )
+
+    if fecha_inicio:
+        stmt = stmt.where(cortinas.c.fecha_creacion >= fecha_inicio)
+    if fecha_fin:
+        stmt = stmt.where(cortinas.c.fecha_creacion <= fecha_fin)
+    if diseno_id:
+        stmt = stmt.where(cortinas.c.diseno_id == diseno_id)
+
+    result = await db.execute(stmt)
+
+    series: Dict[int, Dict] = {}
+    totales: Dict[str, Dict] = {}
+    for row in result:
+        inicio = normalizar_periodo(row.periodo)
+        cantidad = int(row.cantidad)
+        costo_total = round(float(row.costo_total), 2)
+
+        serie = series.setdefault(row.diseno_id, {
+            "diseno_id": row.diseno_id,
+            "diseno": row.diseno,
+            "puntos": []
+        })
+        serie["puntos"].append({
+            "periodo": inicio,
+            "cantidad": cantidad,
+            "costo_total": costo_total
+        })
+
+        total = totales.setdefault(inicio, {
+            "periodo": inicio,
+            "cantidad": 0,
+            "costo_total": 0.0
+        })
+        total["cantidad"] += cantidad
+        total["costo_total"] = round(total["costo_total"] + costo_total, 2)
+
+    return {
+        "granularidad": granularidad.value,
+        "fecha_inicio": fecha_inicio,
+        "fecha_fin": fecha_fin,
+        "series": list(series.values()),
+        "totales": sorted(totales.values(), key=lambda t: t["periodo"])
+    }
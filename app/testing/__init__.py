@@ -0,0 +1,4 @@
+# app/testing/__init__.py
+"""
+Utilidades para los tests del proyecto.
+"""
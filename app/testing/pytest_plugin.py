@@ -0,0 +1,71 @@
+# app/testing/pytest_plugin.py
+"""
+Plugin de pytest con el detector de consultas N+1.
+
+Se activa desde el conftest.py de los tests:
+
+    pytest_plugins = ["app.testing.pytest_plugin"]
+
+o en la línea de comandos con `pytest -p app.testing.pytest_plugin`.
+Mientras el plugin está cargado, el detector trabaja en modo raise: toda
+petición que repita una misma forma de consulta por encima del umbral
+termina con NPlusOneError, así las regresiones N+1 fallan en CI.
+
+El fixture `n_plus_one` vigila también las llamadas directas a CRUD y
+servicios dentro del test:
+
+    async def test_exportacion(n_plus_one, db):
+        await exportar_cortinas(db)
+
+    @pytest.mark.n_plus_one(umbral=3)
+    async def test_crear_cortina(n_plus_one, db): ...
+
+El fixture `redis_l2` entrega un RedisCache para probar la caché de dos
+niveles: contra CACHE_TEST_REDIS_URL (p.ej. un redis-server local) o, si no
+está definida, contra fakeredis. Se omite el test si no hay ninguno.
+"""
+import os
+
+import pytest
+
+from ..utils.n_plus_one import N_PLUS_ONE_THRESHOLD, n_plus_one as detector
+
+def pytest_addoption(parser):
+    parser.addini(
+        "n_plus_one_threshold",
+        "Repeticiones permitidas de una misma forma de consulta",
+        default=str(N_PLUS_ONE_THRESHOLD)
+    )
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "n_plus_one(umbral): umbral propio del detector N+1 para el test"
+    )
+    detector.modo = "raise"
+    detector.umbral = int(config.getini("n_plus_one_threshold"))
+
+@pytest.fixture
+def n_plus_one(request):
+    """
+    Vigila las consultas del test; falla en el teardown si alguna forma
+    de consulta se repite por encima del umbral.
+    """
+    marca = request.node.get_closest_marker("n_plus_one")
+    umbral = marca.kwargs.get("umbral", marca.args[0] if marca.args else None) if marca else None
+    with detector.vigilar(request.node.nodeid, umbral=umbral, modo="raise") as ambito:
+        yield ambito
+
+@pytest.fixture
+def redis_l2():
+    """RedisCache sobre un Redis de prueba (sin iniciar la escucha)"""
+    pytest.importorskip("msgpack")
+    redis = pytest.importorskip("redis.asyncio")
+    from ..utils.cache_redis import RedisCache
+
+    url = os.getenv("CACHE_TEST_REDIS_URL")
+    if url:
+        cliente = redis.from_url(url)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        cliente = fakeredis.FakeAsyncRedis()
+    return RedisCache(cliente, prefijo=f"test:{os.getpid()}:")
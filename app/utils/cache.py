@@ -1,145 +1,407 @@
 # app/utils/cache.py
-from functools import wraps
-from typing import Any, Optional, Callable
-import pickle
-from datetime import datetime, timedelta
+"""
+Caché en memoria acotada para lecturas frecuentes.
+
+CacheManager guarda las entradas en un OrderedDict en orden de uso: cada
+acierto mueve la entrada al final y, cuando se supera el número máximo de
+entradas o de bytes estimados, se expulsan las menos usadas. Cada entrada
+tiene un TTL propio. Las claves son cadenas "prefijo:hash" y los patrones
+de invalidación siguen la sintaxis glob de Redis ("diseno:*").
+
+Las llamadas concurrentes que fallan sobre la misma clave comparten un solo
+cálculo (single-flight): la primera ejecuta la función y las demás esperan
+su resultado.
+
+El decorador `cached` arma la clave con los argumentos de la llamada, sin
+sesiones, requests ni self, y la etiqueta con las tablas de las que depende
+el resultado; las escrituras que marcan esas tablas (ver app.utils.cache_http)
+invalidan la entrada:
+
+    @cached("tendencias", etiquetas=("cortinas", "disenos"))
+    async def get_tendencias(db: AsyncSession, granularidad: str): ...
+
+Con CACHE_REDIS_URL la caché tiene dos niveles: este L1 por worker y un L2
+en Redis compartido por todos (ver app.utils.cache_redis). Un fallo del L1
+consulta el L2 antes de calcular, y las invalidaciones se propagan a los L1
+de los demás workers por pub/sub. En L2 solo se guardan valores que msgpack
+pueda serializar.
+
+Los valores cacheados se comparten entre solicitudes y no deben modificarse.
+"""
+import asyncio
 import hashlib
+import inspect
 import json
-from fastapi import Request
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models.diseno import Diseno
+from .metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_HITS, CACHE_MISSES
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", "2048"))
+CACHE_MAX_MB = float(os.getenv("CACHE_MAX_MB", "64"))
+CACHE_TTL = float(os.getenv("CACHE_TTL", "300"))
+# Redis compartido entre workers (L2); sin valor la caché es solo en memoria
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL") or None
+
+# Parámetros que nunca forman parte de la clave
+_TIPOS_EXCLUIDOS = (AsyncSession, Session)
+_NOMBRES_EXCLUIDOS = {"self", "cls", "db", "session", "request"}
+
+# Momento (time.time) de la última invalidación de cada etiqueta en este worker
+_invalidaciones: Dict[str, float] = {}
+
+def tamano_aproximado(valor: Any, _vistos: Optional[set] = None) -> int:
+    """
+    Bytes aproximados de un valor y de lo que referencia: contenedores,
+    atributos de objetos e instancias ORM (sin su estado interno).
+    """
+    vistos = set() if _vistos is None else _vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+
+    tamano = sys.getsizeof(valor)
+    if isinstance(valor, (str, bytes, bytearray, int, float, bool)) or valor is None:
+        return tamano
+    if isinstance(valor, dict):
+        return tamano + sum(
+            tamano_aproximado(k, vistos) + tamano_aproximado(v, vistos)
+            for k, v in valor.items()
+        )
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return tamano + sum(tamano_aproximado(v, vistos) for v in valor)
+    atributos = getattr(valor, "__dict__", None)
+    if atributos:
+        tamano += sum(
+            tamano_aproximado(v, vistos)
+            for k, v in atributos.items()
+            if not k.startswith("_sa_")
+        )
+    return tamano
+
+def _normalizar(valor: Any) -> Any:
+    """Representación JSON estable de un argumento"""
+    if hasattr(valor, "model_dump"):
+        return valor.model_dump()
+    if isinstance(valor, (set, frozenset)):
+        return sorted(valor, key=repr)
+    return repr(valor)
+
+def clave_etiquetada(prefijo: str, etiquetas: Iterable[str], digest: str) -> str:
+    """Clave "prefijo:|tabla1|tabla2|:digest"; sin etiquetas, "prefijo:digest" """
+    etiquetas = sorted(etiquetas)
+    if not etiquetas:
+        return f"{prefijo}:{digest}"
+    return f"{prefijo}:|{'|'.join(etiquetas)}|:{digest}"
+
+def patron_etiqueta(etiqueta: str) -> str:
+    """Patrón glob de las claves etiquetadas con la tabla, de cualquier prefijo"""
+    return f"*|{etiqueta}|*"
+
+def construir_clave(
+    prefijo: str, func: Callable, args: tuple, kwargs: dict, etiquetas: Iterable[str] = ()
+) -> str:
+    """
+    Clave estable a partir de los argumentos de la llamada.
+
+    Se asocian los argumentos a la firma de la función (con sus valores por
+    defecto), de modo que f(db, 1) y f(db, diseno_id=1) dan la misma clave, y
+    se omiten sesiones, requests y self.
+    """
+    ligados = inspect.signature(func).bind(*args, **kwargs)
+    ligados.apply_defaults()
+    parametros = {
+        nombre: valor
+        for nombre, valor in ligados.arguments.items()
+        if nombre not in _NOMBRES_EXCLUIDOS and not isinstance(valor, _TIPOS_EXCLUIDOS)
+    }
+    contenido = json.dumps(parametros, sort_keys=True, default=_normalizar)
+    digest = hashlib.blake2b(contenido.encode("utf-8"), digest_size=12).hexdigest()
+    return clave_etiquetada(prefijo, etiquetas, digest)
+
+def registrar_invalidacion(etiquetas: Iterable[str]) -> None:
+    ahora = time.time()
+    for etiqueta in etiquetas:
+        _invalidaciones[etiqueta] = ahora
+
+def ultima_invalidacion(etiquetas: Iterable[str]) -> float:
+    return max((_invalidaciones.get(e, 0.0) for e in etiquetas), default=0.0)
+
+class _Entrada:
+    __slots__ = ("valor", "expira", "tamano")
+
+    def __init__(self, valor: Any, expira: float, tamano: int):
+        self.valor = valor
+        self.expira = expira
+        self.tamano = tamano
 
 class CacheManager:
-    def __init__(self, redis_client=None):
-        self.cache = {}  # Fallback a memoria si no hay Redis
-        self.redis = redis_client
-    
-    def _get_cache_key(self, prefix: str, *args, **kwargs) -> str:
-        """Genera una key única para los argumentos dados"""
-        key_parts = [prefix]
-        
-        # Agregamos args y kwargs a la key
-        if args:
-            key_parts.append(pickle.dumps(args))
-        if kwargs:
-            key_parts.append(pickle.dumps(sorted(kwargs.items())))
-            
-        key_str = ''.join(str(p) for p in key_parts)
-        return hashlib.md5(key_str.encode()).hexdigest()
-    
+    """
+    Caché LRU con TTL por entrada, límite de entradas y de bytes estimados.
+
+    No es segura entre hilos: se usa desde el event loop.
+    """
+    def __init__(
+        self,
+        max_entradas: int = CACHE_MAX_ENTRADAS,
+        max_mb: float = CACHE_MAX_MB,
+        ttl: float = CACHE_TTL
+    ):
+        self.max_entradas = max_entradas
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl = ttl
+        self.bytes = 0
+        self._entradas: "OrderedDict[str, _Entrada]" = OrderedDict()
+        self._en_vuelo: Dict[str, asyncio.Future] = {}
+        self.l2 = None  # RedisCache, ver conectar_l2
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def _quitar(self, key: str) -> Optional[_Entrada]:
+        entrada = self._entradas.pop(key, None)
+        if entrada is not None:
+            self.bytes -= entrada.tamano
+        return entrada
+
+    def _expulsar(self) -> None:
+        while self._entradas and (
+            len(self._entradas) > self.max_entradas or self.bytes > self.max_bytes
+        ):
+            key, entrada = self._entradas.popitem(last=False)
+            self.bytes -= entrada.tamano
+            CACHE_EVICTIONS.labels(prefijo=key.split(":", 1)[0]).inc()
+        CACHE_ENTRIES.set(len(self._entradas))
+
+    def _buscar(self, key: str) -> Optional[_Entrada]:
+        entrada = self._entradas.get(key)
+        if entrada is None:
+            return None
+        if entrada.expira <= time.monotonic():
+            self._quitar(key)
+            return None
+        self._entradas.move_to_end(key)
+        return entrada
+
+    def _guardar(self, key: str, value: Any, expire: Optional[float]) -> None:
+        ttl = self.ttl if expire is None else expire
+        if ttl <= 0:
+            return
+        tamano = tamano_aproximado(value)
+        if tamano > self.max_bytes:
+            logger.warning(f"Valor de {tamano} bytes no cabe en la caché ({key})")
+            return
+        self._quitar(key)
+        self._entradas[key] = _Entrada(value, time.monotonic() + ttl, tamano)
+        self.bytes += tamano
+        self._expulsar()
+
+    def invalidar_local(self, keys: Optional[List[str]] = None, pattern: Optional[str] = None) -> None:
+        """Expulsa claves del L1 sin tocar el L2 (invalidaciones de otros workers)"""
+        for key in keys or ():
+            self._quitar(key)
+        if pattern:
+            for key in [k for k in self._entradas if fnmatchcase(k, pattern)]:
+                self._quitar(key)
+        CACHE_ENTRIES.set(len(self._entradas))
+
+    async def conectar_l2(self, url: str) -> None:
+        """Activa el L2 en Redis e inicia la escucha de invalidaciones"""
+        from .cache_redis import RedisCache
+
+        l2 = RedisCache.desde_url(url, al_invalidar=self.invalidar_local)
+        try:
+            await l2.iniciar()
+        except Exception:
+            await l2.cerrar()
+            raise
+        self.l2 = l2
+        logger.info("Caché L2 en Redis activada")
+
+    async def cerrar(self) -> None:
+        if self.l2 is not None:
+            l2, self.l2 = self.l2, None
+            await l2.cerrar()
+
+    async def _en_l2(self, operacion: str, *args) -> Any:
+        """Ejecuta una operación del L2; sus fallos degradan a solo L1"""
+        if self.l2 is None:
+            return None
+        try:
+            return await getattr(self.l2, operacion)(*args)
+        except Exception as e:
+            logger.warning(f"Caché L2 no disponible ({operacion}): {str(e)}")
+            return None
+
+    async def _leer_l2(self, key: str) -> Any:
+        resultado = await self._en_l2("get", key)
+        if not resultado or resultado[0] is None:
+            return None, None
+        return resultado
+
+    async def _escribir_l2(self, key: str, value: Any, expire: Optional[float]) -> None:
+        ttl = self.ttl if expire is None else expire
+        if self.l2 is None or ttl <= 0:
+            return
+        await self._en_l2("set", key, value, ttl)
+
     async def get(self, key: str) -> Optional[Any]:
-        """Obtiene un valor del caché"""
-        if self.redis:
-            value = await self.redis.get(key)
-            if value:
-                return pickle.loads(value)
-        return self.cache.get(key)
-    
-    async def set(self, key: str, value: Any, expire: int = 3600) -> None:
-        """Guarda un valor en el caché"""
-        if self.redis:
-            await self.redis.set(key, pickle.dumps(value), expire=expire)
-        else:
-            self.cache[key] = value
-            
+        """Obtiene un valor del caché (None si no existe o expiró)"""
+        entrada = self._buscar(key)
+        if entrada is not None:
+            return entrada.valor
+        valor, ttl = await self._leer_l2(key)
+        if valor is not None:
+            self._guardar(key, valor, ttl)
+        return valor
+
+    async def set(self, key: str, value: Any, expire: Optional[float] = None) -> None:
+        """Guarda un valor con TTL de `expire` segundos (por defecto CACHE_TTL)"""
+        self._guardar(key, value, expire)
+        await self._escribir_l2(key, value, expire)
+
     async def delete(self, key: str) -> None:
-        """Elimina una key del caché"""
-        if self.redis:
-            await self.redis.delete(key)
-        else:
-            self.cache.pop(key, None)
-
-    async def clear_pattern(self, pattern: str) -> None:
-        """Limpia todas las keys que coincidan con el patrón"""
-        if self.redis:
-            keys = await self.redis.keys(pattern)
-            if keys:
-                await self.redis.delete(*keys)
+        """Elimina una key del caché en todos los workers"""
+        self.invalidar_local([key])
+        await self._en_l2("delete", key)
+
+    async def clear_pattern(self, pattern: str) -> int:
+        """Elimina las keys que coinciden con el patrón glob; retorna cuántas del L1"""
+        keys = [k for k in self._entradas if fnmatchcase(k, pattern)]
+        self.invalidar_local(keys)
+        await self._en_l2("clear_pattern", pattern)
+        return len(keys)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        calcular: Callable[[], Awaitable[Any]],
+        expire: Optional[float] = None,
+        vigente: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Retorna el valor cacheado (L1, luego L2) o lo calcula una sola vez
+        por worker aunque haya varias llamadas concurrentes para la misma key.
+
+        Con `vigente`, un valor cacheado (de cualquier nivel) para el que
+        retorna False se descarta y se recalcula; p.ej. una entrada del L2
+        cuya invalidación todavía no terminó.
+        """
+        prefijo = key.split(":", 1)[0]
+        while True:
+            entrada = self._buscar(key)
+            if entrada is not None and vigente is not None and not vigente(entrada.valor):
+                self._quitar(key)
+                entrada = None
+            if entrada is not None:
+                CACHE_HITS.labels(prefijo=prefijo, nivel="l1").inc()
+                return entrada.valor
+
+            en_vuelo = self._en_vuelo.get(key)
+            if en_vuelo is None:
+                break
+            try:
+                return await asyncio.shield(en_vuelo)
+            except asyncio.CancelledError:
+                # Se canceló el cálculo de otra llamada, no esta: reintentar
+                if not en_vuelo.cancelled():
+                    raise
+
+        futuro = asyncio.get_running_loop().create_future()
+        # Marca la excepción como recuperada si nadie más esperaba el resultado
+        futuro.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._en_vuelo[key] = futuro
+        try:
+            valor, ttl = await self._leer_l2(key)
+            if valor is not None and vigente is not None and not vigente(valor):
+                valor = None
+            if valor is not None:
+                CACHE_HITS.labels(prefijo=prefijo, nivel="l2").inc()
+                self._guardar(key, valor, ttl if expire is None else min(expire, ttl or expire))
+            else:
+                CACHE_MISSES.labels(prefijo=prefijo).inc()
+                valor = await calcular()
+                if valor is not None:
+                    self._guardar(key, valor, expire)
+                    await self._escribir_l2(key, valor, expire)
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
         else:
-            # Para caché en memoria, usamos un enfoque simple
-            keys_to_delete = [k for k in self.cache.keys() if pattern in k]
-            for k in keys_to_delete:
-                del self.cache[k]
+            futuro.set_result(valor)
+            return valor
+        finally:
+            self._en_vuelo.pop(key, None)
+
+cache = CacheManager()
+
+async def iniciar_cache(url: Optional[str] = CACHE_REDIS_URL) -> None:
+    """
+    Conecta el L2 de la caché global si hay Redis configurado. Si Redis no
+    responde, la aplicación arranca igual con la caché solo en memoria.
+    """
+    if not url:
+        return
+    try:
+        await cache.conectar_l2(url)
+    except Exception as e:
+        logger.warning(f"No se pudo conectar la caché L2 ({str(e)}); se usa solo L1")
+
+async def cerrar_cache() -> None:
+    await cache.cerrar()
 
 def cached(
     prefix: str,
-    expire: int = 3600,
-    vary_on_auth: bool = True
+    etiquetas: Iterable[str] = (),
+    expire: Optional[float] = None,
+    cache_manager: Optional[CacheManager] = None
 ):
     """
-    Decorador para cachear resultados de funciones y métodos.
-    
+    Decorador para cachear resultados de funciones async.
+
+    Los resultados None no se guardan. Cada resultado guarda cuándo empezó a
+    calcularse; uno anterior a la última invalidación de sus etiquetas se
+    descarta al leerlo, igual que en la caché de respuestas HTTP.
+
     Args:
-        prefix: Prefijo para la key de caché
-        expire: Tiempo de expiración en segundos
-        vary_on_auth: Si es True, la caché varía según el usuario autenticado
+        prefix: Prefijo de la key de caché
+        etiquetas: Tablas de las que depende el resultado
+        expire: Tiempo de expiración en segundos (por defecto CACHE_TTL)
+        cache_manager: Caché a usar (por defecto la instancia global)
     """
+    etiquetas = tuple(sorted(etiquetas))
+
     def decorator(func: Callable):
+        def vigente(entrada: dict) -> bool:
+            return entrada["calculada"] > ultima_invalidacion(etiquetas)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Obtenemos el CacheManager del primer argumento si es self
-            cache_manager = getattr(args[0], 'cache_manager', None) if args else None
-            
-            if not cache_manager:
-                # Si no hay cache_manager, ejecutamos la función original
-                return await func(*args, **kwargs)
-            
-            # Construimos la key de caché
-            cache_key = cache_manager._get_cache_key(prefix, *args, **kwargs)
-            
-            # Si vary_on_auth es True, incluimos el user_id en la key
-            if vary_on_auth:
-                request = kwargs.get('request')
-                if request and hasattr(request, 'user'):
-                    cache_key += f"_user_{request.user.id}"
-            
-            # Intentamos obtener del caché
-            cached_value = await cache_manager.get(cache_key)
-            if cached_value is not None:
-                return cached_value
-            
-            # Si no está en caché, ejecutamos la función
-            result = await func(*args, **kwargs)
-            
-            # Guardamos en caché
-            await cache_manager.set(cache_key, result, expire)
-            
-            return result
+            async def calcular() -> Optional[dict]:
+                inicio = time.time()
+                valor = await func(*args, **kwargs)
+                return None if valor is None else {"valor": valor, "calculada": inicio}
+
+            destino = cache if cache_manager is None else cache_manager
+            entrada = await destino.get_or_compute(
+                construir_clave(prefix, func, args, kwargs, etiquetas),
+                calcular, expire, vigente=vigente
+            )
+            return None if entrada is None else entrada["valor"]
+
         return wrapper
     return decorator
-
-# Ejemplo de uso en servicios:
-class DisenoService:
-    def __init__(self, db: Session, cache_manager: CacheManager):
-        self.db = db
-        self.cache_manager = cache_manager
-    
-    @cached("diseno_detail", expire=3600)
-    async def get_diseno_detail(self, diseno_id: int) -> dict:
-        """Obtiene los detalles de un diseño con caché"""
-        # Lógica para obtener detalles del diseño
-        diseno = self.db.query(Diseno).get(diseno_id)
-        if not diseno:
-            return None
-            
-        return {
-            "id": diseno.id,
-            "nombre": diseno.nombre,
-            "descripcion": diseno.descripcion,
-            "costo_base": diseno.costo_mano_obra,
-            # ... más detalles
-        }
-    
-    @cached("disenos_list", expire=1800)
-    async def list_disenos(self, skip: int = 0, limit: int = 100) -> list:
-        """Lista diseños con caché"""
-        disenos = self.db.query(Diseno).offset(skip).limit(limit).all()
-        return [
-            {
-                "id": d.id,
-                "nombre": d.nombre,
-                "costo_base": d.costo_mano_obra
-            }
-            for d in disenos
-        ]
\ No newline at end of file
@@ -0,0 +1,228 @@
+# app/utils/cache_http.py
+"""
+Caché de respuestas HTTP para GET seleccionados, invalidada por etiquetas.
+
+Los paneles repiten las mismas consultas (/disenos/, /referencias/,
+/cortinas/estadisticas/, /cortinas/consumo/materiales/). CacheHTTPMiddleware
+guarda la respuesta completa (estado, cabeceras y cuerpo) en la caché
+global de app.utils.cache, con clave por ruta y query string normalizada,
+y la sirve desde memoria hasta que cambian las tablas de las que depende.
+
+Cada entrada se etiqueta con esas tablas y las etiquetas viajan dentro de
+la clave ("http:|cortinas|disenos|:<hash>"), así que invalidar una tabla es
+un clear_pattern sobre la caché existente y llega también al L2 en Redis y
+a los demás workers. Las mismas etiquetas invalidan los resultados del
+decorador `cached` de app.utils.cache.
+
+Las funciones CRUD que escriben marcan las tablas en la sesión:
+
+    async with transaction_scope(db) as tx:
+        ...
+        etiquetar(tx, "cortinas")
+
+y las entradas se invalidan cuando la sesión confirma de verdad (evento
+after_commit), también en la cola de escritura, donde transaction_scope
+solo hace flush y el commit llega después. Un rollback descarta las marcas.
+
+Cada respuesta guarda cuándo empezó a calcularse y el worker recuerda la
+última invalidación de cada etiqueta. Una respuesta calculada mientras se
+invalidaba alguna de sus etiquetas no se guarda, porque pudo leer datos
+anteriores al commit; y una entrada anterior a la última invalidación se
+descarta al leerla. Esto cubre el intervalo en que el L2 todavía no se
+limpió: sin la comprobación, el siguiente GET del mismo worker volvería a
+llenar el L1 con la respuesta vieja del L2.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .cache import (
+    CacheManager,
+    cache,
+    clave_etiquetada,
+    patron_etiqueta,
+    registrar_invalidacion,
+    ultima_invalidacion,
+)
+
+logger = logging.getLogger(__name__)
+
+# Segundos de vida de una respuesta; 0 desactiva la caché de respuestas
+CACHE_HTTP_TTL = float(os.getenv("CACHE_HTTP_TTL", "300"))
+
+PREFIJO = "http"
+# Clave en session.info con las tablas modificadas por la transacción
+_CLAVE_SESION = "tablas_modificadas"
+
+@dataclass(frozen=True)
+class RutaCacheable:
+    """Tablas de las que depende la respuesta de una ruta"""
+    etiquetas: Tuple[str, ...]
+    ttl: Optional[float] = None
+
+# Rutas relativas al prefijo de la API
+RUTAS_CACHEABLES: Dict[str, RutaCacheable] = {
+    "/disenos/": RutaCacheable(("disenos", "diseno_tipos_insumo")),
+    "/referencias/": RutaCacheable(("referencias_insumo",)),
+    "/cortinas/estadisticas/": RutaCacheable(("cortinas", "cortinas_historico", "disenos")),
+    "/cortinas/consumo/materiales/": RutaCacheable((
+        "cortinas", "cortinas_historico", "diseno_tipos_insumo",
+        "referencias_insumo", "tipos_insumo"
+    )),
+}
+
+# Referencias a las invalidaciones del L2 en curso
+_pendientes: Set[asyncio.Task] = set()
+
+def clave_respuesta(ruta: str, query_string: bytes, etiquetas: Iterable[str]) -> str:
+    """Clave con las etiquetas y un hash de la ruta y la query ordenada"""
+    parametros = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    normalizada = f"{ruta}?{urlencode(parametros)}"
+    digest = hashlib.blake2b(normalizada.encode(), digest_size=16).hexdigest()
+    return clave_etiquetada(PREFIJO, etiquetas, digest)
+
+def invalidar_etiquetas(
+    etiquetas: Iterable[str],
+    cache_manager: Optional[CacheManager] = None,
+    solo_local: bool = False
+) -> None:
+    """
+    Expulsa las respuestas que dependen de alguna de las tablas. El L1 se
+    limpia en el acto; el L2 y los demás workers, en una tarea aparte, salvo
+    con solo_local (cambios que otro worker ya invalidó).
+    """
+    destino = cache if cache_manager is None else cache_manager
+    etiquetas = set(etiquetas)
+    registrar_invalidacion(etiquetas)
+    for etiqueta in etiquetas:
+        patron = patron_etiqueta(etiqueta)
+        destino.invalidar_local(pattern=patron)
+        if destino.l2 is not None and not solo_local:
+            tarea = asyncio.get_running_loop().create_task(destino.clear_pattern(patron))
+            _pendientes.add(tarea)
+            tarea.add_done_callback(_pendientes.discard)
+
+def etiquetar(session: AsyncSession, *tablas: str) -> None:
+    """Marca tablas modificadas por la transacción en curso de la sesión"""
+    session.info.setdefault(_CLAVE_SESION, set()).update(tablas)
+
+@event.listens_for(Session, "after_commit")
+def _al_confirmar(session: Session) -> None:
+    tablas = session.info.pop(_CLAVE_SESION, None)
+    if tablas:
+        invalidar_etiquetas(tablas)
+
+@event.listens_for(Session, "after_rollback")
+def _al_revertir(session: Session) -> None:
+    session.info.pop(_CLAVE_SESION, None)
+
+class CacheHTTPMiddleware:
+    """
+    Middleware ASGI que sirve desde la caché los GET de RUTAS_CACHEABLES.
+
+    Solo guarda respuestas 200. Debe quedar por dentro de CORSMiddleware
+    para que las cabeceras CORS se calculen en cada petición. Una petición
+    con "Cache-Control: no-cache" pasa directo a la aplicación.
+    """
+
+    def __init__(
+        self,
+        app,
+        prefijo: str = "",
+        rutas: Dict[str, RutaCacheable] = RUTAS_CACHEABLES,
+        cache_manager: Optional[CacheManager] = None,
+        ttl: float = CACHE_HTTP_TTL
+    ):
+        self.app = app
+        self.rutas = {f"{prefijo}{ruta}": config for ruta, config in rutas.items()}
+        self.cache_manager = cache_manager
+        self.ttl = ttl
+
+    def _cache(self) -> CacheManager:
+        return cache if self.cache_manager is None else self.cache_manager
+
+    def _ruta(self, scope) -> Optional[RutaCacheable]:
+        if scope["type"] != "http" or scope["method"] != "GET" or self.ttl <= 0:
+            return None
+        config = self.rutas.get(scope["path"])
+        if config is None:
+            return None
+        for nombre, valor in scope.get("headers", ()):
+            if nombre == b"cache-control" and b"no-cache" in valor:
+                return None
+        return config
+
+    async def __call__(self, scope, receive, send):
+        config = self._ruta(scope)
+        if config is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Las rutas cacheables no tienen parámetros: la ruta es su plantilla
+        scope["ruta_plantilla"] = scope["path"]
+        key = clave_respuesta(scope["path"], scope.get("query_string", b""), config.etiquetas)
+        ejecutada = False
+
+        async def calcular() -> Optional[dict]:
+            nonlocal ejecutada
+            ejecutada = True
+            inicio = time.time()
+            respuesta = await self._ejecutar(scope, receive, send)
+            if respuesta is None or ultima_invalidacion(config.etiquetas) >= inicio:
+                return None
+            return {**respuesta, "calculada": inicio}
+
+        def vigente(respuesta: dict) -> bool:
+            return respuesta.get("calculada", 0.0) > ultima_invalidacion(config.etiquetas)
+
+        respuesta = await self._cache().get_or_compute(
+            key, calcular, config.ttl if config.ttl is not None else self.ttl, vigente=vigente
+        )
+        if ejecutada:
+            return
+        if respuesta is None:
+            # Quien la calculó no la guardó (error o invalidación): calcularla aquí
+            await self.app(scope, receive, send)
+            return
+        await self._reproducir(respuesta, send)
+
+    async def _ejecutar(self, scope, receive, send) -> Optional[dict]:
+        """Envía la respuesta al cliente y retorna una copia si es cacheable"""
+        estado = 0
+        cabeceras: List[List[bytes]] = []
+        partes: List[bytes] = []
+
+        async def enviar(mensaje):
+            nonlocal estado, cabeceras
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                cabeceras = [list(c) for c in mensaje.get("headers", ())]
+                mensaje = {
+                    **mensaje,
+                    "headers": [*mensaje.get("headers", ()), (b"x-cache", b"MISS")]
+                }
+            elif mensaje["type"] == "http.response.body" and estado == 200:
+                partes.append(mensaje.get("body", b""))
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
+        if estado != 200:
+            return None
+        return {"estado": estado, "cabeceras": cabeceras, "cuerpo": b"".join(partes)}
+
+    async def _reproducir(self, respuesta: dict, send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": respuesta["estado"],
+            "headers": [*(tuple(c) for c in respuesta["cabeceras"]), (b"x-cache", b"HIT")]
+        })
+        await send({"type": "http.response.body", "body": respuesta["cuerpo"]})
@@ -0,0 +1,173 @@
+# app/utils/cache_redis.py
+"""
+Segundo nivel (L2) de la caché de lecturas sobre Redis.
+
+Los valores se serializan con msgpack; fechas y decimales viajan como tipos
+de extensión. Cada invalidación (delete, clear_pattern) se publica en un
+canal pub/sub para que los demás workers expulsen las mismas claves de su
+L1; el worker que publica ya lo hizo y descarta sus propios mensajes.
+
+La invalidación por patrón recorre las claves con SCAN (nunca KEYS) y las
+borra en grupos con UNLINK.
+
+Acepta cualquier cliente con la API de redis.asyncio, incluido
+fakeredis.FakeAsyncRedis para pruebas.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import msgpack
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Tipos de extensión de msgpack
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_DECIMAL = 3
+
+# Claves borradas por cada UNLINK durante una invalidación por patrón
+_LOTE_BORRADO = 500
+
+def _codificar_ext(valor: Any) -> msgpack.ExtType:
+    if isinstance(valor, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, valor.isoformat().encode())
+    if isinstance(valor, date):
+        return msgpack.ExtType(_EXT_DATE, valor.isoformat().encode())
+    if isinstance(valor, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(valor).encode())
+    raise TypeError(f"Tipo no serializable en la caché: {type(valor).__name__}")
+
+def _decodificar_ext(codigo: int, datos: bytes) -> Any:
+    if codigo == _EXT_DATETIME:
+        return datetime.fromisoformat(datos.decode())
+    if codigo == _EXT_DATE:
+        return date.fromisoformat(datos.decode())
+    if codigo == _EXT_DECIMAL:
+        return Decimal(datos.decode())
+    return msgpack.ExtType(codigo, datos)
+
+def serializar(valor: Any) -> bytes:
+    """msgpack con soporte de datetime, date y Decimal; TypeError si no se puede"""
+    return msgpack.packb(valor, default=_codificar_ext, use_bin_type=True)
+
+def deserializar(datos: bytes) -> Any:
+    return msgpack.unpackb(datos, ext_hook=_decodificar_ext, raw=False)
+
+# (claves, patrón) recibidos de otro worker
+AlInvalidar = Callable[[Optional[List[str]], Optional[str]], None]
+
+class RedisCache:
+    """
+    Caché L2 compartida entre workers.
+
+    Args:
+        cliente: Cliente redis.asyncio (o fakeredis) sin decode_responses
+        al_invalidar: Callback del L1 para invalidaciones de otros workers
+        prefijo: Espacio de nombres de las claves en Redis
+        canal: Canal pub/sub de invalidaciones
+    """
+    def __init__(
+        self,
+        cliente: aioredis.Redis,
+        al_invalidar: Optional[AlInvalidar] = None,
+        prefijo: str = "cortinas:cache:",
+        canal: str = "cortinas:cache:invalidaciones"
+    ):
+        self.cliente = cliente
+        self.al_invalidar = al_invalidar
+        self.prefijo = prefijo
+        self.canal = canal
+        self.origen = uuid.uuid4().hex
+        self._escucha: Optional[asyncio.Task] = None
+
+    @classmethod
+    def desde_url(cls, url: str, **kwargs) -> "RedisCache":
+        return cls(aioredis.from_url(url), **kwargs)
+
+    def _clave(self, key: str) -> str:
+        return f"{self.prefijo}{key}"
+
+    async def get(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """Retorna (valor, segundos de vida restantes); (None, None) si no existe"""
+        async with self.cliente.pipeline(transaction=False) as pipe:
+            datos, pttl = await pipe.get(self._clave(key)).pttl(self._clave(key)).execute()
+        if datos is None:
+            return None, None
+        return deserializar(datos), (pttl / 1000 if pttl and pttl > 0 else None)
+
+    async def set(self, key: str, value: Any, expire: float) -> None:
+        await self.cliente.set(self._clave(key), serializar(value), px=max(int(expire * 1000), 1))
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        await self.cliente.unlink(*[self._clave(k) for k in keys])
+        await self._publicar(claves=list(keys))
+
+    async def clear_pattern(self, pattern: str) -> int:
+        """Borra las claves que coinciden con el patrón recorriéndolas con SCAN"""
+        borradas = 0
+        lote: List[bytes] = []
+        async for clave in self.cliente.scan_iter(match=self._clave(pattern), count=_LOTE_BORRADO):
+            lote.append(clave)
+            if len(lote) >= _LOTE_BORRADO:
+                borradas += await self.cliente.unlink(*lote)
+                lote = []
+        if lote:
+            borradas += await self.cliente.unlink(*lote)
+        await self._publicar(patron=pattern)
+        return borradas
+
+    async def _publicar(self, claves: Optional[Iterable[str]] = None, patron: Optional[str] = None) -> None:
+        mensaje = {"origen": self.origen, "claves": list(claves) if claves else None, "patron": patron}
+        await self.cliente.publish(self.canal, serializar(mensaje))
+
+    def _recibir(self, datos: bytes) -> None:
+        mensaje = deserializar(datos)
+        if mensaje.get("origen") == self.origen or self.al_invalidar is None:
+            return
+        self.al_invalidar(mensaje.get("claves"), mensaje.get("patron"))
+
+    async def _escuchar(self) -> None:
+        """
+        Aplica las invalidaciones de otros workers. Si la suscripción se cae,
+        se reconecta y vacía el L1, porque pudo perder mensajes.
+        """
+        while True:
+            pubsub = self.cliente.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.canal)
+                async for mensaje in pubsub.listen():
+                    if mensaje and mensaje.get("type") == "message":
+                        self._recibir(mensaje["data"])
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as e:
+                logger.warning(f"Suscripción de invalidaciones caída: {str(e)}; reintentando")
+                if self.al_invalidar is not None:
+                    self.al_invalidar(None, "*")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def iniciar(self) -> None:
+        """Verifica la conexión e inicia la escucha de invalidaciones"""
+        await self.cliente.ping()
+        if self._escucha is None:
+            self._escucha = asyncio.create_task(self._escuchar(), name="cache-invalidaciones")
+
+    async def cerrar(self) -> None:
+        if self._escucha is not None:
+            self._escucha.cancel()
+            try:
+                await self._escucha
+            except asyncio.CancelledError:
+                pass
+            self._escucha = None
+        await self.cliente.aclose()
@@ -0,0 +1,236 @@
+# app/utils/catalogo.py
+"""
+Snapshot en memoria del catálogo: tipos de insumo, referencias, colores y
+diseños con su lista de materiales (BOM).
+
+El catálogo es pequeño y se lee en casi todas las peticiones (precios,
+verificación de stock, GET del catálogo). Se carga completo al arrancar en
+estructuras inmutables con __slots__ y se consulta sin ir a la base de datos.
+
+Cada escritura a través de las funciones CRUD del catálogo recarga, una vez
+confirmada, el snapshot completo desde la base con el engine de solo
+lectura y lo reemplaza con una sola asignación, de modo que un lector ve
+siempre el snapshot anterior o el nuevo, nunca uno a medio construir; cada
+reemplazo incrementa la versión.
+
+Los objetos usan los mismos nombres de atributo que los modelos ORM
+(diseno.tipos_insumo[i].referencia.precio_unitario, ...), así que los
+esquemas Pydantic con from_attributes y el código de costos los aceptan
+sin cambios. No deben modificarse.
+
+Mientras el snapshot no se haya cargado (scripts, tests sin startup),
+catalogo.actual() es None y las funciones CRUD consultan la base de datos.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..models.color_insumo import ColorInsumo
+from ..models.diseno import Diseno, DisenoTipoInsumo
+from ..models.referencia_insumo import ReferenciaInsumo
+from ..models.tipo_insumo import TipoInsumo
+from .cache_http import invalidar_etiquetas
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Tablas que forman el snapshot
+TABLAS_CATALOGO = (
+    "tipos_insumo", "referencias_insumo", "colores_insumo", "disenos", "diseno_tipos_insumo"
+)
+
+@dataclass(frozen=True, slots=True)
+class TipoInsumoSnapshot:
+    id: int
+    nombre: str
+    descripcion: Optional[str]
+    fecha_creacion: Optional[datetime]
+    fecha_actualizacion: Optional[datetime]
+
+@dataclass(frozen=True, slots=True)
+class ReferenciaSnapshot:
+    id: int
+    tipo_insumo_id: int
+    codigo: str
+    nombre: str
+    precio_unitario: float
+    fecha_creacion: Optional[datetime]
+    fecha_actualizacion: Optional[datetime]
+
+@dataclass(frozen=True, slots=True)
+class ColorSnapshot:
+    id: int
+    referencia_id: int
+    codigo: str
+    nombre: str
+    fecha_creacion: Optional[datetime]
+    fecha_actualizacion: Optional[datetime]
+
+@dataclass(frozen=True, slots=True)
+class InsumoDisenoSnapshot:
+    """Línea de la lista de materiales de un diseño"""
+    tipo_insumo_id: int
+    referencia_id: Optional[int]
+    color_id: Optional[int]
+    cantidad_por_metro: float
+    descripcion: Optional[str]
+    tipo_insumo: Optional[TipoInsumoSnapshot]
+    referencia: Optional[ReferenciaSnapshot]
+    color: Optional[ColorSnapshot]
+
+@dataclass(frozen=True, slots=True)
+class DisenoSnapshot:
+    id: int
+    id_diseno: str
+    nombre: str
+    descripcion: Optional[str]
+    costo_mano_obra: float
+    complejidad: str
+    version: Optional[str]
+    fecha_creacion: Optional[datetime]
+    fecha_actualizacion: Optional[datetime]
+    tipos_insumo: Tuple[InsumoDisenoSnapshot, ...]
+
+@dataclass(frozen=True, slots=True)
+class CatalogoSnapshot:
+    """Catálogo completo en una versión; los mapas están ordenados por id"""
+    version: int
+    cargado: datetime
+    tipos_insumo: Mapping[int, TipoInsumoSnapshot]
+    referencias: Mapping[int, ReferenciaSnapshot]
+    colores: Mapping[int, ColorSnapshot]
+    disenos: Mapping[int, DisenoSnapshot]
+    referencias_por_tipo: Mapping[int, Tuple[ReferenciaSnapshot, ...]]
+    colores_por_referencia: Mapping[int, Tuple[ColorSnapshot, ...]]
+    disenos_por_codigo: Mapping[str, DisenoSnapshot]
+
+def _agrupar(items: Iterable[T], atributo: str) -> Mapping[int, Tuple[T, ...]]:
+    grupos: Dict[int, List[T]] = {}
+    for item in items:
+        grupos.setdefault(getattr(item, atributo), []).append(item)
+    return MappingProxyType({k: tuple(v) for k, v in grupos.items()})
+
+def _filas(resultado, clase):
+    campos = clase.__dataclass_fields__
+    return {
+        fila["id"]: clase(**{k: v for k, v in fila.items() if k in campos})
+        for fila in resultado.mappings()
+    }
+
+async def _leer_catalogo(conn: AsyncConnection, version: int) -> CatalogoSnapshot:
+    """Lee las cinco tablas del catálogo y arma un snapshot inmutable"""
+    tipos = _filas(await conn.execute(select(TipoInsumo.__table__).order_by(TipoInsumo.id)), TipoInsumoSnapshot)
+    referencias = _filas(
+        await conn.execute(select(ReferenciaInsumo.__table__).order_by(ReferenciaInsumo.id)),
+        ReferenciaSnapshot
+    )
+    colores = _filas(await conn.execute(select(ColorInsumo.__table__).order_by(ColorInsumo.id)), ColorSnapshot)
+
+    lineas: Dict[int, List[InsumoDisenoSnapshot]] = {}
+    resultado = await conn.execute(
+        select(DisenoTipoInsumo.__table__).order_by(DisenoTipoInsumo.diseno_id, DisenoTipoInsumo.id)
+    )
+    for fila in resultado.mappings():
+        lineas.setdefault(fila["diseno_id"], []).append(InsumoDisenoSnapshot(
+            tipo_insumo_id=fila["tipo_insumo_id"],
+            referencia_id=fila["referencia_id"],
+            color_id=fila["color_id"],
+            cantidad_por_metro=fila["cantidad_por_metro"],
+            descripcion=fila["descripcion"],
+            tipo_insumo=tipos.get(fila["tipo_insumo_id"]),
+            referencia=referencias.get(fila["referencia_id"]),
+            color=colores.get(fila["color_id"])
+        ))
+
+    campos_diseno = DisenoSnapshot.__dataclass_fields__
+    disenos = {
+        fila["id"]: DisenoSnapshot(
+            **{k: v for k, v in fila.items() if k in campos_diseno},
+            tipos_insumo=tuple(lineas.get(fila["id"], ()))
+        )
+        for fila in (await conn.execute(select(Diseno.__table__).order_by(Diseno.id))).mappings()
+    }
+
+    return CatalogoSnapshot(
+        version=version,
+        cargado=datetime.utcnow(),
+        tipos_insumo=MappingProxyType(tipos),
+        referencias=MappingProxyType(referencias),
+        colores=MappingProxyType(colores),
+        disenos=MappingProxyType(disenos),
+        referencias_por_tipo=_agrupar(referencias.values(), "tipo_insumo_id"),
+        colores_por_referencia=_agrupar(colores.values(), "referencia_id"),
+        disenos_por_codigo=MappingProxyType({d.id_diseno: d for d in disenos.values()})
+    )
+
+def coincide(termino: Optional[str], *textos: Optional[str]) -> bool:
+    """Equivalente de ILIKE '%termino%' sobre alguno de los textos"""
+    if not termino:
+        return True
+    termino = termino.casefold()
+    return any(texto and termino in texto.casefold() for texto in textos)
+
+def paginar(items: Sequence[T], skip: int, limit: int) -> List[T]:
+    return list(items[skip:skip + limit])
+
+class Catalogo:
+    """Contenedor del snapshot vigente"""
+    def __init__(self):
+        self._snapshot: Optional[CatalogoSnapshot] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._lock = asyncio.Lock()
+
+    def actual(self) -> Optional[CatalogoSnapshot]:
+        """Snapshot vigente, o None si el catálogo no se cargó en este proceso"""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version if self._snapshot is not None else 0
+
+    async def cargar(self, engine: AsyncEngine) -> CatalogoSnapshot:
+        """
+        Lee el catálogo completo y lo publica como nueva versión. Las
+        recargas posteriores usan el mismo engine; en la aplicación es el de
+        solo lectura, para no tomar el bloqueo de escritura.
+        """
+        async with self._lock:
+            inicio = time.perf_counter()
+            async with engine.connect() as conn:
+                snapshot = await _leer_catalogo(conn, self.version + 1)
+            anterior, self._snapshot = self._snapshot, snapshot
+            self._engine = engine
+        if anterior is not None:
+            # Las respuestas cacheadas entre el commit y el cambio de
+            # snapshot se calcularon con el catálogo anterior
+            invalidar_etiquetas(TABLAS_CATALOGO)
+        logger.info(
+            f"Catálogo v{snapshot.version} cargado en {(time.perf_counter() - inicio) * 1000:.1f} ms: "
+            f"{len(snapshot.tipos_insumo)} tipos, {len(snapshot.referencias)} referencias, "
+            f"{len(snapshot.colores)} colores, {len(snapshot.disenos)} diseños"
+        )
+        return snapshot
+
+    async def recargar(self) -> None:
+        """
+        Recarga tras una escritura ya confirmada, con el engine de la carga
+        inicial: el commit ya terminó, así que una conexión de lectura lo ve.
+        No hace nada si el catálogo no está cargado en este proceso.
+        """
+        if self._snapshot is not None and self._engine is not None:
+            await self.cargar(self._engine)
+
+    def descartar(self) -> None:
+        """Vuelve a consultar la base hasta la próxima carga"""
+        self._snapshot = None
+        self._engine = None
+
+catalogo = Catalogo()
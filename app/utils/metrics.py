@@ -1,13 +1,16 @@
 # app/utils/metrics.py
-from contextlib import contextmanager
 from prometheus_client import Counter, Histogram, Gauge, Summary
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-from fastapi import Request, Response
+from fastapi import Response
 from functools import wraps
 import time
-from typing import Callable
+from typing import Callable, List, Optional
 from contextvars import ContextVar
+from sqlalchemy import event
 import logging
+import os
+import random
+import re
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +25,8 @@ REQUEST_LATENCY = Histogram(
     'cortinas_http_request_duration_seconds',
     'Latencia de peticiones HTTP al sistema de cortinas',
     ['method', 'endpoint'],
-    buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0]  # Buckets en segundos
+    # Buckets en segundos, finos por debajo de 100 ms
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
 )
 
 ACTIVE_REQUESTS = Gauge(
@@ -61,82 +65,284 @@ MATERIAL_USAGE = Counter(
     ['tipo_material', 'referencia']
 )
 
+# Arranque de la aplicación
+STARTUP_DURATION = Gauge(
+    'cortinas_startup_duration_seconds',
+    'Duración del último arranque (migraciones incluidas)'
+)
+
+SCHEMA_VERSION = Gauge(
+    'cortinas_schema_version',
+    'Versión del esquema de base de datos aplicada'
+)
+
+# Cola de escritura con commit agrupado
+WRITE_BATCH_SIZE = Histogram(
+    'cortinas_write_batch_size',
+    'Escrituras confirmadas por cada commit de la cola de escritura',
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128]
+)
+
+# Caché de archivos de reportes
+REPORT_CACHE_HITS = Counter(
+    'cortinas_report_cache_hits_total',
+    'Reportes servidos desde la caché de archivos',
+    ['tipo']
+)
+
+REPORT_CACHE_MISSES = Counter(
+    'cortinas_report_cache_misses_total',
+    'Reportes que debieron generarse por no estar en la caché',
+    ['tipo']
+)
+
+REPORT_CACHE_BYTES = Gauge(
+    'cortinas_report_cache_bytes',
+    'Tamaño en disco de la caché de reportes'
+)
+
+# Caché en memoria de lecturas (app.utils.cache)
+CACHE_HITS = Counter(
+    'cortinas_cache_hits_total',
+    'Lecturas servidas desde la caché (nivel l1 en memoria, l2 en Redis)',
+    ['prefijo', 'nivel']
+)
+
+CACHE_MISSES = Counter(
+    'cortinas_cache_misses_total',
+    'Lecturas que debieron calcularse por no estar en la caché',
+    ['prefijo']
+)
+
+CACHE_EVICTIONS = Counter(
+    'cortinas_cache_evictions_total',
+    'Entradas expulsadas de la caché por límite de tamaño',
+    ['prefijo']
+)
+
+CACHE_ENTRIES = Gauge(
+    'cortinas_cache_entries',
+    'Entradas actuales en la caché en memoria'
+)
+
+CAMBIOS_EXTERNOS = Counter(
+    'cortinas_cambios_externos_total',
+    'Cambios de tablas detectados por el vigilante de data_version',
+    ['tabla']
+)
+
+# Fracción de peticiones cuya latencia se mide (1.0 = todas)
+METRICS_MUESTREO = float(os.getenv('METRICS_MUESTREO', '1.0'))
+
+# Etiqueta de las peticiones que no coinciden con ninguna ruta (404,
+# escáneres): la ruta cruda dispararía la cardinalidad
+SIN_RUTA = "sin_ruta"
+
+def plantilla_ruta(scope) -> str:
+    """
+    Plantilla de la ruta resuelta por el router (p.ej. /api/v1/cortinas/{cortina_id}).
+
+    Según la versión de FastAPI la ruta incluida con prefijo conserva su
+    path_format sin el prefijo; los segmentos iniciales se toman entonces
+    de la ruta pedida. Los middlewares que responden sin pasar por el router
+    (la caché de respuestas) dejan la plantilla en scope["ruta_plantilla"].
+    """
+    route = scope.get("route")
+    formato = getattr(route, "path_format", None) if route is not None else None
+    if formato is None:
+        return scope.get("ruta_plantilla", SIN_RUTA)
+    segmentos = scope["path"].split("/")
+    propios = formato.split("/")[1:]
+    if len(segmentos) <= len(propios):
+        return formato
+    return "/".join(segmentos[:len(segmentos) - len(propios)] + propios)
+
 class MetricsMiddleware:
     """
-    Middleware para recolectar métricas de las peticiones HTTP de manera automática.
-    Registra conteos, latencias y mantiene tracking de peticiones activas.
+    Middleware ASGI que registra conteo, latencia y peticiones activas.
+
+    Las series se etiquetan con la plantilla de la ruta y no con la ruta
+    concreta, para que /cortinas/1 y /cortinas/2 sumen a la misma serie.
+    Con METRICS_MUESTREO < 1 solo se mide la latencia de esa fracción de
+    peticiones (el conteo sigue siendo exacto); el _count del histograma
+    refleja entonces las peticiones muestreadas.
     """
-    
-    async def __call__(self, request: Request, call_next):
-        # Incrementamos el contador de peticiones activas
+
+    def __init__(self, app, muestreo: float = METRICS_MUESTREO):
+        self.app = app
+        self.muestreo = muestreo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medir = self.muestreo >= 1.0 or random.random() < self.muestreo
+        inicio = time.perf_counter() if medir else 0.0
+        estado = 500
+
+        async def send_con_estado(message):
+            nonlocal estado
+            if message["type"] == "http.response.start":
+                estado = message["status"]
+            await send(message)
+
         ACTIVE_REQUESTS.inc()
-        start_time = time.time()
-        
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-            
-            # Registramos la petición exitosa
-            REQUEST_COUNT.labels(
-                method=request.method,
-                endpoint=request.url.path,
-                status=status_code
-            ).inc()
-            
-            # Registramos la latencia
-            REQUEST_LATENCY.labels(
-                method=request.method,
-                endpoint=request.url.path
-            ).observe(time.time() - start_time)
-            
-            return response
-            
-        except Exception as e:
-            # Registramos la petición fallida
-            REQUEST_COUNT.labels(
-                method=request.method,
-                endpoint=request.url.path,
-                status=500
-            ).inc()
-            raise
-            
+            await self.app(scope, receive, send_con_estado)
         finally:
-            # Siempre decrementamos el contador de peticiones activas
             ACTIVE_REQUESTS.dec()
+            # El router completa el scope con la ruta al resolverla
+            endpoint = plantilla_ruta(scope)
+            REQUEST_COUNT.labels(method=scope["method"], endpoint=endpoint, status=estado).inc()
+            if medir:
+                REQUEST_LATENCY.labels(method=scope["method"], endpoint=endpoint).observe(
+                    time.perf_counter() - inicio
+                )
+
+# Consultas SQL por petición HTTP
+DB_QUERIES_PER_REQUEST = Histogram(
+    'cortinas_db_queries_per_request',
+    'Número de consultas SQL ejecutadas por petición HTTP',
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100]
+)
+
+SLOW_QUERIES = Counter(
+    'cortinas_db_slow_queries_total',
+    'Consultas que superaron el umbral de consulta lenta',
+    ['query_type']
+)
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+
+# Contador de consultas de la petición en curso (None fuera de una petición)
+_consultas_request: ContextVar[Optional[List[int]]] = ContextVar('consultas_request', default=None)
+
+_SQL_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_LISTAS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_SQL_ESPACIOS = re.compile(r"\s+")
+
+def normalizar_sql(statement: str, max_largo: int = 500) -> str:
+    """
+    Normaliza una sentencia para agrupar consultas equivalentes en los logs:
+    literales y listas de parámetros se reemplazan por ?, y se colapsan los espacios.
+    """
+    sql = _SQL_LITERALES.sub("?", statement)
+    sql = _SQL_LISTAS.sub("(?)", sql)
+    sql = _SQL_ESPACIOS.sub(" ", sql).strip()
+    return sql if len(sql) <= max_largo else sql[:max_largo] + "..."
+
+def tipo_consulta(statement: str) -> str:
+    """Primera palabra de la sentencia (select, insert, update, ...)"""
+    palabras = statement.lstrip(" \n\t(").split(None, 1)
+    return palabras[0].lower() if palabras else "desconocida"
 
 class DatabaseMetrics:
     """
     Clase para rastrear métricas relacionadas con la base de datos.
     Mantiene conteo de conexiones y registra tiempos de consulta.
+
+    instrumentar() conecta la clase a los eventos de un engine: cada
+    sentencia registra su latencia por tipo, suma al contador de la petición
+    en curso y, si supera SLOW_QUERY_MS, se registra en el log normalizada.
     """
     
-    def __init__(self):
-        self._active_connections = 0
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
         self.query_latency = Histogram(
             'cortinas_db_query_duration_seconds',
             'Duración de consultas a la base de datos',
-            ['query_type']
+            ['query_type'],
+            buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
         )
     
     def connection_created(self):
-        """Registra una nueva conexión a la base de datos"""
-        self._active_connections += 1
-        DB_CONNECTIONS.set(self._active_connections)
+        """Registra una conexión tomada del pool"""
+        DB_CONNECTIONS.inc()
     
     def connection_closed(self):
-        """Registra el cierre de una conexión a la base de datos"""
-        self._active_connections -= 1
-        DB_CONNECTIONS.set(self._active_connections)
+        """Registra una conexión devuelta al pool"""
+        DB_CONNECTIONS.dec()
     
-    @contextmanager
-    def track_query_latency(self, query_type: str):
-        """Contexto para medir la latencia de consultas"""
-        start_time = time.time()
+    def record_query(self, statement: str, duration: float) -> None:
+        """Registra una sentencia ejecutada y su duración en segundos"""
+        query_type = tipo_consulta(statement)
+        self.query_latency.labels(query_type=query_type).observe(duration)
+
+        contador = _consultas_request.get()
+        if contador is not None:
+            contador[0] += 1
+
+        if duration * 1000 >= self.slow_query_ms:
+            SLOW_QUERIES.labels(query_type=query_type).inc()
+            logger.warning(
+                f"Consulta lenta ({duration * 1000:.1f} ms): {normalizar_sql(statement)}"
+            )
+
+    def instrumentar(self, engine) -> None:
+        """
+        Registra los listeners de cursor y de pool en un engine
+        (síncrono o asíncrono).
+        """
+        sync_engine = getattr(engine, "sync_engine", engine)
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _antes(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("_inicio_consultas", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _despues(conn, cursor, statement, parameters, context, executemany):
+            inicios = conn.info.get("_inicio_consultas")
+            if inicios:
+                self.record_query(statement, time.perf_counter() - inicios.pop())
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("_inicio_consultas"):
+                conn.info["_inicio_consultas"].pop()
+
+        @event.listens_for(sync_engine, "checkout")
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            self.connection_created()
+
+        @event.listens_for(sync_engine, "checkin")
+        def _checkin(dbapi_connection, connection_record):
+            self.connection_closed()
+
+db_metrics = DatabaseMetrics()
+
+class QueryCountMiddleware:
+    """
+    Middleware ASGI que cuenta las consultas SQL de cada petición HTTP,
+    las registra en DB_QUERIES_PER_REQUEST y las expone en la cabecera
+    X-DB-Queries de la respuesta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        contador = [0]
+        token = _consultas_request.set(contador)
+
+        async def send_con_conteo(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-db-queries", str(contador[0]).encode())
+                ]
+            await send(message)
+
         try:
-            yield
+            await self.app(scope, receive, send_con_conteo)
         finally:
-            duration = time.time() - start_time
-            self.query_latency.labels(query_type=query_type).observe(duration)
+            _consultas_request.reset(token)
+            DB_QUERIES_PER_REQUEST.observe(contador[0])
 
 def track_inventory_change(referencia_id: str, color_id: str, cantidad: float, ubicacion: str):
     """
@@ -172,5 +378,5 @@ def init_metrics(app):
     """
     Inicializa el sistema de métricas y registra el endpoint en la aplicación.
     """
-    app.add_route("/metrics", metrics_endpoint)
+    app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
     logger.info("Sistema de métricas inicializado correctamente")
\ No newline at end of file
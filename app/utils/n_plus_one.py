@@ -0,0 +1,171 @@
+# app/utils/n_plus_one.py
+"""
+Detector de consultas N+1.
+
+Cada sentencia SQL emitida dentro de un ámbito (una petición HTTP o un
+bloque `vigilar()`) se reduce a su forma normalizada, sin literales ni
+parámetros. Si una misma forma se repite más de N_PLUS_ONE_THRESHOLD veces
+dentro del ámbito, es casi siempre una consulta dentro de un bucle (la
+exportación llamando a get_diseno por fila, verificar_stock_suficiente,
+el bucle de referencias de crear_cortina...).
+
+El modo se elige con N_PLUS_ONE_MODE:
+
+- off (por defecto): no se registra nada.
+- log: staging; se registra un warning con la ruta y la consulta repetida.
+- raise: tests; el ámbito termina con NPlusOneError.
+
+En tests se usa el fixture `n_plus_one` de app.testing.pytest_plugin.
+"""
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from .metrics import SIN_RUTA, normalizar_sql, plantilla_ruta
+
+logger = logging.getLogger(__name__)
+
+MODOS = ("off", "log", "raise")
+
+N_PLUS_ONE_MODE = os.getenv("N_PLUS_ONE_MODE", "off").lower()
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+
+# Sentencias de control de transacciones y configuración: se repiten por diseño
+_IGNORADAS = ("begin", "commit", "rollback", "savepoint", "release", "pragma")
+
+class NPlusOneError(AssertionError):
+    """Se repitió una misma forma de consulta por encima del umbral"""
+
+    def __init__(self, contexto: str, repetidas: List[Tuple[str, int]]):
+        self.contexto = contexto
+        self.repetidas = repetidas
+        detalle = "; ".join(f"{veces}x {sql}" for sql, veces in repetidas)
+        super().__init__(f"Posible N+1 en {contexto}: {detalle}")
+
+class _Ambito:
+    """Huellas de las consultas emitidas en un ámbito"""
+    __slots__ = ("contexto", "umbral", "huellas")
+
+    def __init__(self, contexto: str, umbral: int):
+        self.contexto = contexto
+        self.umbral = umbral
+        self.huellas: Counter = Counter()
+
+    def repetidas(self) -> List[Tuple[str, int]]:
+        return [(sql, veces) for sql, veces in self.huellas.most_common() if veces > self.umbral]
+
+_ambito_actual: ContextVar[Optional[_Ambito]] = ContextVar("n_plus_one_ambito", default=None)
+
+class NPlusOneDetector:
+    """
+    Agrupa las consultas de cada ámbito por su forma normalizada e informa
+    de las que se repiten por encima del umbral.
+    """
+
+    def __init__(self, modo: str = N_PLUS_ONE_MODE, umbral: int = N_PLUS_ONE_THRESHOLD):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de detección N+1 desconocido: {modo}. Opciones: {', '.join(MODOS)}")
+        self.modo = modo
+        self.umbral = umbral
+        self._instrumentados: List = []
+
+    @property
+    def activo(self) -> bool:
+        return self.modo != "off"
+
+    def instrumentar(self, engine) -> None:
+        """Registra el listener de sentencias en un engine (síncrono o asíncrono)"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if sync_engine in self._instrumentados:
+            return
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _registrar(conn, cursor, statement, parameters, context, executemany):
+            ambito = _ambito_actual.get()
+            if ambito is not None:
+                self.registrar(ambito, statement)
+
+        self._instrumentados.append(sync_engine)
+
+    def registrar(self, ambito: _Ambito, statement: str) -> None:
+        sql = normalizar_sql(statement)
+        if sql.split(" ", 1)[0].lower() in _IGNORADAS:
+            return
+        ambito.huellas[sql] += 1
+
+    def informar(self, ambito: _Ambito, modo: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Revisa el ámbito al terminar: registra un warning o lanza
+        NPlusOneError según el modo.
+        """
+        repetidas = ambito.repetidas()
+        if not repetidas:
+            return repetidas
+
+        if (modo or self.modo) == "raise":
+            raise NPlusOneError(ambito.contexto, repetidas)
+        for sql, veces in repetidas:
+            logger.warning(f"Posible N+1 en {ambito.contexto}: {veces} consultas iguales: {sql}")
+        return repetidas
+
+    @contextmanager
+    def vigilar(
+        self,
+        contexto: str = "bloque",
+        umbral: Optional[int] = None,
+        modo: Optional[str] = None
+    ) -> Iterator[_Ambito]:
+        """
+        Vigila las consultas emitidas dentro del bloque.
+
+        Args:
+            contexto: Nombre usado en el log o en la excepción
+            umbral: Repeticiones permitidas por forma; por defecto el del detector
+            modo: "log" o "raise"; por defecto el del detector
+        """
+        ambito = _Ambito(contexto, self.umbral if umbral is None else umbral)
+        token = _ambito_actual.set(ambito)
+        try:
+            yield ambito
+        finally:
+            _ambito_actual.reset(token)
+        self.informar(ambito, modo)
+
+n_plus_one = NPlusOneDetector()
+
+def _nombre_ruta(scope: Dict) -> str:
+    """Método y plantilla de la ruta (p.ej. GET /api/v1/cortinas/{cortina_id})"""
+    plantilla = plantilla_ruta(scope)
+    if plantilla == SIN_RUTA:
+        plantilla = scope.get("path", "?")
+    return f"{scope.get('method', '')} {plantilla}".strip()
+
+class NPlusOneMiddleware:
+    """
+    Middleware ASGI que abre un ámbito de detección por petición HTTP.
+    No hace nada con N_PLUS_ONE_MODE=off.
+    """
+
+    def __init__(self, app, detector: NPlusOneDetector = n_plus_one):
+        self.app = app
+        self.detector = detector
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.detector.activo:
+            await self.app(scope, receive, send)
+            return
+
+        ambito = _Ambito(scope.get("path", "?"), self.detector.umbral)
+        token = _ambito_actual.set(ambito)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _ambito_actual.reset(token)
+        # El router completa el scope con la ruta al resolverla
+        ambito.contexto = _nombre_ruta(scope)
+        self.detector.informar(ambito)
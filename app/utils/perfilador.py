@@ -0,0 +1,248 @@
+# app/utils/perfilador.py
+"""
+Perfilador por muestreo bajo demanda, solo para diagnóstico.
+
+Con PERFILADOR_TOKEN configurado, una petición que trae la cabecera
+`X-Profile: <token>` se perfila mientras dura: un hilo aparte toma cada
+PERFILADOR_INTERVALO_MS la pila del hilo del event loop. Si el loop está
+ejecutando código, se registra esa pila; si está esperando E/S, se registra
+la cadena de awaits de la tarea de la petición con una hoja "[await]", así
+que el perfil muestra tanto CPU como dónde se espera (base de datos, cola
+de escritura...).
+
+El perfil es de reloj de pared del event loop: si durante la petición el
+loop atiende otras, sus pilas también aparecen. crear_cortina, por ejemplo,
+corre en la tarea de la cola de escritura y se ve por esa vía.
+
+Cada perfil se guarda en PERFILADOR_DIR en formato speedscope
+(https://www.speedscope.app) y en pilas colapsadas (flamegraph.pl), y se
+descarga desde /api/v1/debug/perfiles/ con la misma cabecera. La respuesta
+perfilada lleva su id en la cabecera X-Profile-Id.
+
+Sin token el middleware ni las rutas se registran: costo nulo.
+"""
+import asyncio
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PERFILADOR_TOKEN = os.getenv("PERFILADOR_TOKEN") or None
+PERFILADOR_DIR = Path(os.getenv("PERFILADOR_DIR", "perfiles"))
+PERFILADOR_INTERVALO_MS = float(os.getenv("PERFILADOR_INTERVALO_MS", "1"))
+# Perfiles conservados; los más antiguos se borran
+PERFILADOR_MAX = int(os.getenv("PERFILADOR_MAX", "50"))
+
+CABECERA = b"x-profile"
+
+# (función, archivo, línea de definición)
+Frame = Tuple[str, str, int]
+Pila = Tuple[Frame, ...]
+
+_ESPERA: Frame = ("[await]", "", 0)
+_INACTIVO: Frame = ("[loop inactivo]", "", 0)
+
+def _frame(f) -> Frame:
+    codigo = f.f_code
+    return (codigo.co_qualname, codigo.co_filename, codigo.co_firstlineno)
+
+def _es_handle_run(f) -> bool:
+    codigo = f.f_code
+    return codigo.co_name == "_run" and codigo.co_filename.endswith(os.path.join("asyncio", "events.py"))
+
+def _pila_loop(frame) -> Optional[Pila]:
+    """
+    Pila del callback que ejecuta el loop, desde Handle._run hacia la hoja;
+    None si el loop no está ejecutando un callback (esperando E/S).
+    """
+    frames = []
+    while frame is not None:
+        if _es_handle_run(frame):
+            return tuple(reversed(frames))
+        frames.append(_frame(frame))
+        frame = frame.f_back
+    return None
+
+def _pila_await(tarea: asyncio.Task) -> Pila:
+    """Cadena de corrutinas suspendidas de una tarea, de la raíz a la hoja"""
+    frames = []
+    coro = tarea.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(_frame(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return tuple(frames)
+
+class Muestreo:
+    """
+    Hilo que muestrea la pila del event loop hasta detener().
+
+    Args:
+        tarea: Tarea de la petición perfilada
+        intervalo: Segundos entre muestras
+    """
+    def __init__(self, tarea: asyncio.Task, intervalo: float):
+        self.tarea = tarea
+        self.intervalo = intervalo
+        self.hilo_loop = threading.get_ident()
+        self.muestras: List[Tuple[Pila, float]] = []
+        self.inicio = 0.0
+        self.duracion = 0.0
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._correr, name="perfilador", daemon=True)
+
+    def iniciar(self) -> None:
+        self.inicio = time.perf_counter()
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._parar.set()
+        self._hilo.join()
+        self.duracion = time.perf_counter() - self.inicio
+
+    def _correr(self) -> None:
+        anterior = time.perf_counter()
+        while not self._parar.wait(self.intervalo):
+            ahora = time.perf_counter()
+            pila = _pila_loop(sys._current_frames().get(self.hilo_loop))
+            if pila is None:
+                pila = (_pila_await(self.tarea) + (_ESPERA,)) if not self.tarea.done() else (_INACTIVO,)
+            self.muestras.append((pila, ahora - anterior))
+            anterior = ahora
+
+def a_speedscope(muestreo: Muestreo, nombre: str) -> Dict:
+    """Perfil en el formato de archivo de speedscope (tipo sampled, ms)"""
+    indices: Dict[Frame, int] = {}
+    frames = []
+    muestras, pesos = [], []
+    for pila, peso in muestreo.muestras:
+        fila = []
+        for frame in pila:
+            if frame not in indices:
+                indices[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            fila.append(indices[frame])
+        muestras.append(fila)
+        pesos.append(round(peso * 1000, 3))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": nombre,
+        "exporter": "sistema-cortinas",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": nombre,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": round(sum(pesos), 3),
+            "samples": muestras,
+            "weights": pesos
+        }]
+    }
+
+def a_colapsado(muestreo: Muestreo) -> str:
+    """Pilas colapsadas ("raiz;...;hoja conteo") para flamegraph.pl o speedscope"""
+    conteos: Dict[str, int] = {}
+    for pila, _ in muestreo.muestras:
+        linea = ";".join(f"{f[0]} ({os.path.basename(f[1])}:{f[2]})" if f[1] else f[0] for f in pila)
+        conteos[linea] = conteos.get(linea, 0) + 1
+    return "".join(f"{linea} {n}\n" for linea, n in conteos.items())
+
+def token_valido(valor: Optional[str], token: Optional[str] = PERFILADOR_TOKEN) -> bool:
+    return bool(token) and valor is not None and hmac.compare_digest(valor, token)
+
+def ruta_perfil(perfil_id: str, formato: str, directorio: Path = PERFILADOR_DIR) -> Path:
+    """Archivo de un perfil en formato speedscope o colapsado"""
+    extension = "speedscope.json" if formato == "speedscope" else "collapsed.txt"
+    return directorio / f"{perfil_id}.{extension}"
+
+def _guardar(directorio: Path, perfil_id: str, nombre: str, muestreo: Muestreo, maximo: int) -> None:
+    """Escribe ambos formatos y poda los perfiles más antiguos (bloqueante)"""
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta_perfil(perfil_id, "speedscope", directorio).write_text(
+        json.dumps(a_speedscope(muestreo, nombre)), encoding="utf-8"
+    )
+    ruta_perfil(perfil_id, "colapsado", directorio).write_text(a_colapsado(muestreo), encoding="utf-8")
+    perfiles = sorted(directorio.glob("*.speedscope.json"))
+    for sobrante in perfiles[:max(len(perfiles) - maximo, 0)]:
+        perfil = sobrante.name.split(".", 1)[0]
+        for formato in ("speedscope", "colapsado"):
+            ruta_perfil(perfil, formato, directorio).unlink(missing_ok=True)
+
+class PerfiladorMiddleware:
+    """
+    Middleware ASGI que perfila las peticiones con la cabecera X-Profile
+    autorizada. Un solo perfil a la vez; si ya hay uno en curso la petición
+    sigue sin perfilar y la respuesta lleva X-Profile: ocupado.
+    """
+
+    def __init__(
+        self,
+        app,
+        token: Optional[str] = PERFILADOR_TOKEN,
+        directorio: Path = PERFILADOR_DIR,
+        intervalo_ms: float = PERFILADOR_INTERVALO_MS,
+        maximo: int = PERFILADOR_MAX
+    ):
+        self.app = app
+        self.token = token
+        self.directorio = directorio
+        self.intervalo = intervalo_ms / 1000
+        self.maximo = maximo
+        self._activo = False
+
+    def _solicitado(self, scope) -> bool:
+        for nombre, valor in scope.get("headers", ()):
+            if nombre == CABECERA:
+                return token_valido(valor.decode("latin-1"), self.token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._solicitado(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if self._activo:
+            await self.app(scope, receive, self._con_cabecera(send, b"x-profile", b"ocupado"))
+            return
+
+        perfil_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        nombre = f"{scope['method']} {scope['path']}"
+        muestreo = Muestreo(asyncio.current_task(), self.intervalo)
+        self._activo = True
+        muestreo.iniciar()
+        try:
+            await self.app(scope, receive, self._con_cabecera(send, b"x-profile-id", perfil_id.encode()))
+        finally:
+            muestreo.detener()
+            self._activo = False
+            try:
+                await asyncio.to_thread(
+                    _guardar, self.directorio, perfil_id, nombre, muestreo, self.maximo
+                )
+                logger.info(
+                    f"Perfil {perfil_id} de {nombre}: {len(muestreo.muestras)} muestras "
+                    f"en {muestreo.duracion * 1000:.1f} ms"
+                )
+            except OSError as e:
+                logger.error(f"No se pudo guardar el perfil {perfil_id}: {str(e)}")
+
+    @staticmethod
+    def _con_cabecera(send, nombre: bytes, valor: bytes):
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                mensaje = {**mensaje, "headers": [*mensaje.get("headers", ()), (nombre, valor)]}
+            await send(mensaje)
+        return enviar
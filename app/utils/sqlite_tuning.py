@@ -0,0 +1,124 @@
+# app/utils/sqlite_tuning.py
+"""
+Perfiles de ajuste de SQLite aplicados una vez por conexión del pool.
+
+Los PRAGMA se ejecutan en el evento `connect` del engine, es decir, cuando
+el pool abre una conexión nueva y no en cada petición HTTP. El perfil se
+elige con SQLITE_PROFILE:
+
+- durable (por defecto): WAL con synchronous=FULL; cada commit llega al
+  disco antes de confirmarse.
+- fast: WAL con synchronous=NORMAL, caché y mmap más grandes; un corte de
+  energía puede perder los últimos commits, pero la base nunca se corrompe.
+"""
+import logging
+import os
+from typing import Dict, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+PERFILES: Dict[str, Dict[str, Union[str, int]]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,      # ms de espera ante un bloqueo de escritura
+        "cache_size": -16000,      # KiB (negativo = tamaño en KiB, no en páginas)
+        "temp_store": "MEMORY",
+        "mmap_size": 0
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456     # 256 MiB
+    }
+}
+
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "durable").lower()
+
+def aplicar_perfil(
+    engine: Union[Engine, AsyncEngine],
+    perfil: Optional[str] = None,
+    omitir: tuple = (),
+    adicionales: Optional[Dict[str, Union[str, int]]] = None
+) -> Optional[Dict[str, Union[str, int]]]:
+    """
+    Registra los PRAGMA del perfil en el evento `connect` del engine.
+    No hace nada si el engine no es SQLite.
+
+    Args:
+        engine: Engine síncrono o asíncrono
+        perfil: Nombre del perfil; por defecto SQLITE_PROFILE
+        omitir: PRAGMA del perfil que no deben ejecutarse en este engine
+        adicionales: PRAGMA propios de este engine (p.ej. query_only)
+
+    Returns:
+        Los PRAGMA aplicados, o None si el engine no es SQLite
+
+    Raises:
+        ValueError: Si el perfil no existe
+    """
+    perfil = (perfil or SQLITE_PROFILE).lower()
+    if perfil not in PERFILES:
+        raise ValueError(
+            f"Perfil de SQLite desconocido: {perfil}. Opciones: {', '.join(PERFILES)}"
+        )
+
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if sync_engine.dialect.name != "sqlite":
+        return None
+
+    pragmas = {k: v for k, v in PERFILES[perfil].items() if k not in omitir}
+    pragmas.update(adicionales or {})
+
+    @event.listens_for(sync_engine, "connect")
+    def _configurar_conexion(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nombre, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nombre}={valor}")
+        finally:
+            cursor.close()
+
+    logger.info(f"Perfil SQLite '{perfil}' aplicado a {sync_engine.url.render_as_string(hide_password=True)}")
+    return pragmas
+
+def usar_transacciones_explicitas(
+    engine: Union[Engine, AsyncEngine],
+    inmediatas: bool = True
+) -> None:
+    """
+    Hace que SQLAlchemy controle el inicio de las transacciones en SQLite.
+
+    El driver sqlite3 emite BEGIN por su cuenta solo antes del primer DML, lo
+    que rompe los SAVEPOINT (session.begin_nested): un RELEASE sin BEGIN
+    previo confirma la transacción. Con esta receta (la documentada por
+    SQLAlchemy) el driver queda en autocommit y cada transacción empieza con
+    un BEGIN explícito.
+
+    Con inmediatas=True se usa BEGIN IMMEDIATE: la transacción toma el
+    bloqueo de escritura al empezar, así dos escritores concurrentes esperan
+    busy_timeout en lugar de fallar con "database is locked" al intentar
+    pasar de lectura a escritura. Solo debe usarse en el engine de escritura.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    begin = "BEGIN IMMEDIATE" if inmediatas else "BEGIN"
+
+    @event.listens_for(sync_engine, "connect")
+    def _desactivar_begin_implicito(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sync_engine, "begin")
+    def _begin_explicito(conn):
+        conn.exec_driver_sql(begin)
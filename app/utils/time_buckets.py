@@ -0,0 +1,123 @@
+# app/utils/time_buckets.py
+from enum import Enum
+from typing import Any, Union
+
+from sqlalchemy import literal_column
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class Granularidad(str, Enum):
+    """Granularidades soportadas para agrupar series temporales"""
+    DIA = "day"
+    SEMANA = "week"
+    MES = "month"
+
+
+class _DateBucket(FunctionElement):
+    """
+    Trunca una expresión de fecha al inicio de su periodo (día, semana o mes).
+
+    Cada granularidad es una subclase propia para que la caché de compilación
+    de SQLAlchemy distinga entre ellas. Las semanas empiezan en lunes.
+    """
+    name = "date_bucket"
+    inherit_cache = True
+    granularidad: Granularidad
+
+
+class _BucketDia(_DateBucket):
+    inherit_cache = True
+    granularidad = Granularidad.DIA
+
+
+class _BucketSemana(_DateBucket):
+    inherit_cache = True
+    granularidad = Granularidad.SEMANA
+
+
+class _BucketMes(_DateBucket):
+    inherit_cache = True
+    granularidad = Granularidad.MES
+
+
+_BUCKETS = {
+    Granularidad.DIA: _BucketDia,
+    Granularidad.SEMANA: _BucketSemana,
+    Granularidad.MES: _BucketMes,
+}
+
+
+def date_bucket(granularidad: Union[Granularidad, str], expr: Any) -> _DateBucket:
+    """
+    Construye la expresión de agrupación temporal para la columna indicada.
+
+    Args:
+        granularidad: 'day', 'week' o 'month'
+        expr: Columna o expresión de tipo fecha
+
+    Returns:
+        Expresión SQL portable que se compila según el dialecto
+    """
+    return _BUCKETS[Granularidad(granularidad)](expr)
+
+
+@compiles(_DateBucket)
+def _compile_default(element, compiler, **kw):
+    """date_trunc para PostgreSQL y demás motores que lo soportan"""
+    expr = compiler.process(element.clauses, **kw)
+    return f"date_trunc('{element.granularidad.value}', {expr})"
+
+
+@compiles(_DateBucket, "sqlite")
+def _compile_sqlite(element, compiler, **kw):
+    """SQLite no tiene date_trunc; usamos strftime con modificadores de fecha"""
+    expr = compiler.process(element.clauses, **kw)
+    if element.granularidad is Granularidad.DIA:
+        return f"strftime('%Y-%m-%d', {expr})"
+    if element.granularidad is Granularidad.SEMANA:
+        # 'weekday 0' avanza al domingo siguiente (o el mismo día); -6 días da el lunes
+        return f"strftime('%Y-%m-%d', {expr}, 'weekday 0', '-6 days')"
+    return f"strftime('%Y-%m-01', {expr})"
+
+
+@compiles(_DateBucket, "mysql")
+def _compile_mysql(element, compiler, **kw):
+    """MySQL tampoco tiene date_trunc; evitamos DATE_FORMAT para no escapar '%'"""
+    expr = compiler.process(element.clauses, **kw)
+    if element.granularidad is Granularidad.DIA:
+        return f"DATE({expr})"
+    if element.granularidad is Granularidad.SEMANA:
+        return f"DATE(DATE_SUB({expr}, INTERVAL WEEKDAY({expr}) DAY))"
+    return f"DATE(DATE_SUB({expr}, INTERVAL DAYOFMONTH({expr}) - 1 DAY))"
+
+
+def render_date_bucket(
+    granularidad: Union[Granularidad, str],
+    columna_sql: str,
+    dialect: Dialect
+) -> str:
+    """
+    Renderiza el fragmento SQL de agrupación para consultas escritas con text().
+
+    Args:
+        granularidad: 'day', 'week' o 'month'
+        columna_sql: Nombre calificado de la columna, p.ej. 'c.fecha_creacion'
+        dialect: Dialecto del engine donde se ejecutará la consulta
+    """
+    return str(
+        date_bucket(granularidad, literal_column(columna_sql)).compile(dialect=dialect)
+    )
+
+
+def normalizar_periodo(valor: Any) -> str:
+    """
+    Normaliza el inicio de periodo a 'YYYY-MM-DD'.
+    SQLite devuelve texto mientras que otros motores devuelven date/datetime.
+    """
+    if hasattr(valor, "date") and callable(valor.date):
+        valor = valor.date()
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return str(valor)[:10]
@@ -7,11 +7,22 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def transaction_scope(session: AsyncSession):
-    """Provide a transactional scope around a series of operations."""
+    """
+    Provide a transactional scope around a series of operations.
+
+    When the session belongs to the write queue (session.info["deferred_commit"]),
+    the scope only flushes: the queue commits the whole batch at once and rolls
+    back the failed unit's savepoint itself.
+    """
+    if session.info.get("deferred_commit"):
+        yield session
+        await session.flush()
+        return
+
     try:
         yield session
         await session.commit()
     except Exception as e:
         await session.rollback()
         logger.error(f"Transaction rolled back due to error: {str(e)}")
-        raise
\ No newline at end of file
+        raise
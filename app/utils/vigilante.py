@@ -0,0 +1,127 @@
+# app/utils/vigilante.py
+"""
+Coherencia de las cachés en proceso entre workers que comparten un archivo
+SQLite, sin Redis.
+
+Cada worker guarda en memoria el snapshot del catálogo (app.utils.catalogo)
+y las respuestas cacheadas (app.utils.cache_http). Sus propias escrituras
+las invalidan al confirmar, pero no se entera de las de otros workers.
+
+VigilanteCambios mantiene una conexión de lectura propia y consulta cada
+VIGILANTE_INTERVALO segundos `PRAGMA data_version`, que cambia cuando otra
+conexión confirma cambios en la base; es una lectura en memoria, sin E/S.
+Solo cuando cambia lee cambios_tablas (contadores por tabla mantenidos con
+triggers, migración v6) para saber qué tablas se modificaron, y entonces:
+
+- expulsa del L1 las respuestas etiquetadas con esas tablas, y
+- recarga el catálogo si alguna es una tabla del catálogo.
+
+Las escrituras del propio worker también cambian data_version para esta
+conexión, así que provocan una invalidación redundante (barata) en la
+siguiente consulta. Los datos pueden verse viejos a lo sumo durante un
+intervalo. Solo actúa sobre SQLite; con otros motores no se inicia.
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..models.cambio_tabla import CambioTabla
+from .cache_http import invalidar_etiquetas
+from .catalogo import TABLAS_CATALOGO, catalogo
+from .metrics import CAMBIOS_EXTERNOS
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre consultas; 0 desactiva el vigilante
+VIGILANTE_INTERVALO = float(os.getenv("VIGILANTE_INTERVALO", "1.0"))
+
+class VigilanteCambios:
+    """
+    Args:
+        intervalo: Segundos entre consultas de data_version
+    """
+    def __init__(self, intervalo: float = VIGILANTE_INTERVALO):
+        self.intervalo = intervalo
+        self.engine: Optional[AsyncEngine] = None
+        self._conn: Optional[AsyncConnection] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self._data_version: Optional[int] = None
+        self._versiones: Dict[str, int] = {}
+
+    async def _leer_data_version(self) -> int:
+        result = await self._conn.exec_driver_sql("PRAGMA data_version")
+        valor = result.scalar()
+        # Sin transacción abierta: no retener un snapshot de lectura entre consultas
+        await self._conn.rollback()
+        return valor
+
+    async def _leer_versiones(self) -> Dict[str, int]:
+        result = await self._conn.execute(select(CambioTabla.tabla, CambioTabla.version))
+        versiones = {tabla: version for tabla, version in result.all()}
+        await self._conn.rollback()
+        return versiones
+
+    async def revisar(self) -> Set[str]:
+        """Una consulta; retorna las tablas modificadas desde la anterior"""
+        data_version = await self._leer_data_version()
+        if data_version == self._data_version:
+            return set()
+        self._data_version = data_version
+
+        versiones = await self._leer_versiones()
+        cambiadas = {t for t, v in versiones.items() if self._versiones.get(t) != v}
+        self._versiones = versiones
+        if cambiadas:
+            await self._aplicar(cambiadas)
+        return cambiadas
+
+    async def _aplicar(self, tablas: Set[str]) -> None:
+        for tabla in tablas:
+            CAMBIOS_EXTERNOS.labels(tabla=tabla).inc()
+        # Otro worker ya limpió el L2 al confirmar; aquí basta el L1
+        invalidar_etiquetas(tablas, solo_local=True)
+        if tablas & set(TABLAS_CATALOGO):
+            await catalogo.recargar()
+        logger.debug(f"Cambios detectados en {', '.join(sorted(tablas))}")
+
+    async def _vigilar(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.revisar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Vigilante de cambios: {str(e)}")
+
+    async def iniciar(self, engine: AsyncEngine) -> None:
+        """
+        Abre una conexión de `engine`, toma la línea base e inicia la
+        consulta periódica. El catálogo se recarga desde el mismo engine.
+        """
+        if self.intervalo <= 0 or engine.dialect.name != "sqlite" or self._tarea is not None:
+            return
+        self.engine = engine
+        self._conn = await self.engine.connect()
+        self._data_version = await self._leer_data_version()
+        self._versiones = await self._leer_versiones()
+        self._tarea = asyncio.create_task(self._vigilar(), name="vigilante-cambios")
+        logger.info(f"Vigilante de cambios activo cada {self.intervalo}s")
+
+    async def cerrar(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+vigilante = VigilanteCambios()
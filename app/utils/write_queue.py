@@ -0,0 +1,145 @@
+# app/utils/write_queue.py
+"""
+Cola de escritura con un solo escritor y commit agrupado (group commit).
+
+SQLite admite un único escritor: con muchas peticiones concurrentes que
+escriben, cada una compite por el bloqueo de la base y paga su propio fsync
+al confirmar. Con la cola activa (WRITE_QUEUE_ENABLED=true) las escrituras
+se encolan como unidades `async def unidad(session) -> resultado` y una sola
+tarea las ejecuta por lotes:
+
+- toma todas las unidades que esperan en la cola (hasta WRITE_QUEUE_MAX_BATCH);
+- ejecuta cada una dentro de un SAVEPOINT, de modo que la que falla se
+  deshace sola y su llamador recibe la excepción;
+- confirma el lote con un único COMMIT y resuelve los futures.
+
+Las funciones CRUD no cambian: transaction_scope detecta la sesión de la cola
+(session.info["deferred_commit"]) y solo hace flush.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .metrics import WRITE_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+UnidadEscritura = Callable[[AsyncSession], Awaitable[T]]
+
+WRITE_QUEUE_ENABLED = os.getenv("WRITE_QUEUE_ENABLED", "false").lower() == "true"
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "64"))
+
+class WriteQueue:
+    """
+    Ejecuta unidades de escritura en una única tarea, confirmándolas por lotes.
+    """
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        max_lote: int = WRITE_QUEUE_MAX_BATCH
+    ):
+        self._session_factory = session_factory
+        self.max_lote = max_lote
+        self._cola: Optional[asyncio.Queue] = None
+        self._escritor: Optional[asyncio.Task] = None
+
+    @property
+    def session_factory(self) -> async_sessionmaker:
+        if self._session_factory is None:
+            from ..database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    def _iniciar(self) -> None:
+        if self._escritor is None or self._escritor.done():
+            self._cola = asyncio.Queue()
+            self._escritor = asyncio.create_task(self._ejecutar(), name="write-queue")
+
+    async def enviar(self, unidad: UnidadEscritura) -> Any:
+        """
+        Encola una unidad de escritura y espera su resultado (o su excepción).
+        """
+        self._iniciar()
+        futuro = asyncio.get_running_loop().create_future()
+        await self._cola.put((unidad, futuro))
+        return await futuro
+
+    def _tomar_lote(self, primero) -> List[Tuple[UnidadEscritura, asyncio.Future]]:
+        lote = [primero]
+        while len(lote) < self.max_lote:
+            try:
+                elemento = self._cola.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if elemento is None:
+                # Señal de cierre: se procesa después del lote actual
+                self._cola.put_nowait(None)
+                break
+            lote.append(elemento)
+        return lote
+
+    async def _ejecutar(self) -> None:
+        while True:
+            primero = await self._cola.get()
+            if primero is None:
+                return
+            lote = self._tomar_lote(primero)
+            WRITE_BATCH_SIZE.observe(len(lote))
+            try:
+                await self._confirmar_lote(lote)
+            except Exception as e:
+                logger.error(f"Error en el lote de escritura: {str(e)}")
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+
+    async def _confirmar_lote(self, lote: List[Tuple[UnidadEscritura, asyncio.Future]]) -> None:
+        completados = []
+        async with self.session_factory() as session:
+            session.info["deferred_commit"] = True
+            for unidad, futuro in lote:
+                if futuro.cancelled():
+                    continue
+                try:
+                    async with session.begin_nested():
+                        resultado = await unidad(session)
+                    completados.append((futuro, resultado))
+                except Exception as e:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+
+            try:
+                await session.commit()
+            except Exception as e:
+                logger.error(f"Falló el commit agrupado de {len(completados)} escrituras: {str(e)}")
+                await session.rollback()
+                for futuro, _ in completados:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                return
+
+        for futuro, resultado in completados:
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    async def cerrar(self) -> None:
+        """Procesa lo que quede en la cola y detiene el escritor"""
+        if self._escritor is not None and not self._escritor.done():
+            await self._cola.put(None)
+            await self._escritor
+        self._escritor = None
+
+write_queue = WriteQueue()
+
+async def ejecutar_escritura(db: AsyncSession, unidad: UnidadEscritura) -> Any:
+    """
+    Ejecuta una unidad de escritura a través de la cola si está activa,
+    o directamente sobre la sesión de la petición si no lo está.
+    """
+    if WRITE_QUEUE_ENABLED:
+        return await write_queue.enviar(unidad)
+    return await unidad(db)
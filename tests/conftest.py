@@ -0,0 +1,38 @@
+# tests/conftest.py
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.migrations import run_migrations
+from app.seed.generador import PRESETS, generar
+from app.utils.sqlite_tuning import usar_transacciones_explicitas
+
+pytest_plugins = ["app.testing.pytest_plugin"]
+
+@pytest.fixture
+def anyio_backend():
+    """Los tests async corren sobre asyncio (plugin de pytest de anyio)"""
+    return "asyncio"
+
+@pytest.fixture
+async def engine(tmp_path):
+    """Engine de escritura sobre un SQLite temporal con el esquema migrado"""
+    motor = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'cortinas.db'}")
+    usar_transacciones_explicitas(motor)
+    await run_migrations(motor)
+    yield motor
+    await motor.dispose()
+
+@pytest.fixture
+def session_factory(engine):
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+@pytest.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+@pytest.fixture
+async def sembrada(engine):
+    """Base con el preset demo del generador (misma semilla, mismos datos)"""
+    await generar(engine, PRESETS["demo"])
+    return engine
@@ -0,0 +1,105 @@
+# tests/test_archivo.py
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.crud.cortina_crud import get_cortinas, get_estadisticas_cortinas
+from app.crud.cortina_historico_crud import incluir_archivo
+from app.models.cortina import Cortina
+from app.models.cortina_historico import CortinaHistorico
+from app.services.archivo_service import archivar_cortinas
+from app.services.tendencias_service import get_tendencias
+
+pytestmark = pytest.mark.anyio
+
+ESTADOS = ("entregado", "cancelado")
+DIAS = 365
+# Rango que cubre todo el historial del preset demo
+DESDE = datetime(2000, 1, 1)
+HASTA = datetime.utcnow() + timedelta(days=1)
+
+# La caché de get_tendencias no distingue entre bases; se consulta sin ella
+tendencias = get_tendencias.__wrapped__
+
+async def _contar(db, modelo, *condiciones):
+    return (await db.execute(select(func.count()).select_from(modelo).where(*condiciones))).scalar_one()
+
+async def _elegibles(db):
+    corte = datetime.utcnow() - timedelta(days=DIAS)
+    return (await db.execute(
+        select(Cortina.id).where(Cortina.estado.in_(ESTADOS), Cortina.fecha_creacion < corte)
+    )).scalars().all()
+
+async def test_mueve_por_lotes_conservando_ids(sembrada, db, tmp_path):
+    total = await _contar(db, Cortina)
+    ids = await _elegibles(db)
+    assert ids
+
+    resumen = await archivar_cortinas(db, dias=DIAS, lote=7, directorio_segmentos=tmp_path, estados=ESTADOS)
+
+    assert resumen["archivadas"] == len(ids)
+    assert resumen["lotes"] == -(-len(ids) // 7)
+    archivados = (await db.execute(select(CortinaHistorico.id).order_by(CortinaHistorico.id))).scalars().all()
+    assert archivados == sorted(ids)
+    assert await _elegibles(db) == []
+    assert await _contar(db, Cortina) == total - len(ids)
+
+    segmentos = sorted(tmp_path.glob("cortinas_*.jsonl.gz"))
+    assert len(segmentos) == resumen["lotes"]
+    filas = [json.loads(linea) for ruta in segmentos for linea in gzip.open(ruta, "rt", encoding="utf-8")]
+    assert sorted(fila["id"] for fila in filas) == sorted(ids)
+
+async def test_segunda_ejecucion_no_mueve_nada(sembrada, db):
+    await archivar_cortinas(db, dias=DIAS, estados=ESTADOS)
+    resumen = await archivar_cortinas(db, dias=DIAS, estados=ESTADOS)
+    assert (resumen["archivadas"], resumen["lotes"], resumen["segmentos"]) == (0, 0, None)
+
+@pytest.mark.parametrize("lote, estados", [(0, ESTADOS), (10, ())])
+async def test_parametros_invalidos(db, lote, estados):
+    with pytest.raises(ValueError):
+        await archivar_cortinas(db, lote=lote, estados=estados)
+
+async def test_lecturas_con_rango_incluyen_el_archivo(sembrada, db):
+    total = await _contar(db, Cortina)
+    stats = await get_estadisticas_cortinas(db, DESDE, HASTA)
+    series = await tendencias(db, "month", DESDE, HASTA)
+
+    await archivar_cortinas(db, dias=DIAS, estados=ESTADOS)
+    assert await incluir_archivo(db, DESDE, HASTA)
+
+    cortinas = await get_cortinas(db, limit=total, fecha_inicio=DESDE, fecha_fin=HASTA)
+    assert len(cortinas) == total
+    assert all(isinstance(c, Cortina) and c.diseno is not None for c in cortinas)
+    fechas = [c.fecha_creacion for c in cortinas]
+    assert fechas == sorted(fechas, reverse=True)
+
+    assert await get_estadisticas_cortinas(db, DESDE, HASTA) == stats
+    assert await tendencias(db, "month", DESDE, HASTA) == series
+
+async def test_paginacion_sobre_la_union(sembrada, db):
+    total = await _contar(db, Cortina)
+    await archivar_cortinas(db, dias=DIAS, estados=ESTADOS)
+
+    paginas = [
+        await get_cortinas(db, skip=skip, limit=40, fecha_inicio=DESDE, fecha_fin=HASTA)
+        for skip in range(0, total, 40)
+    ]
+    ids = [c.id for pagina in paginas for c in pagina]
+    assert len(ids) == len(set(ids)) == total
+    assert all(len(pagina) <= 40 for pagina in paginas)
+
+async def test_lecturas_sin_rango_solo_leen_activas(sembrada, db):
+    await archivar_cortinas(db, dias=DIAS, estados=ESTADOS)
+    activas = await _contar(db, Cortina)
+
+    assert not await incluir_archivo(db, None, None)
+    assert len(await get_cortinas(db, limit=1000)) == activas
+    assert (await get_estadisticas_cortinas(db))["total_cortinas"] == activas
+
+async def test_rango_reciente_no_consulta_el_archivo(sembrada, db):
+    await archivar_cortinas(db, dias=DIAS, estados=ESTADOS)
+    reciente = datetime.utcnow() - timedelta(days=DIAS - 1)
+    assert not await incluir_archivo(db, reciente, None)
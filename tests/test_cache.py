@@ -0,0 +1,203 @@
+# tests/test_cache.py
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils import cache as modulo_cache
+from app.utils.cache import CacheManager, cached, construir_clave, tamano_aproximado
+from app.utils.cache_http import invalidar_etiquetas
+
+pytestmark = pytest.mark.anyio
+
+class Reloj:
+    """Sustituye time.monotonic del módulo de caché"""
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self) -> float:
+        return self.ahora
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(modulo_cache.time, "monotonic", reloj)
+    return reloj
+
+async def test_lru_expulsa_la_menos_usada():
+    cache = CacheManager(max_entradas=2)
+    await cache.set("t:a", 1)
+    await cache.set("t:b", 2)
+    assert await cache.get("t:a") == 1  # "a" pasa a ser la más reciente
+
+    await cache.set("t:c", 3)
+
+    assert len(cache) == 2
+    assert await cache.get("t:b") is None
+    assert await cache.get("t:a") == 1
+    assert await cache.get("t:c") == 3
+
+async def test_ttl_por_entrada(reloj):
+    cache = CacheManager(ttl=10)
+    await cache.set("t:corta", 1, expire=5)
+    await cache.set("t:larga", 2)
+
+    reloj.ahora += 6
+    assert await cache.get("t:corta") is None
+    assert await cache.get("t:larga") == 2
+
+    reloj.ahora += 5
+    assert await cache.get("t:larga") is None
+    assert len(cache) == 0
+
+async def test_expire_cero_no_guarda():
+    cache = CacheManager()
+    await cache.set("t:a", 1, expire=0)
+    assert len(cache) == 0
+
+async def test_limite_de_bytes_expulsa_y_descuenta():
+    valor = "x" * 1000
+    tamano = tamano_aproximado(valor)
+    cache = CacheManager(max_mb=(tamano * 2.5) / (1024 * 1024))
+
+    for key in ("t:a", "t:b", "t:c"):
+        await cache.set(key, valor)
+
+    assert len(cache) == 2
+    assert cache.bytes == 2 * tamano
+    assert await cache.get("t:a") is None
+
+    await cache.delete("t:b")
+    assert cache.bytes == tamano
+
+async def test_valor_mayor_que_el_limite_no_se_guarda():
+    cache = CacheManager(max_mb=100 / (1024 * 1024))
+    await cache.set("t:grande", "x" * 1000)
+    assert len(cache) == 0
+    assert cache.bytes == 0
+
+async def test_clear_pattern_glob():
+    cache = CacheManager()
+    for key in ("diseno:1", "diseno:2", "referencia:1"):
+        await cache.set(key, key)
+
+    assert await cache.clear_pattern("diseno:*") == 2
+    assert await cache.get("referencia:1") == "referencia:1"
+    assert len(cache) == 1
+
+async def test_single_flight_calcula_una_vez():
+    cache = CacheManager()
+    llamadas = 0
+    liberar = asyncio.Event()
+
+    async def calcular():
+        nonlocal llamadas
+        llamadas += 1
+        await liberar.wait()
+        return "valor"
+
+    tareas = [asyncio.create_task(cache.get_or_compute("t:k", calcular)) for _ in range(5)]
+    await asyncio.sleep(0)
+    liberar.set()
+
+    assert await asyncio.gather(*tareas) == ["valor"] * 5
+    assert llamadas == 1
+    assert await cache.get("t:k") == "valor"
+
+async def test_single_flight_propaga_el_error_sin_guardar():
+    cache = CacheManager()
+    llamadas = 0
+    liberar = asyncio.Event()
+
+    async def calcular():
+        nonlocal llamadas
+        llamadas += 1
+        await liberar.wait()
+        raise RuntimeError("falla")
+
+    tareas = [asyncio.create_task(cache.get_or_compute("t:k", calcular)) for _ in range(3)]
+    await asyncio.sleep(0)
+    liberar.set()
+
+    resultados = await asyncio.gather(*tareas, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in resultados)
+    assert llamadas == 1
+    assert len(cache) == 0
+
+async def test_cancelar_a_quien_espera_no_cancela_el_calculo():
+    cache = CacheManager()
+    liberar = asyncio.Event()
+
+    async def calcular():
+        await liberar.wait()
+        return "valor"
+
+    primera = asyncio.create_task(cache.get_or_compute("t:k", calcular))
+    await asyncio.sleep(0)
+    segunda = asyncio.create_task(cache.get_or_compute("t:k", calcular))
+    await asyncio.sleep(0)
+    segunda.cancel()
+    liberar.set()
+
+    assert await primera == "valor"
+    with pytest.raises(asyncio.CancelledError):
+        await segunda
+
+async def test_none_no_se_guarda():
+    cache = CacheManager()
+
+    async def calcular():
+        return None
+
+    assert await cache.get_or_compute("t:k", calcular) is None
+    assert len(cache) == 0
+
+async def _leer(db, diseno_id: int, incluir_archivo: bool = False):
+    return diseno_id
+
+def test_clave_omite_la_sesion_y_normaliza_los_argumentos():
+    db, otra = AsyncSession(), AsyncSession()
+    clave = construir_clave("t", _leer, (db, 1), {})
+
+    assert clave == construir_clave("t", _leer, (otra,), {"diseno_id": 1})
+    assert clave == construir_clave("t", _leer, (db, 1, False), {})
+    assert clave != construir_clave("t", _leer, (db, 2), {})
+    assert construir_clave("t", _leer, (db, 1), {}, ("b", "a")).startswith("t:|a|b|:")
+
+async def test_cached_se_invalida_con_sus_etiquetas():
+    manager = CacheManager()
+    llamadas = []
+
+    @cached("t_dec", etiquetas=("t_dec_tabla",), cache_manager=manager)
+    async def leer(db, valor: int):
+        llamadas.append(valor)
+        return {"valor": valor} if valor else None
+
+    assert await leer(object(), 1) == {"valor": 1}
+    assert await leer(object(), 1) == {"valor": 1}
+    assert llamadas == [1]
+
+    invalidar_etiquetas(["t_dec_tabla"], cache_manager=manager)
+    assert await leer(object(), 1) == {"valor": 1}
+    assert llamadas == [1, 1]
+
+    # None no se guarda
+    assert await leer(object(), 0) is None
+    assert await leer(object(), 0) is None
+    assert llamadas == [1, 1, 0, 0]
+
+async def test_cached_descarta_lo_calculado_durante_una_invalidacion():
+    manager = CacheManager()
+    llamadas = 0
+
+    @cached("t_dec", etiquetas=("t_dec_carrera",), cache_manager=manager)
+    async def leer():
+        nonlocal llamadas
+        llamadas += 1
+        if llamadas == 1:
+            invalidar_etiquetas(["t_dec_carrera"], cache_manager=manager)
+        return llamadas
+
+    assert await leer() == 1
+    assert await leer() == 2
+    assert await leer() == 2
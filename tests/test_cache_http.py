@@ -0,0 +1,158 @@
+# tests/test_cache_http.py
+import asyncio
+from fnmatch import fnmatchcase
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.utils import cache_http
+from app.utils.cache import CacheManager, cache
+from app.utils.cache_http import (
+    CacheHTTPMiddleware,
+    RutaCacheable,
+    clave_respuesta,
+    etiquetar,
+    invalidar_etiquetas,
+    patron_etiqueta,
+)
+
+pytestmark = pytest.mark.anyio
+
+def test_clave_normaliza_query_y_ordena_etiquetas():
+    a = clave_respuesta("/disenos/", b"b=2&a=1", ("disenos", "colores"))
+    b = clave_respuesta("/disenos/", b"a=1&b=2", ("colores", "disenos"))
+
+    assert a == b
+    assert a.startswith("http:|colores|disenos|:")
+    assert a != clave_respuesta("/disenos/", b"a=1&b=3", ("colores", "disenos"))
+
+def test_patron_solo_coincide_con_la_etiqueta_completa():
+    cortinas = clave_respuesta("/x/", b"", ("cortinas", "disenos"))
+    historico = clave_respuesta("/x/", b"", ("cortinas_historico",))
+
+    assert fnmatchcase(cortinas, patron_etiqueta("cortinas"))
+    assert fnmatchcase(cortinas, patron_etiqueta("disenos"))
+    assert not fnmatchcase(historico, patron_etiqueta("cortinas"))
+
+async def test_invalidar_etiquetas_expulsa_solo_las_dependientes():
+    manager = CacheManager()
+    dependiente = clave_respuesta("/a/", b"", ("t_inv_a", "t_inv_b"))
+    ajena = clave_respuesta("/c/", b"", ("t_inv_c",))
+    await manager.set(dependiente, {"cuerpo": b"a"})
+    await manager.set(ajena, {"cuerpo": b"c"})
+
+    invalidar_etiquetas(["t_inv_b"], cache_manager=manager)
+
+    assert await manager.get(dependiente) is None
+    assert await manager.get(ajena) == {"cuerpo": b"c"}
+
+@pytest.fixture
+def sesion():
+    engine = create_engine("sqlite://")
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+async def test_commit_invalida_las_tablas_etiquetadas(sesion):
+    key = clave_respuesta("/t/", b"", ("t_commit",))
+    await cache.set(key, {"cuerpo": b"viejo"})
+    try:
+        sesion.execute(text("SELECT 1"))
+        etiquetar(sesion, "t_commit")
+        sesion.commit()
+        assert await cache.get(key) is None
+    finally:
+        await cache.delete(key)
+
+async def test_rollback_descarta_las_etiquetas(sesion):
+    key = clave_respuesta("/t/", b"", ("t_rollback",))
+    await cache.set(key, {"cuerpo": b"vigente"})
+    try:
+        sesion.execute(text("SELECT 1"))
+        etiquetar(sesion, "t_rollback")
+        sesion.rollback()
+        sesion.commit()
+        assert await cache.get(key) == {"cuerpo": b"vigente"}
+    finally:
+        await cache.delete(key)
+
+class Aplicacion:
+    """Aplicación ASGI mínima que responde con su valor actual"""
+    def __init__(self):
+        self.valor = 1
+        self.llamadas = 0
+        self.durante = None
+
+    async def __call__(self, scope, receive, send):
+        self.llamadas += 1
+        if self.durante is not None:
+            self.durante()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": str(self.valor).encode()})
+
+def _cliente(middleware) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test")
+
+async def test_middleware_sirve_desde_cache_hasta_invalidar():
+    app = Aplicacion()
+    manager = CacheManager()
+    middleware = CacheHTTPMiddleware(app, rutas={"/x/": RutaCacheable(("t_mw",))}, cache_manager=manager)
+
+    async with _cliente(middleware) as cliente:
+        assert (await cliente.get("/x/")).headers["x-cache"] == "MISS"
+        respuesta = await cliente.get("/x/")
+        assert (respuesta.text, respuesta.headers["x-cache"]) == ("1", "HIT")
+
+        app.valor = 2
+        invalidar_etiquetas(["t_mw"], cache_manager=manager)
+        respuesta = await cliente.get("/x/")
+        assert (respuesta.text, respuesta.headers["x-cache"]) == ("2", "MISS")
+
+    assert app.llamadas == 2
+
+async def test_respuesta_calculada_durante_una_invalidacion_no_se_guarda():
+    app = Aplicacion()
+    manager = CacheManager()
+    middleware = CacheHTTPMiddleware(app, rutas={"/x/": RutaCacheable(("t_durante",))}, cache_manager=manager)
+    app.durante = lambda: invalidar_etiquetas(["t_durante"], cache_manager=manager)
+
+    async with _cliente(middleware) as cliente:
+        await cliente.get("/x/")
+        app.durante = None
+        assert (await cliente.get("/x/")).headers["x-cache"] == "MISS"
+        assert (await cliente.get("/x/")).headers["x-cache"] == "HIT"
+
+async def test_l2_sin_limpiar_no_vuelve_a_llenar_el_l1(redis_l2):
+    app = Aplicacion()
+    manager = CacheManager()
+    manager.l2 = redis_l2
+    middleware = CacheHTTPMiddleware(app, rutas={"/x/": RutaCacheable(("t_l2",))}, cache_manager=manager)
+
+    # El L2 tarda en limpiarse: la respuesta vieja sigue ahí tras la invalidación
+    limpiar = redis_l2.clear_pattern
+    liberar = asyncio.Event()
+
+    async def limpiar_tarde(patron):
+        await liberar.wait()
+        return await limpiar(patron)
+
+    redis_l2.clear_pattern = limpiar_tarde
+    try:
+        async with _cliente(middleware) as cliente:
+            await cliente.get("/x/")
+            app.valor = 2
+            invalidar_etiquetas(["t_l2"], cache_manager=manager)
+            viejo, _ = await redis_l2.get(clave_respuesta("/x/", b"", ("t_l2",)))
+            assert viejo["cuerpo"] == b"1"
+
+            respuesta = await cliente.get("/x/")
+            assert (respuesta.text, respuesta.headers["x-cache"]) == ("2", "MISS")
+
+            liberar.set()
+            await asyncio.gather(*cache_http._pendientes)
+            respuesta = await cliente.get("/x/")
+            assert (respuesta.text, respuesta.headers["x-cache"]) == ("2", "HIT")
+    finally:
+        await redis_l2.cerrar()
@@ -0,0 +1,94 @@
+# tests/test_cortina_estadisticas.py
+"""
+Las estadísticas y el consumo se agregan en SQL; aquí se comparan con la
+versión anterior, que recorría las cortinas en Python.
+"""
+from collections import Counter
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import selectinload
+
+from app.crud.cortina_crud import get_consumo_materiales, get_estadisticas_cortinas
+from app.models.cortina import Cortina
+from app.models.diseno import Diseno, DisenoTipoInsumo
+
+pytestmark = pytest.mark.anyio
+
+async def _cortinas(db, fecha_inicio=None):
+    query = select(Cortina).options(
+        selectinload(Cortina.diseno)
+        .selectinload(Diseno.tipos_insumo)
+        .selectinload(DisenoTipoInsumo.tipo_insumo),
+        selectinload(Cortina.diseno)
+        .selectinload(Diseno.tipos_insumo)
+        .selectinload(DisenoTipoInsumo.referencia)
+    )
+    if fecha_inicio:
+        query = query.where(Cortina.fecha_creacion >= fecha_inicio)
+    return (await db.execute(query)).scalars().all()
+
+def _consumo_en_python(cortinas):
+    consumo = {}
+    for cortina in cortinas:
+        for rel in cortina.diseno.tipos_insumo:
+            if rel.referencia is None:
+                continue
+            cantidad = rel.cantidad_por_metro * float(cortina.ancho) / 100 * cortina.multiplicador
+            stats = consumo.setdefault((rel.tipo_insumo.nombre, rel.referencia.codigo), {
+                "cantidad_total": 0.0, "cortinas_count": 0, "costo_total": 0.0
+            })
+            stats["cantidad_total"] += cantidad
+            stats["cortinas_count"] += 1
+            stats["costo_total"] += cantidad * float(rel.referencia.precio_unitario)
+    return consumo
+
+@pytest.mark.parametrize("fecha_inicio", [None, datetime(2025, 1, 1)])
+async def test_estadisticas_coinciden_con_el_calculo_en_python(sembrada, db, fecha_inicio):
+    cortinas = await _cortinas(db, fecha_inicio)
+    assert cortinas
+
+    stats = await get_estadisticas_cortinas(db, fecha_inicio=fecha_inicio)
+
+    assert stats["total_cortinas"] == len(cortinas)
+    assert stats["costo_promedio"] == pytest.approx(
+        float(sum(c.costo_total for c in cortinas)) / len(cortinas), abs=0.01
+    )
+    assert stats["estado_distribucion"] == dict(Counter(c.estado for c in cortinas))
+    por_diseno = Counter(c.diseno.nombre for c in cortinas)
+    populares = [(d["diseno"], d["cantidad"]) for d in stats["disenos_populares"]]
+    assert all(por_diseno[nombre] == cantidad for nombre, cantidad in populares)
+    assert [cantidad for _, cantidad in populares] == sorted(por_diseno.values(), reverse=True)[:5]
+
+async def test_estadisticas_sin_cortinas(engine, db):
+    assert await get_estadisticas_cortinas(db) == {
+        "total_cortinas": 0,
+        "costo_promedio": 0,
+        "disenos_populares": [],
+        "estado_distribucion": {}
+    }
+
+async def test_consumo_coincide_con_el_calculo_en_python(sembrada, db):
+    # El generador no elige referencias; se asignan a dos de cada tres materiales
+    await db.execute(text(
+        "UPDATE diseno_tipos_insumo SET referencia_id = ("
+        "SELECT MIN(r.id) FROM referencias_insumo r "
+        "WHERE r.tipo_insumo_id = diseno_tipos_insumo.tipo_insumo_id"
+        ") WHERE id % 3 != 0"
+    ))
+    await db.commit()
+    esperado = _consumo_en_python(await _cortinas(db))
+    assert esperado
+
+    consumo = await get_consumo_materiales(db)
+
+    assert len(consumo) == len(esperado)
+    totales = [fila["cantidad_total"] for fila in consumo]
+    assert totales == sorted(totales, reverse=True)
+    for fila in consumo:
+        stats = esperado[(fila["tipo_insumo"], fila["referencia"])]
+        assert fila["cortinas_count"] == stats["cortinas_count"]
+        assert fila["cantidad_total"] == pytest.approx(stats["cantidad_total"])
+        assert fila["costo_total"] == pytest.approx(stats["costo_total"])
+        assert fila["cantidad_promedio"] == pytest.approx(stats["cantidad_total"] / stats["cortinas_count"])
@@ -0,0 +1,110 @@
+# tests/test_forecasting.py
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.color_insumo import ColorInsumo
+from app.models.cortina import Cortina
+from app.models.diseno import Diseno, DisenoTipoInsumo
+from app.models.inventario_insumo import InventarioInsumo
+from app.models.referencia_insumo import ReferenciaInsumo
+from app.models.tipo_insumo import TipoInsumo
+from app.services.forecasting import SKU, DemandForecaster, MetodoPronostico, calcular_dias_stock
+
+pytestmark = pytest.mark.anyio
+
+HOY = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+@pytest.fixture
+async def inventario(db):
+    """
+    Un SKU con consumo de 2 unidades por cortina (2 por metro, 100 cm de ancho):
+    una cortina hace dos días y dos hoy. Un segundo SKU sin consumo.
+    """
+    tipo = TipoInsumo(nombre="Tela")
+    referencia = ReferenciaInsumo(tipo_insumo=tipo, codigo="TEL-01", nombre="Lino", precio_unitario=10.0)
+    usado = ColorInsumo(referencia=referencia, codigo="TEL-01-01", nombre="Crudo")
+    sin_uso = ColorInsumo(referencia=referencia, codigo="TEL-01-02", nombre="Gris")
+    diseno = Diseno(id_diseno="D-01", nombre="Romana")
+    db.add_all([tipo, referencia, usado, sin_uso, diseno])
+    await db.flush()
+    db.add(DisenoTipoInsumo(
+        diseno_id=diseno.id, tipo_insumo_id=tipo.id,
+        referencia_id=referencia.id, color_id=usado.id, cantidad_por_metro=2.0
+    ))
+    db.add_all([
+        Cortina(diseno_id=diseno.id, ancho=100, alto=200, multiplicador=1, fecha_creacion=fecha)
+        for fecha in (HOY - timedelta(days=2), HOY, HOY)
+    ])
+    db.add_all([
+        InventarioInsumo(referencia_id=referencia.id, color_id=usado.id, cantidad=30, cantidad_minima=10),
+        InventarioInsumo(referencia_id=referencia.id, color_id=sin_uso.id, cantidad=5, cantidad_minima=1),
+    ])
+    await db.commit()
+    return (referencia.id, usado.id), (referencia.id, sin_uso.id)
+
+def _serie(valores):
+    return pd.DataFrame(
+        {(1, 1): valores, (1, 2): [0.0] * len(valores)},
+        index=pd.date_range("2024-05-01", periods=len(valores), freq="D")
+    )
+
+def test_media_movil_usa_la_ventana():
+    forecaster = DemandForecaster(None, metodo=MetodoPronostico.MEDIA_MOVIL, ventana=3)
+    tasas = forecaster.calcular_tasas(_serie([9.0, 0.0, 2.0, 0.0, 4.0]))
+    assert tasas[(1, 1)] == pytest.approx(2.0)
+    assert tasas[(1, 2)] == 0.0
+
+def test_ema_sigue_la_recurrencia():
+    valores = [0.0, 0.0, 2.0, 0.0, 4.0]
+    esperado = valores[0]
+    for valor in valores[1:]:
+        esperado = 0.5 * valor + 0.5 * esperado
+
+    tasas = DemandForecaster(None, alpha=0.5).calcular_tasas(_serie(valores))
+    assert tasas[(1, 1)] == pytest.approx(esperado) == pytest.approx(2.25)
+
+def test_tasas_sin_skus():
+    vacio = pd.DataFrame(
+        index=pd.date_range("2024-05-01", periods=3),
+        columns=pd.MultiIndex.from_tuples([], names=SKU)
+    )
+    assert DemandForecaster(None).calcular_tasas(vacio).empty
+
+def test_dias_stock_infinitos_sin_consumo():
+    assert calcular_dias_stock(30, 2) == 15.0
+    assert calcular_dias_stock(30, 0) == np.inf
+    np.testing.assert_array_equal(calcular_dias_stock(np.array([10.0, 5.0]), np.array([2.0, 0.0])), [5.0, np.inf])
+
+async def test_consumo_diario_rellena_dias_sin_pedidos(db, inventario):
+    con_consumo, sin_consumo = inventario
+    consumo = await DemandForecaster(db, historial_dias=5).consumo_diario(hasta=HOY)
+
+    assert list(consumo.index) == list(pd.date_range(HOY - timedelta(days=4), HOY, freq="D"))
+    assert consumo[con_consumo].tolist() == pytest.approx([0.0, 0.0, 2.0, 0.0, 4.0])
+    assert sin_consumo not in consumo.columns
+
+async def test_consumo_diario_sin_historial(db):
+    consumo = await DemandForecaster(db, historial_dias=7).consumo_diario(hasta=HOY)
+    assert len(consumo) == 7 and consumo.columns.empty
+
+@pytest.mark.parametrize("metodo, consumo, dias_stock, dias_reorden", [
+    (MetodoPronostico.MEDIA_MOVIL, 2.0, 15.0, 10),
+    (MetodoPronostico.EMA, 2.25, 13.3, 8),
+])
+async def test_pronosticar(db, inventario, metodo, consumo, dias_stock, dias_reorden):
+    con_consumo, sin_consumo = inventario
+    forecaster = DemandForecaster(db, metodo=metodo, ventana=3, alpha=0.5, historial_dias=5)
+
+    primero, ultimo = await forecaster.pronosticar()
+
+    assert (primero["referencia_id"], primero["color_id"]) == con_consumo
+    assert primero["consumo_diario"] == pytest.approx(consumo)
+    assert primero["dias_stock"] == dias_stock
+    assert primero["fecha_reorden"] == (HOY + timedelta(days=dias_reorden)).date()
+    # Sin consumo el SKU va al final y sin fechas (inf / NaT no van a JSON)
+    assert (ultimo["referencia_id"], ultimo["color_id"]) == sin_consumo
+    assert ultimo["consumo_diario"] == 0.0
+    assert ultimo["dias_stock"] is None and ultimo["fecha_reorden"] is None
@@ -0,0 +1,102 @@
+# tests/test_importacion.py
+import io
+
+import pytest
+from sqlalchemy import select
+
+from app.models.inventario_insumo import InventarioInsumo
+from app.models.tipo_insumo import TipoInsumo
+from app.services.importacion_service import importar_csv, leer_csv
+
+pytestmark = pytest.mark.anyio
+
+def _csv(*lineas):
+    return io.StringIO("\n".join(lineas) + "\n")
+
+@pytest.fixture
+async def catalogo_base(db):
+    """Un tipo, una referencia con dos colores, otra referencia y un inventario"""
+    await importar_csv(db, "tipos_insumo", _csv("nombre,descripcion", "Tela,Telas lisas"))
+    await importar_csv(db, "referencias_insumo", _csv(
+        "codigo,nombre,precio_unitario,tipo_insumo",
+        "TEL-01,Lino,10.5,Tela",
+        "TEL-02,Blackout,20,Tela"
+    ))
+    await importar_csv(db, "colores_insumo", _csv(
+        "codigo,nombre,referencia_codigo",
+        "TEL-01-01,Crudo,TEL-01",
+        "TEL-01-02,Gris,TEL-01",
+        "TEL-02-01,Negro,TEL-02"
+    ))
+    await importar_csv(db, "inventario_insumos", _csv(
+        "referencia_codigo,color_codigo,cantidad,cantidad_minima,ubicacion",
+        "TEL-01,TEL-01-01,50,10,Bodega 1"
+    ))
+
+async def test_cuenta_nuevas_actualizadas_y_errores(db, catalogo_base):
+    resultado = await importar_csv(db, "tipos_insumo", _csv(
+        "nombre,descripcion",
+        "Tela,Telas lisas y estampadas",
+        "Riel,Rieles de aluminio",
+        "Ri,Nombre demasiado corto",
+        "Riel,Rieles de aluminio y PVC"
+    ))
+
+    assert resultado["filas_leidas"] == 4
+    assert resultado["duplicadas"] == 1
+    assert resultado["nuevas"] == 1
+    assert resultado["actualizadas"] == 1
+    assert [(e["fila"], e["clave"]) for e in resultado["errores"]] == [(4, "Ri")]
+
+    tipos = dict((await db.execute(select(TipoInsumo.nombre, TipoInsumo.descripcion))).all())
+    # La última aparición de una clave repetida es la que se guarda
+    assert tipos == {"Tela": "Telas lisas y estampadas", "Riel": "Rieles de aluminio y PVC"}
+
+async def test_claves_desconocidas_son_errores_de_fila(db, catalogo_base):
+    resultado = await importar_csv(db, "inventario_insumos", _csv(
+        "referencia_codigo,color_codigo,cantidad",
+        "TEL-01,TEL-01-02,30",
+        "TEL-09,TEL-01-01,5",
+        "TEL-02,TEL-01-01,5",
+        "TEL-01,TEL-01-01,-1"
+    ))
+
+    assert (resultado["nuevas"], resultado["actualizadas"]) == (1, 0)
+    errores = {e["fila"]: e["error"] for e in resultado["errores"]}
+    assert list(errores) == [3, 4, 5]
+    assert "TEL-09" in errores[3]
+    assert "no pertenece" in errores[4]
+    assert "cantidad" in errores[5]
+
+async def test_celdas_vacias_conservan_el_valor_actual(db, catalogo_base):
+    resultado = await importar_csv(db, "inventario_insumos", _csv(
+        "referencia_codigo,color_codigo,cantidad,cantidad_minima,ubicacion",
+        "TEL-01,TEL-01-01,75,,Bodega 2"
+    ))
+
+    assert (resultado["nuevas"], resultado["actualizadas"]) == (0, 1)
+    fila = (await db.execute(select(InventarioInsumo))).scalar_one()
+    await db.refresh(fila)
+    assert (fila.cantidad, fila.cantidad_minima, fila.ubicacion) == (75, 10, "Bodega 2")
+
+async def test_lotes_pequenos_con_columnas_distintas(db, catalogo_base):
+    resultado = await importar_csv(db, "inventario_insumos", _csv(
+        "referencia_codigo,color_codigo,cantidad,cantidad_minima",
+        "TEL-01,TEL-01-01,60,",
+        "TEL-01,TEL-01-02,10,2",
+        "TEL-02,TEL-02-01,5,"
+    ), tamano_lote=2)
+
+    assert (resultado["nuevas"], resultado["actualizadas"], resultado["errores"]) == (2, 1, [])
+    cantidades = (await db.execute(
+        select(InventarioInsumo.cantidad).order_by(InventarioInsumo.id)
+    )).scalars().all()
+    assert cantidades == [60, 10, 5]
+
+def test_columnas_obligatorias():
+    with pytest.raises(ValueError, match="precio_unitario"):
+        leer_csv("referencias_insumo", _csv("codigo,nombre,tipo_insumo", "TEL-01,Lino,Tela"))
+
+async def test_entidad_desconocida(db):
+    with pytest.raises(ValueError, match="Entidad desconocida"):
+        await importar_csv(db, "cortinas", _csv("id", "1"))
@@ -0,0 +1,72 @@
+# tests/test_migrations.py
+import pytest
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import models
+from app.migrations import MIGRACIONES, Migracion, get_schema_version, run_migrations
+from app.migrations.runner import schema_version
+
+pytestmark = pytest.mark.anyio
+
+ULTIMA = max(m.version for m in MIGRACIONES)
+
+async def _filas_version(engine):
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(schema_version))).scalar_one()
+
+@pytest.fixture
+async def sin_migrar(tmp_path):
+    motor = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'vacia.db'}")
+    yield motor
+    await motor.dispose()
+
+async def test_base_nueva_queda_en_la_ultima_version(engine):
+    assert await get_schema_version(engine) == ULTIMA
+    assert await _filas_version(engine) == len(MIGRACIONES)
+
+async def test_volver_a_ejecutar_no_hace_nada(engine):
+    assert await run_migrations(engine) == ULTIMA
+    assert await run_migrations(engine) == ULTIMA
+    assert await _filas_version(engine) == len(MIGRACIONES)
+
+async def test_sin_tabla_de_versiones(sin_migrar):
+    assert await get_schema_version(sin_migrar) is None
+
+async def test_base_anterior_al_versionado(sin_migrar):
+    # Las tablas ya existen pero nunca se registró una versión
+    async with sin_migrar.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+
+    assert await run_migrations(sin_migrar) == ULTIMA
+    assert await _filas_version(sin_migrar) == len(MIGRACIONES)
+
+async def test_migracion_nueva_sube_la_version(engine):
+    aplicadas = []
+
+    def crear_tabla(conn):
+        aplicadas.append(conn)
+        conn.execute(text("CREATE TABLE prueba (id INTEGER PRIMARY KEY)"))
+
+    migraciones = [*MIGRACIONES, Migracion(ULTIMA + 1, "tabla de prueba", crear_tabla)]
+
+    assert await run_migrations(engine, migraciones) == ULTIMA + 1
+    assert await run_migrations(engine, migraciones) == ULTIMA + 1
+    assert len(aplicadas) == 1
+    assert await get_schema_version(engine) == ULTIMA + 1
+    async with engine.connect() as conn:
+        assert "prueba" in await conn.run_sync(lambda c: inspect(c).get_table_names())
+
+async def test_migracion_fallida_no_registra_version(engine):
+    def crear_y_fallar(conn):
+        conn.execute(text("CREATE TABLE a_medias (id INTEGER PRIMARY KEY)"))
+        raise RuntimeError("falla a mitad de la migración")
+
+    migraciones = [*MIGRACIONES, Migracion(ULTIMA + 1, "incompleta", crear_y_fallar)]
+
+    with pytest.raises(RuntimeError):
+        await run_migrations(engine, migraciones)
+
+    assert await get_schema_version(engine) == ULTIMA
+    async with engine.connect() as conn:
+        assert "a_medias" not in await conn.run_sync(lambda c: inspect(c).get_table_names())
@@ -0,0 +1,73 @@
+# tests/test_time_buckets.py
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import column, select, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from app.utils.time_buckets import (
+    Granularidad, date_bucket, normalizar_periodo, render_date_bucket
+)
+
+pytestmark = pytest.mark.anyio
+
+def _sql(granularidad, dialect):
+    return str(date_bucket(granularidad, column("fecha")).compile(dialect=dialect))
+
+@pytest.mark.parametrize("granularidad, esperado", [
+    ("day", "strftime('%Y-%m-%d', fecha)"),
+    ("week", "strftime('%Y-%m-%d', fecha, 'weekday 0', '-6 days')"),
+    ("month", "strftime('%Y-%m-01', fecha)"),
+])
+def test_compila_en_sqlite(granularidad, esperado):
+    assert _sql(granularidad, sqlite.dialect()) == esperado
+
+@pytest.mark.parametrize("granularidad", list(Granularidad))
+def test_compila_en_postgresql(granularidad):
+    assert _sql(granularidad, postgresql.dialect()) == f"date_trunc('{granularidad.value}', fecha)"
+
+@pytest.mark.parametrize("granularidad, esperado", [
+    ("day", "DATE(fecha)"),
+    ("week", "DATE(DATE_SUB(fecha, INTERVAL WEEKDAY(fecha) DAY))"),
+    ("month", "DATE(DATE_SUB(fecha, INTERVAL DAYOFMONTH(fecha) - 1 DAY))"),
+])
+def test_compila_en_mysql(granularidad, esperado):
+    assert _sql(granularidad, mysql.dialect()) == esperado
+
+def test_granularidades_no_comparten_cache_de_compilacion():
+    consultas = [select(date_bucket(g, column("fecha"))) for g in Granularidad]
+    claves = {consulta._generate_cache_key().key for consulta in consultas}
+    assert len(claves) == len(Granularidad)
+
+def test_granularidad_desconocida():
+    with pytest.raises(ValueError):
+        date_bucket("year", column("fecha"))
+
+def test_render_para_text():
+    assert render_date_bucket("month", "c.fecha_creacion", sqlite.dialect()) == \
+        "strftime('%Y-%m-01', c.fecha_creacion)"
+
+async def _periodo(engine, granularidad, fecha):
+    expr = render_date_bucket(granularidad, f"'{fecha}'", engine.dialect)
+    async with engine.connect() as conn:
+        return normalizar_periodo((await conn.execute(text(f"SELECT {expr}"))).scalar_one())
+
+@pytest.mark.parametrize("granularidad, esperado", [
+    ("day", "2024-05-16"),
+    ("week", "2024-05-13"),
+    ("month", "2024-05-01"),
+])
+async def test_sqlite_agrupa_al_inicio_del_periodo(engine, granularidad, esperado):
+    # 2024-05-16 es jueves; la semana empieza el lunes 13
+    assert await _periodo(engine, granularidad, "2024-05-16 18:30:00") == esperado
+
+async def test_semana_incluye_lunes_y_domingo(engine):
+    assert await _periodo(engine, "week", "2024-05-13") == "2024-05-13"
+    assert await _periodo(engine, "week", "2024-05-19") == "2024-05-13"
+    assert await _periodo(engine, "week", "2024-05-20") == "2024-05-20"
+
+@pytest.mark.parametrize("valor", [
+    "2024-05-01", datetime(2024, 5, 1, 12, 30), date(2024, 5, 1), "2024-05-01 00:00:00",
+])
+def test_normalizar_periodo(valor):
+    assert normalizar_periodo(valor) == "2024-05-01"
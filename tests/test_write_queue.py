@@ -0,0 +1,81 @@
+# tests/test_write_queue.py
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.utils.transaction import transaction_scope
+from app.utils.write_queue import WriteQueue
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+async def notas(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE notas (id INTEGER PRIMARY KEY, texto TEXT NOT NULL)"))
+
+def _insertar(nota_id: int, fallar: bool = False):
+    async def unidad(session):
+        async with transaction_scope(session) as tx:
+            await tx.execute(
+                text("INSERT INTO notas (id, texto) VALUES (:id, :texto)"),
+                {"id": nota_id, "texto": f"nota {nota_id}"}
+            )
+            if fallar:
+                raise ValueError(f"falla {nota_id}")
+        return nota_id
+    return unidad
+
+async def _ids(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(text("SELECT id FROM notas ORDER BY id"))).scalars().all()
+
+async def test_unidad_que_falla_no_arrastra_al_lote(session_factory):
+    cola = WriteQueue(session_factory=session_factory)
+    try:
+        resultados = await asyncio.gather(
+            cola.enviar(_insertar(1)),
+            cola.enviar(_insertar(2, fallar=True)),
+            cola.enviar(_insertar(3)),
+            return_exceptions=True
+        )
+    finally:
+        await cola.cerrar()
+
+    assert resultados[0] == 1 and resultados[2] == 3
+    assert isinstance(resultados[1], ValueError)
+    assert await _ids(session_factory) == [1, 3]
+
+async def test_lote_se_confirma_con_un_solo_commit(session_factory, monkeypatch):
+    cola = WriteQueue(session_factory=session_factory)
+    lotes = []
+    confirmar = cola._confirmar_lote
+
+    async def registrar(lote):
+        lotes.append(len(lote))
+        await confirmar(lote)
+
+    monkeypatch.setattr(cola, "_confirmar_lote", registrar)
+    try:
+        await asyncio.gather(*(cola.enviar(_insertar(i)) for i in range(1, 6)))
+    finally:
+        await cola.cerrar()
+
+    assert lotes == [5]
+    assert await _ids(session_factory) == [1, 2, 3, 4, 5]
+
+async def test_error_de_la_base_solo_deshace_su_savepoint(session_factory):
+    cola = WriteQueue(session_factory=session_factory)
+    try:
+        # La segunda unidad choca con la clave primaria que insertó la primera
+        resultados = await asyncio.gather(
+            cola.enviar(_insertar(1)),
+            cola.enviar(_insertar(1)),
+            return_exceptions=True
+        )
+    finally:
+        await cola.cerrar()
+
+    assert resultados[0] == 1
+    assert isinstance(resultados[1], Exception)
+    assert await _ids(session_factory) == [1]